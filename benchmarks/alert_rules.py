@@ -0,0 +1,34 @@
+"""
+Бенчмарк проверки правил оповещений
+
+Время одного такта AlertEngine.evaluate при RULES правилах с окном 60 с
+по METRICS метрикам (снимки каждые 3 с).
+Запуск: `python -m benchmarks.alert_rules`
+"""
+import random
+import time
+
+from src.services.stats.alerts import AlertEngine, parse_rules
+
+RULES = 500
+METRICS = 250
+TICKS = 1000
+
+
+def main() -> None:
+    rules = "; ".join(f"metric.{i % METRICS} > {random.randint(50, 99)} for 60" for i in range(RULES))
+    engine = AlertEngine(parse_rules(rules))
+    metrics = [f"metric.{i}" for i in range(METRICS)]
+
+    start = time.perf_counter()
+    events = 0
+    for tick in range(TICKS):
+        points = {name: random.uniform(0, 100) for name in metrics}
+        events += len(engine.evaluate(points, tick * 3))
+    duration = (time.perf_counter() - start) / TICKS
+    print(f"rules: {RULES}, metrics: {METRICS}, events: {events}")
+    print(f"us/tick: {duration * 1e6:.1f}")
+
+
+if __name__ == "__main__":
+    main()
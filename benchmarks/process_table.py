@@ -0,0 +1,65 @@
+"""
+Бенчмарк таблицы процессов
+
+Сравнивает наивный запрос (`psutil.process_iter` с полной сортировкой) с `ProcessTable.top`
+(одно чтение /proc/<pid>/stat на процесс, выбор кучей). Для хоста с тысячами процессов
+можно породить спящие процессы: `python -m benchmarks.process_table --spawn 5000`.
+Запуск: `python -m benchmarks.process_table`
+"""
+import argparse
+import subprocess
+import time
+
+import psutil
+
+from src.models.process_sort import ProcessSort
+from src.utils.processes import ProcessTable
+
+REPEAT = 5
+LIMIT = 10
+
+
+def naive_top() -> list:
+    entries = []
+    for process in psutil.process_iter(["pid", "name", "memory_info"]):
+        try:
+            entries.append((process.cpu_percent(), process.info))
+        except psutil.Error:
+            continue
+    return sorted(entries, key=lambda entry: entry[0], reverse=True)[:LIMIT]
+
+
+def measure(func) -> float:
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spawn", type=int, default=0, help="породить N спящих процессов")
+    args = parser.parse_args()
+
+    spawned = [subprocess.Popen(["sleep", "600"]) for _ in range(args.spawn)]
+    try:
+        table = ProcessTable(min_interval=0)
+        table.top(LIMIT)
+        print(f"processes: {len(psutil.pids())}")
+        print(f"{'method':>20} {'ms/request':>11}")
+        for title, func in (
+                ("psutil + sort", naive_top),
+                ("ProcessTable cpu", lambda: table.top(LIMIT, ProcessSort.CPU)),
+                ("ProcessTable rss", lambda: table.top(LIMIT, ProcessSort.RSS)),
+        ):
+            print(f"{title:>20} {measure(func) * 1000:>11.2f}")
+    finally:
+        for process in spawned:
+            process.kill()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
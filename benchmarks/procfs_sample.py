@@ -0,0 +1,45 @@
+"""
+Бенчмарк сбора горячих метрик: psutil против чтения /proc
+
+Сравнивает время одного снимка cpu/ram/lan: прежние вызовы psutil (включая два вызова
+`net_io_counters(pernic=True)` на интерфейс) и читатели `src.utils.procfs`.
+Запуск: `python -m benchmarks.procfs_sample`
+"""
+import timeit
+
+import psutil
+
+from src.utils import procfs
+
+SAMPLES = 2000
+
+
+def psutil_sample() -> None:
+    psutil.cpu_percent()
+    psutil.cpu_percent(percpu=True)
+    psutil.virtual_memory()
+    for name in psutil.net_if_addrs():
+        psutil.net_io_counters(pernic=True)[name].bytes_sent
+        psutil.net_io_counters(pernic=True)[name].bytes_recv
+
+
+def main() -> None:
+    cpu, meminfo, net_dev = procfs.CPUPercent(), procfs.MemInfo(), procfs.NetDev()
+
+    def procfs_sample() -> None:
+        cpu.read()
+        meminfo.read()
+        net_dev.read()
+
+    print(f"{'collector':>10} {'us/sample':>10}")
+    for title, sample in (("psutil", psutil_sample), ("procfs", procfs_sample)):
+        duration = min(timeit.repeat(sample, number=SAMPLES, repeat=3)) / SAMPLES
+        print(f"{title:>10} {duration * 1e6:>10.1f}")
+
+    cpu.close()
+    meminfo.close()
+    net_dev.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Бенчмарк блокировки цикла событий сбором статистики
+
+Сравнивает прежний синхронный сбор в цикле событий со StatsSampler на реальных
+сборщиках и со сборщиком rom, замедленным до SLOW_ROM секунд (как lsblk на занятом хосте).
+Запуск: `python -m benchmarks.stat_worker_loop`
+"""
+import asyncio
+import time
+
+from src.services.stats.sampler import DEFAULT_COLLECTORS, StatsSampler
+
+TICKS = 10
+PROBE_INTERVAL = 0.001
+SLOW_ROM = 0.2
+
+
+class LoopLagProbe:
+    """Измеряет задержку пробуждения корутины относительно запланированного"""
+
+    def __init__(self):
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lag = time.perf_counter() - start - PROBE_INTERVAL
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += max(lag, 0.0)
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *args):
+        self._task.cancel()
+
+
+def slow_rom_stat():
+    time.sleep(SLOW_ROM)
+    return DEFAULT_COLLECTORS["rom"]()
+
+
+def inline_collect(collectors: dict) -> None:
+    for collector in collectors.values():
+        try:
+            collector()
+        except Exception:
+            pass
+
+
+async def measure(collectors: dict) -> tuple[LoopLagProbe, LoopLagProbe]:
+    with LoopLagProbe() as inline:
+        for _ in range(TICKS):
+            inline_collect(collectors)
+            await asyncio.sleep(PROBE_INTERVAL * 5)
+
+    sampler = StatsSampler(collectors, timeout=SLOW_ROM * 2)
+    with LoopLagProbe() as offloaded:
+        for _ in range(TICKS):
+            await sampler.collect()
+            await asyncio.sleep(PROBE_INTERVAL * 5)
+    sampler.close()
+    return inline, offloaded
+
+
+async def main() -> None:
+    print(f"{'collectors':>10} {'':>8} {'max loop block, ms':>19} {'total loop block, ms/tick':>26}")
+    for title, collectors in (
+            ("real", DEFAULT_COLLECTORS),
+            ("slow rom", {**DEFAULT_COLLECTORS, "rom": slow_rom_stat}),
+    ):
+        inline, offloaded = await measure(collectors)
+        for name, probe in (("inline", inline), ("sampler", offloaded)):
+            print(f"{title:>10} {name:>8} {probe.max_lag * 1000:>19.3f} {probe.total_lag / TICKS * 1000:>26.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
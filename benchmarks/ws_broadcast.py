@@ -0,0 +1,99 @@
+"""
+Бенчмарк рассылки кадра статистики через WSConnectionManager.broadcast
+
+Запуск: `python -m benchmarks.ws_broadcast`
+"""
+import asyncio
+import json
+import time
+
+from starlette.websockets import WebSocketState
+
+from src.models import schemas
+from src.utils.wsmanager import WSConnectionManager
+
+SUBSCRIBERS = (10, 100, 1000)
+TICKS = 50
+
+
+class FakeWebSocket:
+    client = None
+    client_state = WebSocketState.CONNECTED
+    application_state = WebSocketState.CONNECTED
+
+    async def accept(self, subprotocol: str = None) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str = None) -> None:
+        self.client_state = WebSocketState.DISCONNECTED
+
+    async def send(self, message: dict) -> None:
+        await asyncio.sleep(0)
+
+    async def send_json(self, data, mode: str = "text") -> None:
+        # Поведение starlette: сериализация на каждый вызов
+        await self.send({"type": "websocket.send", "bytes": json.dumps(data).encode("utf-8")})
+
+
+def make_snapshot(cores: int = 16, volumes: int = 8, interfaces: int = 10) -> dict:
+    return schemas.SystemStat(
+        cpu=schemas.CPUStat(
+            percent=12.5, freq=3200.0, temperature=48.0,
+            cores=[schemas.CPUStatCore(percent=10.0 + i, freq=3200.0, temperature=48.0) for i in range(cores)],
+        ),
+        ram=schemas.RAMStat(total_space=32000, used_space=12000, free_space=20000),
+        rom=schemas.ROMStat(volumes=[
+            schemas.ROMStatVolume(
+                title=f"sda{i}", path=f"/dev/sda{i}", fs_type="ext4", type="sata",
+                total_space=512 * 1024 ** 3, used_space=128 * 1024 ** 3, free_space=384 * 1024 ** 3, percent=25.0,
+            ) for i in range(volumes)
+        ]),
+        lan=schemas.LANStat(interfaces=[
+            schemas.LANStatInterface(title=f"veth{i}", bytes_sent=i * 1024 ** 2, bytes_recv=i * 2048 ** 2)
+            for i in range(interfaces)
+        ]),
+    ).dict()
+
+
+async def legacy_broadcast(sockets: list[FakeWebSocket], dictionary: dict) -> None:
+    for websocket in sockets:
+        await websocket.send_json(dictionary, "binary")
+
+
+async def measure(subscribers: int, snapshot: dict) -> tuple[float, float, float]:
+    sockets = [FakeWebSocket() for _ in range(subscribers)]
+    manager = WSConnectionManager(queue_size=TICKS)
+    for websocket in sockets:
+        await manager.connect(websocket)
+
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        await legacy_broadcast(sockets, snapshot)
+    legacy = (time.perf_counter() - start) / TICKS
+
+    # Стоимость тика для воркера статистики: сериализация и постановка в очереди
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        await manager.broadcast(snapshot)
+    current = (time.perf_counter() - start) / TICKS
+
+    # Полная доставка: пока писатели не опустошат очереди
+    while any(connection.queue.qsize() for connection in manager.connections.values()):
+        await asyncio.sleep(0)
+    delivered = (time.perf_counter() - start) / TICKS
+
+    for websocket in sockets:
+        await manager.disconnect(websocket)
+    return legacy, current, delivered
+
+
+async def main() -> None:
+    snapshot = make_snapshot()
+    print(f"{'subscribers':>12} {'legacy, ms/tick':>16} {'broadcast, ms/tick':>19} {'delivered, ms/tick':>19}")
+    for subscribers in SUBSCRIBERS:
+        legacy, current, delivered = await measure(subscribers, snapshot)
+        print(f"{subscribers:>12} {legacy * 1000:>16.3f} {current * 1000:>19.3f} {delivered * 1000:>19.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,8 @@
 """Application implementation - ASGI."""
 import logging
+from datetime import datetime
+from functools import partial
+from typing import Optional
 
 import redis.asyncio as redis
 from fastapi import FastAPI
@@ -14,9 +17,20 @@ from src.config import load_ini_config
 from src.exceptions import APIError, handle_api_error, handle_404_error, handle_pydantic_error
 
 from src.router import reg_root_api_router
-from src.services.stats import stat_worker
-from src.utils import RedisClient, AiohttpClient
-from src.utils.bgmanager import BGManager
+from src.services.inventory import SystemInventory, parse_ttls
+from src.services.stats import relay_handler, stat_worker
+from src.services.stats.alerts import AlertEngine, parse_rules
+from src.services.stats.exposition import MetricsExposition
+from src.services.stats.history import StatsHistory, parse_tiers
+from src.services.stats.publisher import StatsPublisher
+from src.services.stats.relay import StatsRelay
+from src.services.stats.sampler import DEFAULT_COLLECTORS, StatsSampler
+from src.services.stats.scheduler import StatsScheduler
+from src.services.stats.topics import parse_topics
+from src.utils import RedisClient, AiohttpClient, system_info
+from src.utils.bgmanager import BGManager, FileLease, Lease, RedisLease
+from src.utils.connectivity import ConnectivityProber, parse_targets
+from src.utils.singleflight import SingleFlight
 from src.utils.wsmanager import WSConnectionManager, WSJWTConnectionManager
 
 config = load_ini_config('./config.ini')
@@ -59,10 +73,65 @@ async def redis_pool(db: int = 0):
     )
 
 
+def create_lease() -> Optional[Lease]:
+    """
+    Аренда лидерства: одна на фоновые задачи и сборщик статистики ретранслятора
+
+    """
+    if config.BACKGROUND.LEASE == "file":
+        return FileLease(config.BACKGROUND.LEASE_PATH, ttl=config.BACKGROUND.LEASE_TTL)
+    if config.BACKGROUND.LEASE == "redis":
+        return RedisLease(app.state.redis, config.BACKGROUND.LEASE_KEY, ttl=config.BACKGROUND.LEASE_TTL)
+    if config.BACKGROUND.LEASE != "none":
+        raise ValueError(f"Unknown background lease: {config.BACKGROUND.LEASE}")
+    if config.STATS.RELAY_ENABLED:
+        return RedisLease(
+            app.state.redis, f"{config.STATS.RELAY_CHANNEL}:sampler", ttl=config.STATS.RELAY_LEASE_TTL
+        )
+    return None
+
+
 async def init_background_manager():
-    app.state.background_manager = BGManager()
-    app.state.background_manager.add_job(
-        stat_worker, 'interval', seconds=3, args=(app,)
+    app.state.background_manager = BGManager(lease=app.state.lease)
+    # Фоновые потребители держат сборщик запущенным и без подписчиков: история - с шагом первого уровня,
+    # оповещения и ретранслятор (процессы сообщают потребность и следят за арендой) - с интервалом по умолчанию
+    background_intervals = set()
+    if app.state.stats_history is not None:
+        background_intervals.add(app.state.stats_history.tiers[0].step)
+    if app.state.stats_alerts is not None or app.state.stats_relay is not None:
+        background_intervals.add(config.STATS.SAMPLE_INTERVAL)
+    background_interval = min(background_intervals, default=None)
+    app.state.stats_scheduler = StatsScheduler(
+        app.state.background_manager,
+        app.state.stats_publisher,
+        default_interval=config.STATS.SAMPLE_INTERVAL,
+        min_interval=config.STATS.SAMPLE_INTERVAL_MIN,
+        max_interval=config.STATS.SAMPLE_INTERVAL_MAX,
+        background=background_interval,
+        on_resume=app.state.stats_sampler.prime,
+    )
+    app.state.stats_scheduler.start(stat_worker, app)
+    # С ретранслятором раздел network приходит в снимках лидера, остальным процессам
+    # достаточно проверки по запросу /info/network. Плановая проверка и проверка по запросу
+    # объединяются по одному ключу: одновременные проверки исказили бы окно потерь и джиттера
+    if config.INFO.PROBE_BACKGROUND:
+        app.state.background_manager.add_job(
+            partial(app.state.info_flight.do, "network", app.state.connectivity_prober.refresh), "interval",
+            singleton=app.state.stats_relay is not None,
+            seconds=config.INFO.PROBE_INTERVAL,
+            next_run_time=datetime.now(),
+            max_instances=1,
+        )
+    app.state.stats_exposition = MetricsExposition(
+        app.state.stats_sampler,
+        app.state.stats_ws,
+        scheduler=app.state.stats_scheduler,
+        history=app.state.stats_history,
+        alerts=app.state.stats_alerts,
+        token=config.STATS.METRICS_TOKEN,
+        relay=app.state.stats_relay,
+        inventory=app.state.system_inventory,
+        info_flight=app.state.info_flight,
     )
     app.state.background_manager.start()
 
@@ -72,9 +141,56 @@ async def on_startup():
     log.debug("Executing FastAPI startup event handler.")
     # Initialize utilities.
     app.state.notifier_ws = WSConnectionManager()
-    app.state.stats_ws = WSJWTConnectionManager()
+    app.state.stats_ws = WSJWTConnectionManager(
+        queue_size=config.STATS.WS_QUEUE_SIZE,
+        overflow_policy=config.STATS.WS_OVERFLOW_POLICY,
+        max_dropped=config.STATS.WS_MAX_DROPPED,
+    )
+    app.state.connectivity_prober = ConnectivityProber(
+        parse_targets(config.INFO.PROBE_TARGETS),
+        timeout=config.INFO.PROBE_TIMEOUT,
+        window=config.INFO.PROBE_WINDOW,
+        # Плановая проверка обновляет результаты каждый интервал, по запросу - не чаще раза в интервал
+        max_age=config.INFO.PROBE_INTERVAL * (2 if config.INFO.PROBE_BACKGROUND else 1),
+    )
+    app.state.stats_sampler = StatsSampler(
+        {
+            **DEFAULT_COLLECTORS,
+            "processes": partial(system_info.get_process_stat, config.STATS.PROCESSES_TOP),
+            "network": app.state.connectivity_prober.get_stat,
+        },
+        timeout=config.STATS.COLLECTOR_TIMEOUT,
+    )
+    app.state.stats_history = StatsHistory(
+        max_metrics=config.STATS.HISTORY_MAX_METRICS,
+        tiers=parse_tiers(config.STATS.HISTORY_TIERS),
+        path=config.STATS.HISTORY_PATH or None,
+        flush_interval=config.STATS.HISTORY_FLUSH_INTERVAL,
+    ) if config.STATS.HISTORY_ENABLED else None
+    app.state.stats_history_topics = parse_topics(config.STATS.HISTORY_TOPICS.split(","))
+    alert_rules = parse_rules(config.STATS.ALERT_RULES)
+    app.state.stats_alerts = AlertEngine(alert_rules) if alert_rules else None
+    app.state.stats_publisher = StatsPublisher(
+        app.state.stats_ws,
+        keyframe_interval=config.STATS.KEYFRAME_INTERVAL,
+    )
+    app.state.system_inventory = SystemInventory(
+        parse_ttls(config.INFO.INVENTORY_TTLS),
+        path=config.INFO.INVENTORY_PATH or None,
+    )
+    app.state.system_inventory.prewarm()
+    app.state.info_flight = SingleFlight()
     app.state.redis = RedisClient(await redis_pool())
     app.state.http_client = AiohttpClient()
+    app.state.lease = create_lease()
+    app.state.stats_relay = StatsRelay(
+        app.state.redis,
+        app.state.lease,
+        channel=config.STATS.RELAY_CHANNEL,
+        demand_key=f"{config.STATS.RELAY_CHANNEL}:demand",
+    ) if config.STATS.RELAY_ENABLED else None
+    if app.state.stats_relay is not None:
+        app.state.stats_relay.start(partial(relay_handler, app))
 
     await init_sqlite_db()
     await init_background_manager()
@@ -84,6 +200,13 @@ async def on_startup():
 async def on_shutdown():
     log.debug("Executing FastAPI shutdown event handler.")
     # Gracefully close utilities.
+    app.state.background_manager.shutdown()
+    await app.state.background_manager.resign()
+    if app.state.stats_relay is not None:
+        await app.state.stats_relay.close()
+    app.state.stats_sampler.close()
+    if app.state.stats_history is not None:
+        app.state.stats_history.close()
     await app.state.redis.close()
     await app.state.http_client.close_session()
 
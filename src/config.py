@@ -43,12 +43,58 @@ class Base:
     CONTACT: Contact
 
 
+@dataclass
+class Stats:
+    WS_QUEUE_SIZE: int = 8
+    WS_OVERFLOW_POLICY: str = "drop_oldest"
+    WS_MAX_DROPPED: int = 100
+    KEYFRAME_INTERVAL: int = 20
+    COLLECTOR_TIMEOUT: float = 2.0
+    SAMPLE_INTERVAL: float = 3.0
+    SAMPLE_INTERVAL_MIN: float = 1.0
+    SAMPLE_INTERVAL_MAX: float = 60.0
+    HISTORY_ENABLED: bool = True
+    HISTORY_MAX_METRICS: int = 128
+    HISTORY_TIERS: str = "3:3600,60:86400,3600:2592000"
+    HISTORY_PATH: str = "stats"
+    HISTORY_FLUSH_INTERVAL: float = 60
+    HISTORY_TOPICS: str = "cpu,ram,lan"
+    PROCESSES_TOP: int = 10
+    ALERT_RULES: str = ""
+    METRICS_TOKEN: Optional[str] = None
+    RELAY_ENABLED: bool = False
+    RELAY_CHANNEL: str = "stats:snapshot"
+    RELAY_LEASE_TTL: float = 10.0
+
+
+@dataclass
+class Info:
+    INVENTORY_TTLS: str = "cpu:0,os:3600,ram:10,rom:30,lan:30,dmi:0"
+    INVENTORY_PATH: str = "inventory.json"
+    PROBE_TARGETS: str = "1.1.1.1:443,8.8.8.8:443"
+    PROBE_BACKGROUND: bool = False
+    PROBE_INTERVAL: float = 30.0
+    PROBE_TIMEOUT: float = 1.0
+    PROBE_WINDOW: int = 120
+
+
+@dataclass
+class Background:
+    LEASE: str = "none"
+    LEASE_PATH: str = "bgmanager.lock"
+    LEASE_KEY: str = "bgmanager:leader"
+    LEASE_TTL: float = 15.0
+
+
 @dataclass
 class Config:
     DEBUG: bool
     IS_SECURE_COOKIE: bool
     BASE: Base
     DB: DbConfig
+    STATS: Stats
+    INFO: Info
+    BACKGROUND: Background
 
 
 @lru_cache()
@@ -87,6 +133,45 @@ def load_ini_config(path: str | os.PathLike, encoding="utf-8") -> Config:
                 PASSWORD=config["REDIS"]["PASSWORD"],
                 PORT=int(config["REDIS"]["PORT"])
             )
+        ),
+        STATS=Stats(
+            WS_QUEUE_SIZE=config.getint("STATS", "WS_QUEUE_SIZE", fallback=Stats.WS_QUEUE_SIZE),
+            WS_OVERFLOW_POLICY=config.get("STATS", "WS_OVERFLOW_POLICY", fallback=Stats.WS_OVERFLOW_POLICY),
+            WS_MAX_DROPPED=config.getint("STATS", "WS_MAX_DROPPED", fallback=Stats.WS_MAX_DROPPED),
+            KEYFRAME_INTERVAL=config.getint("STATS", "KEYFRAME_INTERVAL", fallback=Stats.KEYFRAME_INTERVAL),
+            COLLECTOR_TIMEOUT=config.getfloat("STATS", "COLLECTOR_TIMEOUT", fallback=Stats.COLLECTOR_TIMEOUT),
+            SAMPLE_INTERVAL=config.getfloat("STATS", "SAMPLE_INTERVAL", fallback=Stats.SAMPLE_INTERVAL),
+            SAMPLE_INTERVAL_MIN=config.getfloat("STATS", "SAMPLE_INTERVAL_MIN", fallback=Stats.SAMPLE_INTERVAL_MIN),
+            SAMPLE_INTERVAL_MAX=config.getfloat("STATS", "SAMPLE_INTERVAL_MAX", fallback=Stats.SAMPLE_INTERVAL_MAX),
+            HISTORY_ENABLED=config.getboolean("STATS", "HISTORY_ENABLED", fallback=Stats.HISTORY_ENABLED),
+            HISTORY_MAX_METRICS=config.getint("STATS", "HISTORY_MAX_METRICS", fallback=Stats.HISTORY_MAX_METRICS),
+            HISTORY_TIERS=config.get("STATS", "HISTORY_TIERS", fallback=Stats.HISTORY_TIERS),
+            HISTORY_PATH=config.get("STATS", "HISTORY_PATH", fallback=Stats.HISTORY_PATH),
+            HISTORY_FLUSH_INTERVAL=config.getfloat(
+                "STATS", "HISTORY_FLUSH_INTERVAL", fallback=Stats.HISTORY_FLUSH_INTERVAL
+            ),
+            HISTORY_TOPICS=config.get("STATS", "HISTORY_TOPICS", fallback=Stats.HISTORY_TOPICS),
+            PROCESSES_TOP=config.getint("STATS", "PROCESSES_TOP", fallback=Stats.PROCESSES_TOP),
+            ALERT_RULES=config.get("STATS", "ALERT_RULES", fallback=Stats.ALERT_RULES),
+            METRICS_TOKEN=config.get("STATS", "METRICS_TOKEN", fallback=Stats.METRICS_TOKEN) or None,
+            RELAY_ENABLED=config.getboolean("STATS", "RELAY_ENABLED", fallback=Stats.RELAY_ENABLED),
+            RELAY_CHANNEL=config.get("STATS", "RELAY_CHANNEL", fallback=Stats.RELAY_CHANNEL),
+            RELAY_LEASE_TTL=config.getfloat("STATS", "RELAY_LEASE_TTL", fallback=Stats.RELAY_LEASE_TTL),
+        ),
+        INFO=Info(
+            INVENTORY_TTLS=config.get("INFO", "INVENTORY_TTLS", fallback=Info.INVENTORY_TTLS),
+            INVENTORY_PATH=config.get("INFO", "INVENTORY_PATH", fallback=Info.INVENTORY_PATH),
+            PROBE_TARGETS=config.get("INFO", "PROBE_TARGETS", fallback=Info.PROBE_TARGETS),
+            PROBE_BACKGROUND=config.getboolean("INFO", "PROBE_BACKGROUND", fallback=Info.PROBE_BACKGROUND),
+            PROBE_INTERVAL=config.getfloat("INFO", "PROBE_INTERVAL", fallback=Info.PROBE_INTERVAL),
+            PROBE_TIMEOUT=config.getfloat("INFO", "PROBE_TIMEOUT", fallback=Info.PROBE_TIMEOUT),
+            PROBE_WINDOW=config.getint("INFO", "PROBE_WINDOW", fallback=Info.PROBE_WINDOW),
+        ),
+        BACKGROUND=Background(
+            LEASE=config.get("BACKGROUND", "LEASE", fallback=Background.LEASE),
+            LEASE_PATH=config.get("BACKGROUND", "LEASE_PATH", fallback=Background.LEASE_PATH),
+            LEASE_KEY=config.get("BACKGROUND", "LEASE_KEY", fallback=Background.LEASE_KEY),
+            LEASE_TTL=config.getfloat("BACKGROUND", "LEASE_TTL", fallback=Background.LEASE_TTL),
         )
     )
 
@@ -131,5 +216,42 @@ def load_env_config(file_name: str = None) -> Config:
                 PASSWORD=os.getenv('REDIS_PASSWORD'),
                 PORT=int(os.getenv('REDIS_PORT'))
             )
+        ),
+        STATS=Stats(
+            WS_QUEUE_SIZE=int(os.getenv('STATS_WS_QUEUE_SIZE', Stats.WS_QUEUE_SIZE)),
+            WS_OVERFLOW_POLICY=os.getenv('STATS_WS_OVERFLOW_POLICY', Stats.WS_OVERFLOW_POLICY),
+            WS_MAX_DROPPED=int(os.getenv('STATS_WS_MAX_DROPPED', Stats.WS_MAX_DROPPED)),
+            KEYFRAME_INTERVAL=int(os.getenv('STATS_KEYFRAME_INTERVAL', Stats.KEYFRAME_INTERVAL)),
+            COLLECTOR_TIMEOUT=float(os.getenv('STATS_COLLECTOR_TIMEOUT', Stats.COLLECTOR_TIMEOUT)),
+            SAMPLE_INTERVAL=float(os.getenv('STATS_SAMPLE_INTERVAL', Stats.SAMPLE_INTERVAL)),
+            SAMPLE_INTERVAL_MIN=float(os.getenv('STATS_SAMPLE_INTERVAL_MIN', Stats.SAMPLE_INTERVAL_MIN)),
+            SAMPLE_INTERVAL_MAX=float(os.getenv('STATS_SAMPLE_INTERVAL_MAX', Stats.SAMPLE_INTERVAL_MAX)),
+            HISTORY_ENABLED=bool(int(os.getenv('STATS_HISTORY_ENABLED', 1))),
+            HISTORY_MAX_METRICS=int(os.getenv('STATS_HISTORY_MAX_METRICS', Stats.HISTORY_MAX_METRICS)),
+            HISTORY_TIERS=os.getenv('STATS_HISTORY_TIERS', Stats.HISTORY_TIERS),
+            HISTORY_PATH=os.getenv('STATS_HISTORY_PATH', Stats.HISTORY_PATH),
+            HISTORY_FLUSH_INTERVAL=float(os.getenv('STATS_HISTORY_FLUSH_INTERVAL', Stats.HISTORY_FLUSH_INTERVAL)),
+            HISTORY_TOPICS=os.getenv('STATS_HISTORY_TOPICS', Stats.HISTORY_TOPICS),
+            PROCESSES_TOP=int(os.getenv('STATS_PROCESSES_TOP', Stats.PROCESSES_TOP)),
+            ALERT_RULES=os.getenv('STATS_ALERT_RULES', Stats.ALERT_RULES),
+            METRICS_TOKEN=os.getenv('STATS_METRICS_TOKEN') or None,
+            RELAY_ENABLED=bool(int(os.getenv('STATS_RELAY_ENABLED', 0))),
+            RELAY_CHANNEL=os.getenv('STATS_RELAY_CHANNEL', Stats.RELAY_CHANNEL),
+            RELAY_LEASE_TTL=float(os.getenv('STATS_RELAY_LEASE_TTL', Stats.RELAY_LEASE_TTL)),
+        ),
+        INFO=Info(
+            INVENTORY_TTLS=os.getenv('INFO_INVENTORY_TTLS', Info.INVENTORY_TTLS),
+            INVENTORY_PATH=os.getenv('INFO_INVENTORY_PATH', Info.INVENTORY_PATH),
+            PROBE_TARGETS=os.getenv('INFO_PROBE_TARGETS', Info.PROBE_TARGETS),
+            PROBE_BACKGROUND=bool(int(os.getenv('INFO_PROBE_BACKGROUND', 0))),
+            PROBE_INTERVAL=float(os.getenv('INFO_PROBE_INTERVAL', Info.PROBE_INTERVAL)),
+            PROBE_TIMEOUT=float(os.getenv('INFO_PROBE_TIMEOUT', Info.PROBE_TIMEOUT)),
+            PROBE_WINDOW=int(os.getenv('INFO_PROBE_WINDOW', Info.PROBE_WINDOW)),
+        ),
+        BACKGROUND=Background(
+            LEASE=os.getenv('BACKGROUND_LEASE', Background.LEASE),
+            LEASE_PATH=os.getenv('BACKGROUND_LEASE_PATH', Background.LEASE_PATH),
+            LEASE_KEY=os.getenv('BACKGROUND_LEASE_KEY', Background.LEASE_KEY),
+            LEASE_TTL=float(os.getenv('BACKGROUND_LEASE_TTL', Background.LEASE_TTL)),
         )
     )
@@ -1,16 +1,31 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
 from fastapi import status as http_status
+from fastapi.responses import Response
 
 from src.dependencies.services import get_services
 from src.models import schemas
+from src.models.inventory_component import InventoryComponent
 from src.services import ServiceFactory
+from src.services.inventory import etag_matches
 
 router = APIRouter()
 
 
 @router.get("/system", response_model=schemas.SystemInfo, status_code=http_status.HTTP_200_OK)
-async def system(service: ServiceFactory = Depends(get_services)):
-    return await service.info.get_system_info()
+async def system(if_none_match: str = Header(None), service: ServiceFactory = Depends(get_services)):
+    body, etag = await service.info.get_system_info()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=http_status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/system/refresh", status_code=http_status.HTTP_204_NO_CONTENT)
+async def system_refresh(
+        components: list[InventoryComponent] = Query(None),
+        service: ServiceFactory = Depends(get_services)
+):
+    await service.info.refresh_system_info(components)
 
 
 @router.get("/version", status_code=http_status.HTTP_200_OK)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Header
+from fastapi import status as http_status
+from fastapi.responses import Response
+
+from src.dependencies.services import get_services
+from src.services import ServiceFactory
+from src.services.stats.exposition import CONTENT_TYPE
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=Response, status_code=http_status.HTTP_200_OK)
+async def metrics(authorization: str = Header(None), services: ServiceFactory = Depends(get_services)):
+    scheme, _, token = (authorization or "").partition(" ")
+    body = await services.stats.get_metrics(token if scheme.lower() == "bearer" else None)
+    return Response(content=body, media_type=CONTENT_TYPE)
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from fastapi.requests import Request
 from fastapi import status as http_status
 from fastapi.websockets import WebSocket
 from fastapi.responses import HTMLResponse  # remove
 
 from src.dependencies.services import get_services
+from src.models import schemas
+from src.models.process_sort import ProcessSort
+from src.models.stats_format import StatsFormat
+from src.models.stats_mode import StatsMode
 from src.services import ServiceFactory
 
 
@@ -12,8 +16,51 @@ router = APIRouter()
 
 
 @router.websocket("/ws")
-async def stat_ws(websocket: WebSocket, services: ServiceFactory = Depends(get_services)):
-    await services.stats.subscribe_to_stats(websocket)
+async def stat_ws(
+        websocket: WebSocket,
+        mode: StatsMode = StatsMode.FULL,
+        fmt: StatsFormat = Query(None, alias="format"),
+        topics: str = None,
+        interval: float = None,
+        services: ServiceFactory = Depends(get_services)
+):
+    await services.stats.subscribe_to_stats(
+        websocket,
+        mode=mode,
+        fmt=fmt,
+        topics=[topic for topic in topics.split(",") if topic.strip()] if topics else None,
+        interval=interval,
+    )
+
+
+@router.get("/history", response_model=schemas.StatsHistory, status_code=http_status.HTTP_200_OK)
+async def history(
+        metrics: str = "*",
+        start: float = None,
+        end: float = None,
+        resolution: int = None,
+        services: ServiceFactory = Depends(get_services)
+):
+    return await services.stats.get_history(
+        metrics=[metric.strip() for metric in metrics.split(",") if metric.strip()],
+        start=start,
+        end=end,
+        resolution=resolution,
+    )
+
+
+@router.get("/processes", response_model=schemas.ProcessStat, status_code=http_status.HTTP_200_OK)
+async def processes(
+        limit: int = Query(10, ge=1, le=500),
+        sort: ProcessSort = ProcessSort.CPU,
+        services: ServiceFactory = Depends(get_services)
+):
+    return await services.stats.get_processes(limit=limit, sort=sort)
+
+
+@router.get("/clients", response_model=list[schemas.WSConnectionStat], status_code=http_status.HTTP_200_OK)
+async def clients(services: ServiceFactory = Depends(get_services)):
+    return await services.stats.get_connections()
 
 
 html = """
@@ -36,11 +83,15 @@ html = """
             function connect(){
                 ws = new WebSocket("ws://127.0.0.1:8000/api/v1/stats/ws");
                 ws.onmessage = async function(event) {
+                    // Текстовые кадры - проверка живости, данные приходят двоичными кадрами
+                    if (typeof event.data === "string") {
+                        if (event.data === "ping") ws.send("pong")
+                        return
+                    }
                     const messages = document.getElementById('messages')
                     const message = document.createElement('li')
                     
                     const str_data = await event.data.text()
-                    const json_data = JSON.parse(str_data)
                     
                     const content = document.createTextNode(str_data);
                     message.appendChild(content)
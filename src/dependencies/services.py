@@ -22,5 +22,12 @@ async def get_services(request: Request = None, websocket: WebSocket = None, rep
         redis_client=app.state.redis,
         debug=app.state.config.DEBUG,
         stats_ws_manager=app.state.stats_ws,
+        stats_publisher=app.state.stats_publisher,
+        stats_history=app.state.stats_history,
+        stats_scheduler=app.state.stats_scheduler,
+        stats_exposition=app.state.stats_exposition,
         notify_ws_manager=app.state.notifier_ws,
+        system_inventory=app.state.system_inventory,
+        info_flight=app.state.info_flight,
+        connectivity_prober=app.state.connectivity_prober,
     )
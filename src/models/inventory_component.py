@@ -0,0 +1,11 @@
+from enum import Enum, unique
+
+
+@unique
+class InventoryComponent(str, Enum):
+    CPU = "cpu"
+    RAM = "ram"
+    OS = "os"
+    ROM = "rom"
+    LAN = "lan"
+    DMI = "dmi"
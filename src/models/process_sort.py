@@ -0,0 +1,7 @@
+from enum import Enum, unique
+
+
+@unique
+class ProcessSort(str, Enum):
+    CPU = "cpu"
+    RSS = "rss"
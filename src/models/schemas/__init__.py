@@ -10,9 +10,11 @@ from .system_info import ROMItemInfo
 from .system_info import ROMVolumeInfo
 from .system_info import LANInfo
 from .system_info import LANNetworkItemInfo
+from .system_info import LANNetworkTargetInfo
 from .system_info import LANNetworkInfo
 from .system_info import LANItemInfo
 from .system_info import OSInfo
+from .system_info import DMIInfo
 
 from .system_info import SystemStat
 from .system_info import CPUStat
@@ -22,7 +24,16 @@ from .system_info import ROMStat
 from .system_info import ROMStatVolume
 from .system_info import LANStat
 from .system_info import LANStatInterface
+from .system_info import IOStat
+from .system_info import IOStatDevice
+from .system_info import ProcessStat
+from .system_info import ProcessStatItem
+from .system_info import NetworkStat
+from .system_info import NetworkStatInterface
+from .system_info import NetworkStatTarget
 from .system_info import LANAddressInfo
+from .system_info import StatsHistory
+from .system_info import StatsHistorySeries
 
 from .user import User
 from .user import UserUpdate
@@ -30,3 +41,5 @@ from .user import UserSignIn
 from .user import UserSignUp
 
 from .notification import Notification
+
+from .ws import WSConnectionStat
@@ -70,9 +70,21 @@ class LANAddressInfo(BaseModel):
     family: Optional[str]
 
 
+class LANNetworkTargetInfo(BaseModel):
+    target: Optional[str]
+    available: Optional[bool]
+    samples: Optional[int]
+    loss: Optional[float]
+    rtt_p50: Optional[float]
+    rtt_p90: Optional[float]
+    rtt_p99: Optional[float]
+    jitter: Optional[float]
+
+
 class LANNetworkItemInfo(BaseModel):
     interface: Optional[str]
     has_global_network: Optional[bool]
+    targets: Optional[list[LANNetworkTargetInfo]]
 
 
 class LANNetworkInfo(BaseModel):
@@ -99,12 +111,24 @@ class OSInfo(BaseModel):
     machine: Optional[str]
 
 
+class DMIInfo(BaseModel):
+    vendor: Optional[str]
+    product: Optional[str]
+    product_version: Optional[str]
+    board_vendor: Optional[str]
+    board: Optional[str]
+    bios_vendor: Optional[str]
+    bios_version: Optional[str]
+    bios_date: Optional[str]
+
+
 class SystemInfo(BaseModel):
     cpu: CPUInfo
     ram: RAMInfo
     rom: ROMInfo
     lan: LANInfo
     os: OSInfo
+    dmi: Optional[DMIInfo]
 
 
 # ------------ stats ------------
@@ -151,14 +175,78 @@ class LANStatInterface(BaseModel):
     title: Optional[str]
     bytes_sent: Optional[int]
     bytes_recv: Optional[int]
+    bytes_sent_rate: Optional[float]
+    bytes_recv_rate: Optional[float]
 
 
 class LANStat(BaseModel):
     interfaces: Optional[list[LANStatInterface]]
 
 
+class IOStatDevice(BaseModel):
+    title: Optional[str]
+    read_bytes_rate: Optional[float]
+    write_bytes_rate: Optional[float]
+    read_iops: Optional[float]
+    write_iops: Optional[float]
+    utilization: Optional[float]
+
+
+class IOStat(BaseModel):
+    devices: Optional[list[IOStatDevice]]
+
+
+class ProcessStatItem(BaseModel):
+    pid: int
+    title: Optional[str]
+    cpu_percent: Optional[float]
+    rss: Optional[int]
+
+
+class ProcessStat(BaseModel):
+    items: Optional[list[ProcessStatItem]]
+
+
+class NetworkStatTarget(BaseModel):
+    title: Optional[str]
+    available: Optional[bool]
+    loss: Optional[float]
+    rtt_p50: Optional[float]
+    rtt_p90: Optional[float]
+    rtt_p99: Optional[float]
+    jitter: Optional[float]
+
+
+class NetworkStatInterface(BaseModel):
+    title: Optional[str]
+    has_global_network: Optional[bool]
+    targets: Optional[list[NetworkStatTarget]]
+
+
+class NetworkStat(BaseModel):
+    interfaces: Optional[list[NetworkStatInterface]]
+
+
 class SystemStat(BaseModel):
-    cpu: CPUStat
-    ram: RAMStat
-    rom: ROMStat
-    lan: LANStat
+    cpu: Optional[CPUStat]
+    ram: Optional[RAMStat]
+    rom: Optional[ROMStat]
+    lan: Optional[LANStat]
+    io: Optional[IOStat]
+    processes: Optional[ProcessStat]
+    network: Optional[NetworkStat]
+
+
+class StatsHistorySeries(BaseModel):
+    metric: str
+    min: Optional[list[Optional[float]]]
+    avg: list[Optional[float]]
+    max: Optional[list[Optional[float]]]
+
+
+class StatsHistory(BaseModel):
+    resolution: int
+    start: float
+    end: float
+    timestamps: list[float]
+    series: list[StatsHistorySeries]
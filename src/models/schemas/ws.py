@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class WSConnectionStat(BaseModel):
+    host: Optional[str]
+    port: Optional[int]
+    connected_at: float
+    pending: int
+    sent: int
+    dropped: int
+    lag: float
+    max_lag: float
@@ -0,0 +1,7 @@
+from enum import Enum, unique
+
+
+@unique
+class StatsFormat(str, Enum):
+    JSON = "json"
+    MSGPACK = "msgpack"
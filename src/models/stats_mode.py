@@ -0,0 +1,7 @@
+from enum import Enum, unique
+
+
+@unique
+class StatsMode(str, Enum):
+    FULL = "full"
+    DELTA = "delta"
@@ -5,6 +5,7 @@ from src.controllers import user
 from src.controllers import stats
 from src.controllers import initialize
 from src.controllers import info
+from src.controllers import metrics
 
 
 def reg_root_api_router(is_debug: bool) -> APIRouter:
@@ -15,5 +16,6 @@ def reg_root_api_router(is_debug: bool) -> APIRouter:
     root_api_router.include_router(stats.router, prefix="/stats", tags=["Stats"])
     root_api_router.include_router(info.router, prefix="/info", tags=["SysInfo"])
     root_api_router.include_router(initialize.router, prefix="", tags=["Initialize"])
+    root_api_router.include_router(metrics.router, prefix="", tags=["Metrics"])
 
     return root_api_router
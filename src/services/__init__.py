@@ -15,7 +15,14 @@ class ServiceFactory:
             current_user: tables.User,
             config, redis_client,
             stats_ws_manager,
+            stats_publisher,
+            stats_history,
+            stats_scheduler,
+            stats_exposition,
             notify_ws_manager,
+            system_inventory,
+            info_flight,
+            connectivity_prober,
             debug: bool = False
     ):
         self._repo = repo_factory
@@ -23,7 +30,14 @@ class ServiceFactory:
         self._config = config
         self._redis_client = redis_client
         self._stats_ws_manager = stats_ws_manager
+        self._stats_publisher = stats_publisher
+        self._stats_history = stats_history
+        self._stats_scheduler = stats_scheduler
+        self._stats_exposition = stats_exposition
         self._notify_ws_manager = notify_ws_manager
+        self._system_inventory = system_inventory
+        self._info_flight = info_flight
+        self._connectivity_prober = connectivity_prober
         self._debug = debug
 
     @property
@@ -46,8 +60,21 @@ class ServiceFactory:
 
     @property
     def info(self) -> InfoApplicationService:
-        return InfoApplicationService(config=self._config, current_user=self._current_user)
+        return InfoApplicationService(
+            config=self._config,
+            system_inventory=self._system_inventory,
+            info_flight=self._info_flight,
+            connectivity_prober=self._connectivity_prober,
+            current_user=self._current_user
+        )
 
     @property
     def stats(self) -> StatsApplicationService:
-        return StatsApplicationService(stats_ws_manager=self._stats_ws_manager, current_user=self._current_user)
+        return StatsApplicationService(
+            stats_ws_manager=self._stats_ws_manager,
+            stats_publisher=self._stats_publisher,
+            stats_history=self._stats_history,
+            stats_scheduler=self._stats_scheduler,
+            stats_exposition=self._stats_exposition,
+            current_user=self._current_user
+        )
@@ -1,33 +1,56 @@
+import asyncio
 import os
 import platform
+from typing import Iterable
 
 
 from src.config import Config
-from src.models import schemas
+from src.models.inventory_component import InventoryComponent
 from src.models.role import UserRole
 from src.services.auth.utils import filters
-from src.utils import system_info
+from src.services.inventory import SystemInventory
+from src.utils.connectivity import ConnectivityProber
+from src.utils.singleflight import SingleFlight
 
 
 class InfoApplicationService:
 
-    def __init__(self, config: Config, current_user):
+    def __init__(
+            self,
+            config: Config,
+            system_inventory: SystemInventory,
+            info_flight: SingleFlight,
+            connectivity_prober: ConnectivityProber,
+            current_user
+    ):
         self._config = config
+        self._system_inventory = system_inventory
+        self._info_flight = info_flight
+        self._connectivity_prober = connectivity_prober
         self._current_user = current_user
 
     @filters(roles=[UserRole.ADMIN, UserRole.USER])
-    async def get_system_info(self):
+    async def get_system_info(self) -> tuple[bytes, str]:
         """
-        Информация о системе
+        Информация о системе: сериализованный ответ и его ETag
 
+        Устаревшие компоненты (lsblk, ioctl) загружаются в отдельном потоке одним вызовом
+        на все одновременные запросы, свежий кэш отдаётся без переключения потоков и блокировок.
+        Занятая и свободная память - на момент загрузки компонента RAM (срок жизни - INFO.INVENTORY_TTLS).
         """
-        return schemas.SystemInfo(
-            cpu=system_info.get_cpu_info(),
-            ram=system_info.get_ram_info(),
-            os=system_info.get_os_info(),
-            rom=system_info.get_rom_info(),
-            lan=system_info.get_lan_info(),
-        )
+        response = self._system_inventory.cached()
+        if response is not None:
+            return response
+        return await self._info_flight.do("system", asyncio.to_thread, self._system_inventory.body)
+
+    @filters(roles=[UserRole.ADMIN])
+    async def refresh_system_info(self, components: Iterable[InventoryComponent] = None) -> None:
+        """
+        Сброс кэша сведений о системе
+
+        :param components: компоненты; по умолчанию все
+        """
+        await asyncio.to_thread(self._system_inventory.invalidate, components)
 
     async def get_version(self, details: bool = False) -> dict:
         info = {
@@ -48,4 +71,12 @@ class InfoApplicationService:
 
     @filters(roles=[UserRole.ADMIN, UserRole.USER])
     async def get_network_info(self):
-        return await system_info.get_network_info()
+        """
+        Доступность сети по интерфейсам по последней фоновой проверке
+
+        До первой фоновой проверки и в процессах, где она не запускается (проверку ведёт
+        лидер фоновых задач), проверка выполняется по запросу, одна на все одновременные запросы.
+        """
+        if self._connectivity_prober.stale():
+            await self._info_flight.do("network", self._connectivity_prober.refresh)
+        return self._connectivity_prober.info()
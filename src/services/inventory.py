@@ -0,0 +1,280 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+import psutil
+from pydantic import BaseModel, ValidationError
+
+from src.models import schemas
+from src.models.inventory_component import InventoryComponent
+from src.utils import system_info
+
+# Срок жизни компонентов, сек; 0 - до явного сброса
+TTLS: dict[InventoryComponent, float] = {
+    InventoryComponent.CPU: 0,
+    InventoryComponent.OS: 3600,
+    InventoryComponent.RAM: 10,
+    InventoryComponent.ROM: 30,
+    InventoryComponent.LAN: 30,
+    InventoryComponent.DMI: 0,
+}
+
+LOADERS: dict[InventoryComponent, Callable[[], BaseModel]] = {
+    InventoryComponent.CPU: system_info.get_cpu_info,
+    InventoryComponent.OS: system_info.get_os_info,
+    InventoryComponent.RAM: system_info.get_ram_info,
+    InventoryComponent.ROM: system_info.get_rom_info,
+    InventoryComponent.LAN: system_info.get_lan_info,
+    InventoryComponent.DMI: system_info.get_dmi_info,
+}
+
+# Медленные и неизменные до перезагрузки компоненты: прогреваются при запуске и сохраняются в снимок
+STATIC: tuple[InventoryComponent, ...] = (
+    InventoryComponent.CPU,
+    InventoryComponent.OS,
+    InventoryComponent.DMI,
+)
+
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+# Кэши нижнего уровня, которые сбрасываются вместе с компонентом
+RESETS: dict[InventoryComponent, Callable[[], None]] = {
+    InventoryComponent.CPU: system_info.get_cpu_info.cache_clear,
+    InventoryComponent.ROM: system_info.rom_inventory.invalidate,
+    InventoryComponent.LAN: system_info.lan_inventory.invalidate,
+}
+
+
+def boot_id() -> str:
+    """
+    Идентификатор текущей загрузки системы: снимок с прошлой загрузки не используется
+
+    """
+    try:
+        with open(BOOT_ID_PATH, encoding="utf-8") as file:
+            boot = file.read().strip()
+    except OSError:
+        boot = str(int(psutil.boot_time()))
+    return f"{socket.gethostname()}:{boot}"
+
+
+def parse_ttls(value: str) -> dict[InventoryComponent, float]:
+    """
+    Разбор сроков жизни компонентов из конфигурации: `cpu:0,os:3600,ram:10`
+
+    """
+    ttls = dict(TTLS)
+    for item in value.split(","):
+        if item.strip():
+            component, ttl = item.strip().split(":")
+            ttls[InventoryComponent(component)] = float(ttl)
+    return ttls
+
+
+class SystemInventory:
+    """
+    Кэш сведений о системе для /info/system
+
+    Каждый компонент (процессор, ОС, память, диски, сеть) хранится со своим сроком жизни
+    и сбрасывается отдельно. Тело ответа сериализуется заранее и пересобирается только
+    при изменении какого-либо компонента; ETag - хеш тела, поэтому повторная загрузка
+    без изменений отвечает 304, а ETag совпадает во всех процессах приложения.
+    Занятая и свободная память обновляются не чаще срока жизни компонента RAM: ETag
+    меняется не чаще, чем раз в этот срок.
+
+    Медленные неизменные компоненты (STATIC: cpuinfo опрашивает процессор около секунды)
+    прогреваются в фоновом потоке при запуске (`prewarm`) и сохраняются в снимок `path`;
+    после перезапуска в пределах той же загрузки системы они берутся из снимка.
+
+    :param ttls: сроки жизни компонентов, сек; 0 - до явного сброса
+    :param loaders: загрузчики компонентов
+    :param path: файл снимка неизменных компонентов; без него снимок не сохраняется
+    :param boot: идентификатор загрузки системы, к которой относится снимок
+    """
+
+    def __init__(
+            self,
+            ttls: dict[InventoryComponent, float] = None,
+            loaders: dict[InventoryComponent, Callable[[], BaseModel]] = None,
+            path: str = None,
+            boot: str = None,
+    ):
+        self._ttls = {**TTLS, **(ttls or {})}
+        self._loaders = loaders if loaders is not None else LOADERS
+        self._path = path
+        self._boot = boot if boot is not None else boot_id()
+        self._lock = threading.Lock()
+        self._log = logging.getLogger(__name__)
+        self._values: dict[InventoryComponent, BaseModel] = {}
+        self._loaded_at: dict[InventoryComponent, float] = {}
+        # Тело ответа и ETag заменяются одним присваиванием: их читают без блокировки
+        self._response: Optional[tuple[bytes, str]] = None
+        self._warmer: Optional[threading.Thread] = None
+        self.loads = {component: 0 for component in self._loaders}
+        self.builds = 0
+        self.hits = 0
+        self.restored = self._restore()
+
+    def _restore(self) -> list[InventoryComponent]:
+        if self._path is None or not os.path.exists(self._path):
+            return []
+        try:
+            with open(self._path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+            if snapshot.get("boot") != self._boot:
+                return []
+            values = {
+                InventoryComponent(name): schemas.SystemInfo.__fields__[name].type_.parse_obj(data)
+                for name, data in snapshot["components"].items()
+            }
+        except (OSError, ValueError, KeyError, AttributeError, ValidationError) as error:
+            self._log.warning("System inventory snapshot %s is unreadable: %s", self._path, error)
+            return []
+        now = time.monotonic()
+        restored = [component for component in values if component in STATIC and component in self._loaders]
+        for component in restored:
+            self._values[component] = values[component]
+            self._loaded_at[component] = now
+        return restored
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+        snapshot = {
+            "boot": self._boot,
+            "components": {
+                component.value: json.loads(self._values[component].json())
+                for component in STATIC if component in self._values
+            },
+        }
+        try:
+            with open(f"{self._path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(snapshot, file)
+            os.replace(f"{self._path}.tmp", self._path)
+        except OSError as error:
+            self._log.warning("Cannot save system inventory snapshot %s: %s", self._path, error)
+
+    def _load(self, component: InventoryComponent, now: float) -> bool:
+        value = self._loaders[component]()
+        self.loads[component] += 1
+        self._loaded_at[component] = now
+        if self._values.get(component) == value:
+            return False
+        self._values[component] = value
+        return True
+
+    def _expired(self, component: InventoryComponent, now: float) -> bool:
+        if component not in self._values:
+            return True
+        ttl = self._ttls.get(component, 0)
+        return ttl > 0 and now - self._loaded_at[component] >= ttl
+
+    def stale(self, now: float = None) -> bool:
+        """
+        Нужна ли загрузка хотя бы одного компонента
+
+        """
+        now = time.monotonic() if now is None else now
+        return self._response is None or any(self._expired(component, now) for component in self._loaders)
+
+    def cached(self, now: float = None) -> Optional[tuple[bytes, str]]:
+        """
+        Готовый ответ без блокировки; None, если нужна загрузка (см. `body`)
+
+        Блокировку может надолго занять загрузка в другом потоке (прогрев cpuinfo),
+        поэтому цикл событий читает только готовый ответ.
+        """
+        response = self._response
+        if response is None or self.stale(now):
+            return None
+        self.hits += 1
+        return response
+
+    def body(self) -> tuple[bytes, str]:
+        """
+        Сериализованный ответ и его ETag; устаревшие компоненты загружаются заново
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            changed = self._response is None
+            loaded = False
+            persist = False
+            for component in self._loaders:
+                if not self._expired(component, now):
+                    continue
+                loaded = True
+                if self._load(component, now):
+                    changed = True
+                    persist = persist or component in STATIC
+            if not loaded:
+                self.hits += 1
+            if persist:
+                self._save()
+            if changed:
+                self.builds += 1
+                body = schemas.SystemInfo(**self._values).json().encode("utf-8")
+                self._response = body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            return self._response
+
+    def warm(self, components: Iterable[InventoryComponent] = STATIC) -> None:
+        """
+        Загрузка устаревших компонентов (по умолчанию неизменных) и сохранение снимка
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            changed = False
+            for component in components:
+                if component in self._loaders and self._expired(component, now):
+                    changed = self._load(component, now) or changed
+            if changed:
+                self._response = None
+                self._save()
+
+    def prewarm(self) -> threading.Thread:
+        """
+        Прогрев неизменных компонентов в фоновом потоке, не задерживая запуск
+
+        """
+        def run():
+            try:
+                self.warm()
+            except Exception:
+                self._log.exception("System inventory pre-warming failed")
+
+        self._warmer = threading.Thread(target=run, name="inventory-prewarm", daemon=True)
+        self._warmer.start()
+        return self._warmer
+
+    def invalidate(self, components: Iterable[InventoryComponent] = None) -> None:
+        """
+        Сброс компонентов (по умолчанию всех) вместе с их кэшами нижнего уровня
+
+        """
+        with self._lock:
+            components = list(self._loaders) if components is None else list(components)
+            for component in components:
+                self._values.pop(component, None)
+                reset = RESETS.get(component)
+                if reset is not None:
+                    reset()
+            # Сброшенные компоненты не должны вернуться из снимка после перезапуска
+            if any(component in STATIC for component in components):
+                self._save()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Совпадение заголовка If-None-Match с ETag (слабое сравнение, RFC 9110)
+
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
@@ -0,0 +1,309 @@
+
+import asyncio
+import json
+import logging
+import time
+from typing import Iterable, Optional
+
+from fastapi.websockets import WebSocket
+from redis.exceptions import RedisError
+from starlette.websockets import WebSocketState
+
+from src.exceptions import APIError, NotFound
+from src.models import schemas
+from src.models.notify_level import NotifyLevel
+from src.models.process_sort import ProcessSort
+from src.models.role import UserRole
+from src.models.stats_format import StatsFormat
+from src.models.stats_mode import StatsMode
+from src.services.auth.utils import filters
+from src.services.notifier import create_push_notification
+from src.utils import system_info
+from src.utils.wsmanager import WSJWTConnectionManager
+
+from .alerts import AlertEngine
+from .exposition import MetricsExposition
+from .history import StatsHistory, metric_points
+from .publisher import StatsPublisher
+from .relay import StatsRelay
+from .sampler import StatsSampler
+from .scheduler import StatsScheduler
+from .topics import DEFAULT_TOPICS, filter_snapshot, parse_topics, topic_sections
+
+log = logging.getLogger(__name__)
+
+
+class StatsApplicationService:
+
+    def __init__(
+            self,
+            stats_ws_manager: WSJWTConnectionManager,
+            stats_publisher: StatsPublisher,
+            stats_history: Optional[StatsHistory],
+            stats_scheduler: StatsScheduler,
+            stats_exposition: MetricsExposition,
+            current_user
+    ):
+        self._stats_ws_manager = stats_ws_manager
+        self._stats_publisher = stats_publisher
+        self._stats_history = stats_history
+        self._stats_scheduler = stats_scheduler
+        self._stats_exposition = stats_exposition
+        self._current_user = current_user
+
+    @filters(roles=[UserRole.ADMIN, UserRole.USER])
+    async def subscribe_to_stats(
+            self,
+            websocket: WebSocket,
+            mode: StatsMode = StatsMode.FULL,
+            fmt: StatsFormat = None,
+            topics: Iterable[str] = None,
+            interval: float = None
+    ) -> None:
+        """
+        Подписка на статистику
+
+        :param websocket:
+        :param mode: full - снимок целиком в каждом кадре;
+            delta - ключевой кадр при подключении и периодически, между ними только изменения.
+            Команда `resync` запрашивает ключевой кадр (например, при пропуске `seq`).
+        :param fmt: формат кадров; если не задан, выбирается по подпротоколу
+            `stats.<format>` (например, `stats.msgpack`), иначе json.
+            Для msgpack первым кадром приходит описание схемы, снимки передаются позиционными массивами.
+        :param topics: темы подписки - разделы (`cpu`, `lan`) или их элементы (`lan:eth0`);
+            по умолчанию все разделы, кроме `processes` (таблица процессов) и `network`
+            (потери, RTT и джиттер связи по интерфейсам). Команды `{"subscribe": [...]}` и `{"unsubscribe": [...]}`
+            меняют набор тем, ответ - `{"type": "subscription", "topics": [...]}`.
+            Разделы вне подписки не собираются и приходят как null.
+        :param interval: интервал кадров, сек; ограничивается пределами из конфигурации.
+            Команда `{"interval": 10}` меняет интервал.
+
+        Команда `ping` получает ответ `pong`. Оборванные соединения закрывает сервер ASGI
+        по ping-кадрам протокола WebSocket (`uvicorn --ws-ping-interval/--ws-ping-timeout`).
+
+        :raise APIError if topic is unknown or interval is not a finite number
+        """
+        try:
+            topics = parse_topics(topics) if topics else DEFAULT_TOPICS
+            interval = self._stats_scheduler.clamp(interval)
+        except ValueError as error:
+            raise APIError(str(error))
+
+        subprotocol = None
+        if fmt is None:
+            fmt = StatsFormat.JSON
+            for fmt_option in StatsFormat:
+                if f"stats.{fmt_option.value}" in websocket.scope.get("subprotocols", []):
+                    fmt = fmt_option
+                    subprotocol = f"stats.{fmt_option.value}"
+                    break
+
+        connection = await self._stats_ws_manager.connect(websocket, subprotocol=subprotocol)
+        await self._stats_publisher.attach(connection, mode, fmt, topics, interval)
+        self._stats_scheduler.update()
+        try:
+            while websocket.client_state == WebSocketState.CONNECTED:
+                command = await self._stats_ws_manager.receive_text(websocket)
+                if command == "resync":
+                    await self._stats_publisher.resync(connection)
+                elif command == "close":
+                    await self._stats_ws_manager.disconnect(websocket)
+                elif command and command.startswith("{"):
+                    await self._change_subscription(connection, command)
+                else:
+                    await self._stats_ws_manager.send_message(websocket, message=f"Unknown command: {command}")
+        finally:
+            self._stats_scheduler.update()
+
+    async def _change_subscription(self, connection, command: str) -> None:
+        websocket = connection.websocket
+        try:
+            request = json.loads(command)
+            topics = connection.options["topics"]
+            interval = connection.options["interval"]
+            if "subscribe" in request:
+                topics = parse_topics(request["subscribe"])
+            if "unsubscribe" in request:
+                topics = topics - parse_topics(request["unsubscribe"])
+            if "interval" in request:
+                interval = self._stats_scheduler.clamp(float(request["interval"]))
+        except (ValueError, TypeError, AttributeError) as error:
+            message = str(error) if str(error).startswith("Unknown topic") else f"Unknown command: {command}"
+            await self._stats_ws_manager.send_message(websocket, message=message)
+            return
+
+        await self._stats_publisher.update(connection, topics, interval)
+        self._stats_scheduler.update()
+        await self._stats_ws_manager.send_message(
+            websocket,
+            message={"type": "subscription", "topics": sorted(topics), "interval": interval},
+            json_mode="text"
+        )
+
+    @filters(roles=[UserRole.ADMIN])
+    async def get_connections(self) -> list[schemas.WSConnectionStat]:
+        """
+        Подписчики статистики: очередь, потерянные кадры и задержка отправки
+
+        """
+        return [schemas.WSConnectionStat(**info) for info in self._stats_ws_manager.get_connections_info()]
+
+    @filters(roles=[UserRole.ADMIN, UserRole.USER])
+    async def get_processes(self, limit: int = 10, sort: ProcessSort = ProcessSort.CPU) -> schemas.ProcessStat:
+        """
+        Верхние процессы по загрузке CPU или резидентной памяти
+
+        Загрузка CPU считается с прошлого сканирования таблицы процессов (общей с темой `processes`);
+        у процессов, появившихся после него, она null.
+        """
+        return await asyncio.to_thread(system_info.get_process_stat, limit, sort)
+
+    async def get_metrics(self, token: str = None) -> bytes:
+        """
+        Метрики в текстовом формате Prometheus
+
+        Доступ по bearer-токену из конфигурации (для Prometheus) или администратору.
+
+        :raise AccessDenied if token is invalid and user is not admin
+        """
+        if self._stats_exposition.check_token(token):
+            return self._stats_exposition.body()
+        return await self._get_metrics()
+
+    @filters(roles=[UserRole.ADMIN])
+    async def _get_metrics(self) -> bytes:
+        return self._stats_exposition.body()
+
+    @filters(roles=[UserRole.ADMIN, UserRole.USER])
+    async def get_history(
+            self,
+            metrics: list[str],
+            start: float = None,
+            end: float = None,
+            resolution: int = None
+    ) -> schemas.StatsHistory:
+        """
+        История статистики за диапазон времени
+
+        :param metrics: метрики или шаблоны (`cpu.percent`, `lan.*`)
+        :param start: начало диапазона, unix-время (по умолчанию - час назад)
+        :param end: конец диапазона, unix-время (по умолчанию - сейчас)
+        :param resolution: шаг, сек (3, 60, 3600); по умолчанию выбирается по диапазону
+
+        :raise NotFound if history is disabled
+        :raise APIError if range or resolution is invalid
+        """
+        if self._stats_history is None:
+            raise NotFound("Stats history is disabled")
+
+        now = time.time()
+        end = now if end is None else end
+        start = end - 60 * 60 if start is None else start
+        if start > end:
+            raise APIError("start must not be greater than end")
+
+        try:
+            history = self._stats_history.query(metrics, start, end, resolution, now)
+        except ValueError as error:
+            raise APIError(str(error))
+        return schemas.StatsHistory(**history)
+
+
+async def stat_worker(app):
+    publisher: StatsPublisher = app.state.stats_publisher
+    scheduler: StatsScheduler = app.state.stats_scheduler
+    history: Optional[StatsHistory] = app.state.stats_history
+    history_topics = app.state.stats_history_topics
+    alerts: Optional[AlertEngine] = app.state.stats_alerts
+    relay: Optional[StatsRelay] = app.state.stats_relay
+
+    # Собираются только разделы, нужные подписчикам, истории и правилам оповещений
+    sections = publisher.demand()
+    if relay is not None:
+        fallback = relay.fallback
+        try:
+            await relay.report_demand(sections, min(publisher.intervals(), default=None))
+            leader = relay.leader and not fallback
+            elected = await relay.elect()
+            if elected:
+                sections, remote_interval = await relay.cluster_demand()
+            relay.fallback = False
+        except RedisError:
+            # Без Redis процесс сам собирает статистику для своих подписчиков
+            if not fallback:
+                log.warning("Redis is unavailable, stats are sampled locally")
+            relay.fallback = True
+            elected, leader, remote_interval = True, fallback, None
+
+        if not elected:
+            remote_interval = None
+        if scheduler.remote_interval != remote_interval:
+            scheduler.remote_interval = remote_interval
+            scheduler.update()
+        if not elected:
+            return
+        if not leader:
+            # Новый сборщик: точки отсчёта ставятся сейчас, первый снимок - на следующем такте
+            app.state.stats_sampler.prime()
+            return
+    if history is not None:
+        sections |= topic_sections(history_topics)
+    if alerts is not None:
+        sections |= alerts.sections()
+    if sections:
+        sampler: StatsSampler = app.state.stats_sampler
+        snapshot = await sampler.collect(sections)
+        if relay is not None and not relay.fallback:
+            try:
+                await relay.publish(snapshot, sampler.snapshot_time, scheduler.interval)
+            except RedisError:
+                log.warning("Stats snapshot is not relayed: Redis is unavailable")
+        # Общие хранилища (файлы истории, уведомления) ведёт один процесс: сборщик ретранслятора
+        # или, если каждый процесс собирает статистику сам, лидер фоновых задач.
+        # Файлы истории дополнительно защищены блокировкой: без аренды лидером считает себя каждый процесс
+        owner = (relay is not None and not relay.fallback) or app.state.background_manager.leader
+        if history is not None:
+            if (owner or not history.persistent) and history.claim():
+                history.add(filter_snapshot(snapshot, history_topics), sampler.snapshot_time)
+            else:
+                history.release()
+        await publisher.publish(snapshot, tick=scheduler.interval)
+        if alerts is not None and owner:
+            await notify_alerts(app, alerts, snapshot, sampler.snapshot_time)
+
+
+async def relay_handler(app, snapshot: dict, timestamp: float, interval: float) -> None:
+    """
+    Рассылка снимка, собранного сборщиком другого процесса
+
+    История в памяти ведётся каждым процессом; файлы истории общие, их пишет только сборщик.
+    """
+    app.state.stats_sampler.accept(snapshot, timestamp)
+    history: Optional[StatsHistory] = app.state.stats_history
+    if history is not None and not history.persistent:
+        history.add(filter_snapshot(snapshot, app.state.stats_history_topics), timestamp)
+    await app.state.stats_publisher.publish(snapshot, tick=interval)
+
+
+async def notify_alerts(app, alerts: AlertEngine, snapshot: dict, timestamp: float) -> None:
+    for event in alerts.evaluate(metric_points(snapshot), timestamp):
+        if event.firing:
+            title = f"Alert: {event.rule}"
+            level = event.rule.level
+        else:
+            title = f"Resolved: {event.rule}"
+            level = NotifyLevel.INFO
+        if event.value is None:
+            description = f"{event.metric} is no longer reported"
+        else:
+            description = f"{event.metric} = {event.value:g} ({event.rule.aggregate})"
+        try:
+            await create_push_notification(
+                title=title,
+                description=description,
+                level=level,
+                redis_client=app.state.redis,
+            )
+        except RedisError:
+            # Состояние оповещения уже изменилось: уведомление теряется, такт статистики - нет
+            log.exception("Alert notification is not delivered: %s", title)
@@ -0,0 +1,269 @@
+import operator
+import re
+from collections import deque
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Callable, Optional
+
+from src.models.notify_level import NotifyLevel
+
+from .topics import DEFAULT_TOPICS, SECTIONS
+
+# Ширина гистерезиса по умолчанию: доля порога, на которую значение должно вернуться
+HYSTERESIS = 0.05
+
+# Минимальное время отсутствия метрики, после которого её оповещение снимается, сек
+STALE_AFTER = 30
+
+OPERATORS: dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+RULE_PATTERN = re.compile(
+    r"^(?P<metric>\S+)\s*(?P<op>>=|<=|>|<)\s*(?P<threshold>-?\d+(?:\.\d+)?)"
+    r"(?:\s+for\s+(?P<duration>\d+(?:\.\d+)?)s?)?"
+    r"(?:\s+using\s+(?P<aggregate>avg|min|max))?"
+    r"(?:\s+clear\s+(?P<clear>-?\d+(?:\.\d+)?))?"
+    r"(?:\s+level\s+(?P<level>info|warning|error))?$"
+)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """
+    Правило оповещения
+
+    :param pattern: метрика или шаблон (`cpu.percent`, `rom.volumes.*.percent`)
+    :param op: сравнение с порогом
+    :param threshold: порог срабатывания
+    :param duration: окно, сек; условие проверяется для агрегата значений за окно
+    :param aggregate: агрегат окна; по умолчанию min для `>`/`>=` (условие держится всё окно)
+        и max для `<`/`<=`
+    :param clear: порог снятия оповещения (гистерезис)
+    :param level: уровень уведомления
+    """
+    pattern: str
+    op: str
+    threshold: float
+    duration: float = 0
+    aggregate: str = None
+    clear: float = None
+    level: NotifyLevel = NotifyLevel.WARNING
+
+    def __str__(self) -> str:
+        text = f"{self.pattern} {self.op} {self.threshold:g}"
+        return f"{text} for {self.duration:g}s" if self.duration else text
+
+
+def parse_rules(value: str) -> list[AlertRule]:
+    """
+    Разбор правил из конфигурации; правила разделяются `;` или переводом строки
+
+    Формат: `<метрика> <op> <порог> [for <сек>] [using avg|min|max] [clear <порог>] [level info|warning|error]`,
+    например `cpu.percent > 90 for 60; rom.volumes.*.percent > 95 level error`.
+
+    :raise ValueError if rule is invalid
+    """
+    rules = []
+    for text in re.split(r"[;\n]", value):
+        text = text.strip()
+        if not text:
+            continue
+        match = RULE_PATTERN.match(text)
+        if match is None:
+            raise ValueError(f"Invalid alert rule: {text}")
+
+        op = match["op"]
+        threshold = float(match["threshold"])
+        aggregate = match["aggregate"] or ("min" if op.startswith(">") else "max")
+        if match["clear"] is not None:
+            clear = float(match["clear"])
+        elif op.startswith(">"):
+            clear = threshold - abs(threshold) * HYSTERESIS
+        else:
+            clear = threshold + abs(threshold) * HYSTERESIS
+        rules.append(AlertRule(
+            pattern=match["metric"],
+            op=op,
+            threshold=threshold,
+            duration=float(match["duration"] or 0),
+            aggregate=aggregate,
+            clear=clear,
+            level=NotifyLevel[match["level"].upper()] if match["level"] else NotifyLevel.WARNING,
+        ))
+    return rules
+
+
+class SlidingWindow:
+    """
+    Скользящее окно значений за `duration` секунд
+
+    min/max поддерживаются монотонными очередями, среднее - текущей суммой:
+    добавление значения стоит O(1) в среднем, без пересчёта окна.
+    """
+
+    def __init__(self, duration: float):
+        self.duration = duration
+        self.started: Optional[float] = None
+        self._values: deque[tuple[float, float]] = deque()
+        self._min: deque[tuple[float, float]] = deque()
+        self._max: deque[tuple[float, float]] = deque()
+        self._sum = 0.0
+
+    def add(self, timestamp: float, value: float) -> None:
+        if self._values and timestamp - self._values[-1][0] > self.duration:
+            # Разрыв в данных длиннее окна: окно заполняется заново
+            self.reset()
+        if self.started is None:
+            self.started = timestamp
+
+        self._values.append((timestamp, value))
+        self._sum += value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+
+        border = timestamp - self.duration
+        while self._values[0][0] < border:
+            self._sum -= self._values.popleft()[1]
+        while self._min[0][0] < border:
+            self._min.popleft()
+        while self._max[0][0] < border:
+            self._max.popleft()
+
+    def reset(self) -> None:
+        self.started = None
+        self._values.clear()
+        self._min.clear()
+        self._max.clear()
+        self._sum = 0.0
+
+    def full(self, timestamp: float) -> bool:
+        return self.started is not None and timestamp - self.started >= self.duration
+
+    def value(self, aggregate: str) -> float:
+        if aggregate == "min":
+            return self._min[0][1]
+        if aggregate == "max":
+            return self._max[0][1]
+        return self._sum / len(self._values)
+
+
+@dataclass
+class AlertEvent:
+    rule: AlertRule
+    metric: str
+    value: Optional[float]  # None - метрика пропала
+    firing: bool
+
+
+class AlertState:
+    def __init__(self, rule: AlertRule):
+        self.rule = rule
+        self.window = SlidingWindow(rule.duration)
+        self.active = False
+        self.seen_at: Optional[float] = None
+
+
+class AlertEngine:
+    """
+    Инкрементальная проверка правил оповещений по снимкам статистики
+
+    Правила индексируются по метрике: шаблон сопоставляется с метрикой один раз,
+    при её первом появлении, а каждый снимок обновляет только окна метрик, на которые
+    есть правила. Оповещение срабатывает, когда агрегат заполненного окна пересекает порог,
+    и снимается, только когда агрегат пересекает порог снятия (`clear`), поэтому
+    значение, колеблющееся у порога, не порождает серию уведомлений. Оповещение метрики,
+    которая перестала приходить (отключённый диск или интерфейс), снимается, когда её нет
+    дольше окна правила, но не меньше `STALE_AFTER`. Метрики, которых нет дольше окон
+    всех правил, удаляются из индекса, поэтому он не растёт со сменой дисков и интерфейсов.
+
+    :param rules: правила
+    """
+
+    def __init__(self, rules: list[AlertRule]):
+        self.rules = rules
+        self._index: dict[str, list[AlertState]] = {}
+        # Время последнего появления каждой встреченной метрики, в том числе без правил
+        self._seen: dict[str, float] = {}
+        self._firing: dict[AlertState, str] = {}
+        self._retention = max([rule.duration for rule in rules] + [STALE_AFTER])
+        self._pruned_at: Optional[float] = None
+
+    def sections(self) -> set[str]:
+        """
+        Разделы снимка, нужные правилам
+
+        """
+        sections = set()
+        for rule in self.rules:
+            section = rule.pattern.partition(".")[0]
+            sections |= {section} if section in SECTIONS else set(DEFAULT_TOPICS)
+        return sections
+
+    def _states(self, metric: str, timestamp: float) -> list[AlertState]:
+        if metric not in self._seen:
+            states = [AlertState(rule) for rule in self.rules if fnmatchcase(metric, rule.pattern)]
+            if states:
+                self._index[metric] = states
+        self._seen[metric] = timestamp
+        return self._index.get(metric, [])
+
+    def _prune(self, timestamp: float) -> None:
+        # Оповещения пропавших метрик к этому времени уже сняты; проверка - не чаще раза за окно
+        if self._pruned_at is not None and timestamp - self._pruned_at < self._retention:
+            return
+        self._pruned_at = timestamp
+        for metric, seen_at in list(self._seen.items()):
+            if timestamp - seen_at > self._retention:
+                del self._seen[metric]
+                self._index.pop(metric, None)
+
+    def evaluate(self, points: dict[str, float], timestamp: float) -> list[AlertEvent]:
+        """
+        Обновление окон значениями снимка
+
+        :param points: метрики снимка (см. `history.metric_points`)
+        :param timestamp: время снимка
+        :return: сработавшие и снятые оповещения
+        """
+        events = []
+        for metric, value in points.items():
+            for state in self._states(metric, timestamp):
+                rule = state.rule
+                state.seen_at = timestamp
+                state.window.add(timestamp, value)
+                if not state.window.full(timestamp):
+                    continue
+                aggregate = state.window.value(rule.aggregate)
+                compare = OPERATORS[rule.op]
+                if not state.active and compare(aggregate, rule.threshold):
+                    state.active = True
+                    self._firing[state] = metric
+                    events.append(AlertEvent(rule, metric, aggregate, firing=True))
+                elif state.active and not compare(aggregate, rule.clear):
+                    state.active = False
+                    del self._firing[state]
+                    events.append(AlertEvent(rule, metric, aggregate, firing=False))
+
+        for state, metric in list(self._firing.items()):
+            if timestamp - state.seen_at > max(state.rule.duration, STALE_AFTER):
+                state.active = False
+                state.window.reset()
+                del self._firing[state]
+                events.append(AlertEvent(state.rule, metric, None, firing=False))
+        self._prune(timestamp)
+        return events
+
+    def active(self) -> list[tuple[str, AlertRule]]:
+        """
+        Активные оповещения: (метрика, правило)
+
+        """
+        return [(metric, state.rule) for metric, states in self._index.items() for state in states if state.active]
@@ -0,0 +1,229 @@
+import hmac
+import time
+from typing import Any, Iterable, Optional
+
+from src.services.inventory import SystemInventory
+from src.utils.singleflight import SingleFlight
+from src.utils.wsmanager import WSConnectionManager
+
+from .alerts import AlertEngine
+from .history import StatsHistory
+from .relay import StatsRelay
+from .sampler import StatsSampler
+from .scheduler import StatsScheduler
+
+PREFIX = "webpanel"
+MIB = 1024 * 1024
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Writer:
+    """Построчная запись метрик в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str, samples: Iterable[tuple[dict, Optional[float]]]) -> None:
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if not samples:
+            return
+        name = f"{PREFIX}_{name}"
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if labels:
+                label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+                self.lines.append(f"{name}{{{label_text}}} {float(value)!r}")
+            else:
+                self.lines.append(f"{name} {float(value)!r}")
+
+    def body(self) -> bytes:
+        return ("\n".join(self.lines) + "\n").encode("utf-8")
+
+
+def _items(snapshot: dict, section: str, key: str) -> list[dict]:
+    data = snapshot.get(section)
+    return (data or {}).get(key) or []
+
+
+class MetricsExposition:
+    """
+    Метрики в текстовом формате Prometheus
+
+    Отображается последний снимок сборщика: `/metrics` никогда не запускает сбор.
+    Метрики снимка кэшируются до следующего такта сборщика, собственные метрики
+    (подписчики, очереди, счётчики) считаются при каждом опросе. Пока сборщик
+    приостановлен, снимок не обновляется: его возраст показывает
+    `sampler_snapshot_age_seconds`. Разделы, которые сборщик не собирал
+    (нет потребителей), в ответ не попадают.
+
+    :param sampler: сборщик статистики
+    :param ws_manager: подписчики статистики
+    :param scheduler: планировщик сборщика
+    :param history: история статистики
+    :param alerts: оповещения
+    :param token: bearer-токен для опроса без авторизации пользователя
+    :param relay: ретранслятор снимков между процессами
+    :param inventory: кэш сведений о системе
+    :param info_flight: объединение запросов сведений о системе
+    """
+
+    def __init__(
+            self,
+            sampler: StatsSampler,
+            ws_manager: WSConnectionManager,
+            scheduler: StatsScheduler = None,
+            history: Optional[StatsHistory] = None,
+            alerts: Optional[AlertEngine] = None,
+            token: str = None,
+            relay: Optional[StatsRelay] = None,
+            inventory: Optional[SystemInventory] = None,
+            info_flight: Optional[SingleFlight] = None
+    ):
+        self._sampler = sampler
+        self._ws_manager = ws_manager
+        self._scheduler = scheduler
+        self._history = history
+        self._alerts = alerts
+        self._token = token
+        self._relay = relay
+        self._inventory = inventory
+        self._info_flight = info_flight
+        self._tick: Optional[int] = None
+        self._system: Optional[list[str]] = None
+        self.renders = 0
+
+    def check_token(self, token: Optional[str]) -> bool:
+        return bool(self._token) and token is not None and hmac.compare_digest(token, self._token)
+
+    def body(self, now: float = None) -> bytes:
+        """
+        Тело ответа: метрики снимка текущего такта и собственные метрики на момент опроса
+
+        :param now: время опроса
+        """
+        if self._system is None or self._tick != self._sampler.ticks:
+            self._tick = self._sampler.ticks
+            self.renders += 1
+            writer = _Writer()
+            self._render_system(writer, self._sampler.snapshot or {})
+            self._system = writer.lines
+        writer = _Writer()
+        writer.lines.extend(self._system)
+        self._render_self(writer, time.time() if now is None else now)
+        return writer.body()
+
+    @staticmethod
+    def _render_system(writer: _Writer, snapshot: dict) -> None:
+        cpu = snapshot.get("cpu") or {}
+        writer.family("cpu_percent", "gauge", "CPU utilization, percent", [({}, cpu.get("percent"))])
+        writer.family("cpu_core_percent", "gauge", "CPU core utilization, percent", [
+            ({"core": index}, core.get("percent")) for index, core in enumerate(cpu.get("cores") or [])
+        ])
+        writer.family("cpu_temperature_celsius", "gauge", "CPU temperature", [({}, cpu.get("temperature"))])
+
+        ram = snapshot.get("ram") or {}
+        writer.family("memory_bytes", "gauge", "Memory, bytes", [
+            ({"kind": kind}, ram.get(f"{kind}_space") * MIB if ram.get(f"{kind}_space") is not None else None)
+            for kind in ("total", "used", "free")
+        ])
+        writer.family("swap_bytes", "gauge", "Swap, bytes", [
+            ({"kind": kind}, ram.get(f"swap_{kind}_space") * MIB if ram.get(f"swap_{kind}_space") is not None else None)
+            for kind in ("total", "used", "free")
+        ])
+
+        volumes = _items(snapshot, "rom", "volumes")
+        writer.family("volume_bytes", "gauge", "Volume space, bytes", [
+            ({"volume": volume["title"], "path": volume["path"], "kind": kind}, volume.get(f"{kind}_space"))
+            for volume in volumes for kind in ("total", "used", "free")
+        ])
+        writer.family("volume_used_percent", "gauge", "Volume usage, percent", [
+            ({"volume": volume["title"], "path": volume["path"]}, volume.get("percent")) for volume in volumes
+        ])
+
+        interfaces = _items(snapshot, "lan", "interfaces")
+        for direction, counter in (("receive", "recv"), ("transmit", "sent")):
+            writer.family(f"network_{direction}_bytes_total", "counter", f"Network bytes, {direction}", [
+                ({"interface": interface["title"]}, interface.get(f"bytes_{counter}")) for interface in interfaces
+            ])
+            writer.family(f"network_{direction}_bytes_per_second", "gauge", f"Network rate, {direction}", [
+                ({"interface": interface["title"]}, interface.get(f"bytes_{counter}_rate")) for interface in interfaces
+            ])
+
+        devices = _items(snapshot, "io", "devices")
+        for field, help_text in (
+                ("read_bytes_rate", "Disk read rate, bytes/s"),
+                ("write_bytes_rate", "Disk write rate, bytes/s"),
+                ("read_iops", "Disk read operations/s"),
+                ("write_iops", "Disk write operations/s"),
+                ("utilization", "Disk utilization, percent"),
+        ):
+            writer.family(f"disk_{field}", "gauge", help_text, [
+                ({"device": device["title"]}, device.get(field)) for device in devices
+            ])
+
+    def _render_self(self, writer: _Writer, now: float) -> None:
+        sampler = self._sampler
+        writer.family("sampler_ticks_total", "counter", "Stats sampler ticks", [({}, sampler.ticks)])
+        writer.family("sampler_tick_duration_seconds", "gauge", "Last sampler tick duration", [
+            ({}, sampler.tick_duration)
+        ])
+        writer.family("sampler_snapshot_timestamp_seconds", "gauge", "Last snapshot time", [
+            ({}, sampler.snapshot_time)
+        ])
+        writer.family("sampler_snapshot_age_seconds", "gauge", "Time since the last snapshot", [
+            ({}, now - sampler.snapshot_time if sampler.snapshot_time is not None else None)
+        ])
+        writer.family("sampler_collector_timeouts_total", "counter", "Collector timeouts", [
+            ({"collector": name}, count) for name, count in sampler.timeouts.items()
+        ])
+        writer.family("sampler_collector_errors_total", "counter", "Collector errors", [
+            ({"collector": name}, count) for name, count in sampler.errors.items()
+        ])
+        if self._scheduler is not None:
+            writer.family("sampler_interval_seconds", "gauge", "Sampler interval", [({}, self._scheduler.interval)])
+            writer.family("sampler_paused", "gauge", "Sampler is paused", [({}, self._scheduler.paused)])
+
+        connections = list(self._ws_manager.connections.values())
+        writer.family("ws_connections", "gauge", "Stats WebSocket subscribers", [({}, len(connections))])
+        writer.family("ws_pending_frames", "gauge", "Frames queued for subscribers", [
+            ({}, sum(connection.queue.qsize() for connection in connections))
+        ])
+        writer.family("ws_dropped_frames", "gauge", "Frames dropped for current subscribers", [
+            ({}, sum(connection.dropped for connection in connections))
+        ])
+        if self._history is not None:
+            writer.family("history_metrics", "gauge", "Metrics recorded to history", [({}, len(self._history.metrics))])
+            writer.family("history_dropped_metrics", "gauge", "Metrics not recorded: history metric limit reached", [
+                ({}, len(self._history.dropped))
+            ])
+        if self._alerts is not None:
+            writer.family("alerts_active", "gauge", "Active alerts", [({}, len(self._alerts.active()))])
+        if self._relay is not None:
+            writer.family("relay_leader", "gauge", "This worker runs the shared sampler", [({}, self._relay.leader)])
+            writer.family("relay_fallback", "gauge", "Redis is unavailable, this worker samples locally", [
+                ({}, self._relay.fallback)
+            ])
+            writer.family("relay_received_total", "counter", "Snapshots received from the shared sampler", [
+                ({}, self._relay.received)
+            ])
+        if self._inventory is not None:
+            writer.family("inventory_hits_total", "counter", "System info served from cache", [
+                ({}, self._inventory.hits)
+            ])
+            writer.family("inventory_loads_total", "counter", "System info component loads", [
+                ({"component": component.value}, count) for component, count in self._inventory.loads.items()
+            ])
+        if self._info_flight is not None:
+            writer.family("singleflight_calls_total", "counter", "Executed info operations", [
+                ({"operation": key}, count) for key, count in self._info_flight.calls.items()
+            ])
+            writer.family("singleflight_coalesced_total", "counter", "Info requests that awaited a running operation", [
+                ({"operation": key}, count) for key, count in self._info_flight.coalesced.items()
+            ])
+        writer.family("metrics_renders_total", "counter", "Snapshots rendered for /metrics", [({}, self.renders)])
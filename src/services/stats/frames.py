@@ -0,0 +1,148 @@
+import json
+import zlib
+from typing import Any, Optional, Type
+
+import msgpack
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_SINGLETON
+
+from src.models.stats_format import StatsFormat
+from src.utils.wsmanager import encode_message
+
+
+def flatten(data: Any, prefix: str = "") -> dict[str, Any]:
+    """
+    Разворачивание вложенного снимка в плоский словарь путей
+
+    `{"cpu": {"cores": [{"percent": 1.0}]}}` -> `{"cpu.cores.0.percent": 1.0}`
+
+    :param data: снимок (dict/list/скаляр)
+    :param prefix: префикс пути
+    """
+    flat = {}
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        flat[prefix] = data
+        return flat
+
+    for key, value in items:
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, (dict, list)) and value:
+            flat.update(flatten(value, path))
+        else:
+            flat[path] = value
+    return flat
+
+
+class DeltaEncoder:
+    """
+    Кодировщик потока кадров: ключевой кадр + дельты
+
+    Ключевой кадр (`type=keyframe`) содержит снимок целиком, дельта (`type=delta`) - только
+    изменившиеся поля в виде плоских путей. Номер кадра `seq` растёт на единицу, поэтому
+    клиент обнаруживает пропуск и запрашивает ключевой кадр командой `resync`.
+    Ключевой кадр формируется также при изменении структуры снимка (набора путей)
+    и каждые `keyframe_interval` кадров.
+
+    :param keyframe_interval: период ключевых кадров
+    """
+
+    def __init__(self, keyframe_interval: int = 20):
+        self.seq = 0
+        self._keyframe_interval = keyframe_interval
+        self._since_keyframe = 0
+        self._snapshot: Optional[dict] = None
+        self._flat: Optional[dict[str, Any]] = None
+
+    def encode(self, snapshot: dict) -> dict[str, Any]:
+        flat = flatten(snapshot)
+        self.seq += 1
+        is_keyframe = (
+            self._flat is None
+            or self._since_keyframe >= self._keyframe_interval
+            or flat.keys() != self._flat.keys()
+        )
+        if is_keyframe:
+            changes = None
+            self._since_keyframe = 0
+        else:
+            changes = {path: value for path, value in flat.items() if self._flat[path] != value}
+            self._since_keyframe += 1
+
+        self._snapshot = snapshot
+        self._flat = flat
+        if changes is None:
+            return self.keyframe()
+        return {"type": "delta", "seq": self.seq, "changes": changes}
+
+    def keyframe(self) -> Optional[dict[str, Any]]:
+        """
+        Ключевой кадр последнего снимка (для новых подписчиков и resync)
+
+        """
+        if self._snapshot is None:
+            return None
+        return {"type": "keyframe", "seq": self.seq, "data": self._snapshot}
+
+
+def build_layout(model: Type[BaseModel]) -> list:
+    """
+    Позиционная раскладка модели для компактного формата
+
+    Скалярное поле описывается именем, вложенная модель - `{"name", "list", "fields"}`.
+    """
+    layout = []
+    for name, field in model.__fields__.items():
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            layout.append({
+                "name": name,
+                "list": field.shape != SHAPE_SINGLETON,
+                "fields": build_layout(field.type_),
+            })
+        else:
+            layout.append(name)
+    return layout
+
+
+def pack(data: Optional[dict], layout: list) -> Optional[list]:
+    """
+    Упаковка словаря в позиционный массив по раскладке `build_layout`
+
+    """
+    if data is None:
+        return None
+    packed = []
+    for field in layout:
+        if isinstance(field, str):
+            packed.append(data.get(field))
+            continue
+        value = data.get(field["name"])
+        if value is not None and field["list"]:
+            packed.append([pack(item, field["fields"]) for item in value])
+        else:
+            packed.append(pack(value, field["fields"]))
+    return packed
+
+
+def schema_descriptor(model: Type[BaseModel], fmt: StatsFormat) -> dict[str, Any]:
+    """
+    Описание схемы компактного формата; отправляется один раз на подключение
+
+    Версия - контрольная сумма раскладки, поэтому меняется вместе с моделью.
+    """
+    layout = build_layout(model)
+    version = zlib.crc32(json.dumps(layout, separators=(",", ":")).encode("utf-8"))
+    return {"type": "schema", "format": fmt.value, "version": version, "layout": layout}
+
+
+def encode_frame(message: dict | list, fmt: StatsFormat) -> dict[str, Any]:
+    """
+    Сериализация кадра статистики в выбранном формате
+
+    """
+    if fmt == StatsFormat.MSGPACK:
+        return {"type": "websocket.send", "bytes": msgpack.packb(message, use_bin_type=True)}
+    return encode_message(message)
@@ -0,0 +1,462 @@
+import fcntl
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+from fnmatch import fnmatchcase
+from typing import Any, Iterable, Optional
+
+# (шаг, окно) уровней истории, сек
+TIERS: tuple[tuple[int, int], ...] = (
+    (3, 60 * 60),
+    (60, 24 * 60 * 60),
+    (60 * 60, 30 * 24 * 60 * 60),
+)
+
+NAN = float("nan")
+NAN_BYTES = struct.pack('<d', NAN)
+
+
+def parse_tiers(value: str) -> tuple[tuple[int, int], ...]:
+    """
+    Разбор уровней истории из конфигурации: `3:3600,60:86400,3600:2592000`
+
+    """
+    tiers = []
+    for item in value.split(","):
+        step, window = item.strip().split(":")
+        tiers.append((int(step), int(window)))
+    return tuple(tiers)
+
+
+def metric_points(snapshot: dict) -> dict[str, float]:
+    """
+    Числовые метрики снимка статистики
+
+    Элементы списков именуются по `title`, если он есть, иначе по индексу:
+    `cpu.percent`, `cpu.cores.0.percent`, `rom.volumes.sda1.percent`, `lan.interfaces.eth0.bytes_recv`.
+    """
+    points = {}
+
+    def walk(data: Any, prefix: str) -> None:
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key != "title":
+                    walk(value, f"{prefix}.{key}" if prefix else key)
+        elif isinstance(data, list):
+            for index, item in enumerate(data):
+                name = item.get("title") if isinstance(item, dict) else None
+                walk(item, f"{prefix}.{name if name is not None else index}")
+        elif isinstance(data, (int, float)) and not isinstance(data, bool):
+            points[prefix] = float(data)
+
+    walk(snapshot, "")
+    return points
+
+
+class HistoryTier:
+    """
+    Кольцевой буфер одного уровня истории
+
+    Слот кольца соответствует интервалу длиной `step`; хранится время начала интервала,
+    а для каждой метрики - avg и число значений (уровень с агрегатами хранит также min/max).
+    Буфер фиксированного размера выделяется сразу под `max_metrics` метрик: в памяти
+    или в файле, отображённом в память (`path`). Файл имеет фиксированную раскладку:
+    заголовок, метки времени, затем ряды метрик, поэтому при повторном открытии
+    ничего не разбирается, а запрос читает только нужные ряды.
+
+    :param step: длина интервала, сек
+    :param window: глубина хранения, сек
+    :param aggregate: хранить min/max
+    :param max_metrics: число рядов метрик
+    :param path: файл уровня; без него буфер хранится только в памяти
+    """
+    HEADER = struct.Struct('<8sqqqq')
+    MAGIC = b'WPSTATS1'
+
+    def __init__(self, step: int, window: int, aggregate: bool = True, max_metrics: int = 128, path: str = None):
+        self.step = step
+        self.window = window
+        self.capacity = window // step
+        self.aggregate = aggregate
+        self.path = path
+        self._nseries = 4 if aggregate else 2
+        self._max_metrics = max_metrics
+        self._file = None
+
+        header = self.HEADER.pack(self.MAGIC, step, self.capacity, max_metrics, self._nseries)
+        size = self.HEADER.size + self.capacity * 8 * (1 + max_metrics * self._nseries)
+        if path is None:
+            self._buffer = bytearray(header) + bytearray(NAN_BYTES * (size // 8 - self.HEADER.size // 8))
+        else:
+            self._buffer = self._open(path, header, size)
+
+        view = memoryview(self._buffer)
+        offset = self.HEADER.size
+        row = self.capacity * 8
+        self.timestamps = view[offset:offset + row].cast('d')
+        self._rows = []
+        for index in range(max_metrics):
+            start = offset + row * (1 + index * self._nseries)
+            self._rows.append(tuple(
+                view[start + row * series:start + row * (series + 1)].cast('d')
+                for series in range(self._nseries)
+            ))
+        self._view = view
+        self.series: dict[str, tuple] = {}
+
+    def _open(self, path: str, header: bytes, size: int) -> mmap.mmap:
+        exists = os.path.exists(path)
+        self._file = open(path, "r+b" if exists else "w+b")
+        if exists and (os.path.getsize(path) != size or self._file.read(len(header)) != header):
+            logging.getLogger(__name__).warning("Stats history file %s has another layout, recreating", path)
+            exists = False
+        if not exists:
+            self._file.seek(0)
+            self._file.truncate()
+            self._file.write(header)
+            self._file.write(NAN_BYTES * (size // 8 - len(header) // 8))
+            self._file.flush()
+        return mmap.mmap(self._file.fileno(), size)
+
+    def add_metric(self, name: str, index: int) -> None:
+        self.series[name] = self._rows[index]
+
+    def remove_metric(self, name: str, clear: bool = True) -> None:
+        arrays = self.series.pop(name, None)
+        if arrays is not None and clear:
+            for values in arrays:
+                for slot in range(self.capacity):
+                    values[slot] = NAN
+
+    def seen(self, name: str, now: float) -> bool:
+        """
+        Есть ли у метрики значения в пределах окна уровня
+
+        """
+        counts = self.series[name][-1]
+        horizon = now - self.window
+        return any(
+            self.timestamps[slot] >= horizon and not math.isnan(counts[slot])
+            for slot in range(self.capacity)
+        )
+
+    def add(self, timestamp: float, points: dict[str, float]) -> None:
+        bucket = int(timestamp // self.step)
+        slot = bucket % self.capacity
+        if self.timestamps[slot] != bucket * self.step:
+            self.timestamps[slot] = bucket * self.step
+            for arrays in self.series.values():
+                for values in arrays:
+                    values[slot] = NAN
+
+        for name, value in points.items():
+            arrays = self.series.get(name)
+            if arrays is None:
+                continue
+            counts = arrays[-1]
+            count = 1 if math.isnan(counts[slot]) else counts[slot] + 1
+            counts[slot] = count
+            avg = arrays[0]
+            avg[slot] = value if count == 1 else avg[slot] + (value - avg[slot]) / count
+            if self.aggregate:
+                low, high = arrays[1], arrays[2]
+                low[slot] = value if count == 1 else min(low[slot], value)
+                high[slot] = value if count == 1 else max(high[slot], value)
+
+    def query(self, names: Iterable[str], start: float, end: float) -> tuple[list[float], dict[str, tuple[list, ...]]]:
+        slots = sorted(
+            (self.timestamps[slot], slot) for slot in range(self.capacity)
+            if start <= self.timestamps[slot] <= end
+        )
+        timestamps = [timestamp for timestamp, _ in slots]
+        series = {}
+        for name in names:
+            series[name] = tuple(
+                [None if math.isnan(values[slot]) else values[slot] for _, slot in slots]
+                for values in self.series[name][:-1]
+            )
+        return timestamps, series
+
+    def flush(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.series.clear()
+        for arrays in self._rows:
+            for values in arrays:
+                values.release()
+        self.timestamps.release()
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        if self._file:
+            self._file.close()
+
+
+class StatsHistory:
+    """
+    Многоуровневая история статистики
+
+    Уровни (см. TIERS): сырые значения с шагом 3 с за час, минутные min/avg/max за сутки,
+    часовые min/avg/max за 30 дней. Объём памяти ограничен числом метрик `max_metrics`
+    и не зависит от времени работы.
+
+    Когда места под новые метрики нет, занимаются ряды метрик, не встречавшихся
+    на протяжении окон всех уровней (исчезнувшие интерфейсы, диски): их данные уже
+    вытеснены, поэтому ничего не теряется. Такие ряды ищутся не чаще раза за шаг
+    последнего уровня. Метрики, для которых места не нашлось, не записываются
+    и перечислены в `dropped`.
+
+    С `path` каждый уровень хранится в файле `tier-<шаг>.bin`, отображённом в память,
+    а имена метрик - в `metrics.json`; история переживает перезапуск. Запись идёт
+    в страничный кэш, на диск изменения сбрасываются не чаще раза в `flush_interval`.
+    Файлы общие для процессов хоста, но пишет в них один процесс - захвативший
+    блокировку хранилища (см. `claim`); остальные только читают.
+
+    :param max_metrics: максимальное число отслеживаемых метрик
+    :param tiers: уровни (шаг, окно); окно уровня задаёт срок хранения
+    :param path: каталог хранилища
+    :param flush_interval: период сброса на диск, сек
+    """
+
+    def __init__(
+            self,
+            max_metrics: int = 128,
+            tiers: tuple[tuple[int, int], ...] = TIERS,
+            path: str = None,
+            flush_interval: float = 60
+    ):
+        self._max_metrics = max_metrics
+        self._path = path
+        self._flush_interval = flush_interval
+        self._flushed_at = time.monotonic()
+        self._lock_fd: Optional[int] = None
+        self._log = logging.getLogger(__name__)
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self.tiers = [
+            HistoryTier(
+                step, window,
+                aggregate=index > 0,
+                max_metrics=max_metrics,
+                path=os.path.join(path, f"tier-{step}.bin") if path is not None else None,
+            )
+            for index, (step, window) in enumerate(tiers)
+        ]
+        self.metrics: list[str] = []
+        self._known: set[str] = set()
+        self._metrics_mtime: Optional[float] = None
+        self._reclaimable: list[int] = []
+        self._scanned_at: Optional[float] = None
+        self.dropped: set[str] = set()
+        for name in self._load_metrics():
+            self._register(name)
+
+    @property
+    def persistent(self) -> bool:
+        return self._path is not None
+
+    def claim(self) -> bool:
+        """
+        Захват права записи в хранилище
+
+        Право закреплено блокировкой `flock` на файле `.lock` каталога хранилища, держится
+        до `release` и снимается ядром при завершении процесса. История в памяти
+        принадлежит процессу, право записи в неё есть всегда.
+
+        :return: процесс может писать историю
+        """
+        if self._path is None or self._lock_fd is not None:
+            return True
+        fd = os.open(os.path.join(self._path, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        self._log.info("Stats history %s is written by this process", self._path)
+        return True
+
+    def release(self) -> None:
+        """
+        Передача права записи в хранилище другому процессу
+
+        """
+        if self._lock_fd is None:
+            return
+        self.flush()
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        os.close(self._lock_fd)
+        self._lock_fd = None
+
+    def _metrics_path(self) -> Optional[str]:
+        return os.path.join(self._path, "metrics.json") if self._path is not None else None
+
+    def _load_metrics(self) -> list[str]:
+        path = self._metrics_path()
+        if path is None or not os.path.exists(path):
+            return []
+        self._metrics_mtime = os.path.getmtime(path)
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)[:self._max_metrics]
+
+    def _save_metrics(self) -> None:
+        path = self._metrics_path()
+        if path is None:
+            return
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(self.metrics, file)
+        os.replace(f"{path}.tmp", path)
+        self._metrics_mtime = os.path.getmtime(path)
+
+    def reload(self) -> None:
+        """
+        Подхват метрик, добавленных другим процессом в то же хранилище
+
+        Уровни отображены в общие файлы, поэтому значения видны сразу,
+        перечитать нужно только список имён метрик.
+        """
+        path = self._metrics_path()
+        if path is None or not os.path.exists(path) or os.path.getmtime(path) == self._metrics_mtime:
+            return
+        for index, name in enumerate(self._load_metrics()):
+            if index >= len(self.metrics) or self.metrics[index] != name:
+                # Ряд уже очищен процессом, занявшим его
+                self._register(name, index, clear=False)
+
+    def _register(self, name: str, index: int = None, clear: bool = True) -> None:
+        if index is None or index == len(self.metrics):
+            self.metrics.append(name)
+            index = len(self.metrics) - 1
+        else:
+            previous = self.metrics[index]
+            self._known.discard(previous)
+            for tier in self.tiers:
+                tier.remove_metric(previous, clear)
+            self.metrics[index] = name
+        self._known.add(name)
+        self.dropped.discard(name)
+        for tier in self.tiers:
+            tier.add_metric(name, index)
+
+    def _reclaim_due(self, timestamp: float) -> bool:
+        return self._scanned_at is None or timestamp - self._scanned_at >= self.tiers[-1].step
+
+    def _free_slot(self, timestamp: float, points: dict[str, float]) -> Optional[int]:
+        if len(self.metrics) < self._max_metrics:
+            return len(self.metrics)
+        if not self._reclaimable and self._reclaim_due(timestamp):
+            self._scanned_at = timestamp
+            self._reclaimable = [
+                index for index, name in enumerate(self.metrics)
+                if not any(tier.seen(name, timestamp) for tier in self.tiers)
+            ]
+        while self._reclaimable:
+            index = self._reclaimable.pop(0)
+            if self.metrics[index] not in points:
+                return index
+        return None
+
+    def add(self, snapshot: dict, timestamp: float = None) -> None:
+        """
+        Добавление снимка статистики во все уровни
+
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self.reload()
+        points = metric_points(snapshot)
+        retry = self._reclaim_due(timestamp)
+        new_metrics = False
+        for name in points:
+            if name in self._known or (name in self.dropped and not retry):
+                continue
+            index = self._free_slot(timestamp, points)
+            if index is None:
+                if name not in self.dropped:
+                    self._log.warning(
+                        "Stats history metric limit (%s) reached, %s is not recorded; "
+                        "raise HISTORY_MAX_METRICS or narrow HISTORY_TOPICS", self._max_metrics, name
+                    )
+                    self.dropped.add(name)
+                continue
+            self._register(name, index)
+            new_metrics = True
+        if new_metrics:
+            self._save_metrics()
+
+        for tier in self.tiers:
+            tier.add(timestamp, points)
+
+        if time.monotonic() - self._flushed_at >= self._flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        for tier in self.tiers:
+            tier.flush()
+        self._flushed_at = time.monotonic()
+
+    def close(self) -> None:
+        self.release()
+        for tier in self.tiers:
+            tier.close()
+
+    def select(self, patterns: Iterable[str]) -> list[str]:
+        """
+        Метрики по списку шаблонов (`cpu.percent`, `lan.*`)
+
+        """
+        patterns = list(patterns)
+        return [name for name in self.metrics if any(fnmatchcase(name, pattern) for pattern in patterns)]
+
+    def pick_tier(self, start: float, resolution: int = None, now: float = None) -> HistoryTier:
+        """
+        Уровень с заданным шагом, иначе самый подробный, покрывающий начало диапазона
+
+        """
+        if resolution is not None:
+            for tier in self.tiers:
+                if tier.step == resolution:
+                    return tier
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        now = time.time() if now is None else now
+        for tier in self.tiers:
+            if now - start <= tier.window:
+                return tier
+        return self.tiers[-1]
+
+    def query(
+            self,
+            patterns: Iterable[str],
+            start: float,
+            end: float,
+            resolution: int = None,
+            now: float = None
+    ) -> dict[str, Any]:
+        self.reload()
+        tier = self.pick_tier(start, resolution, now)
+        names = self.select(patterns)
+        timestamps, series = tier.query(names, start, end)
+        return {
+            "resolution": tier.step,
+            "start": start,
+            "end": end,
+            "timestamps": timestamps,
+            "series": [
+                {
+                    "metric": name,
+                    "min": values[1] if tier.aggregate else None,
+                    "avg": values[0],
+                    "max": values[2] if tier.aggregate else None,
+                }
+                for name, values in series.items()
+            ],
+        }
@@ -0,0 +1,161 @@
+import time
+from typing import Any
+
+from src.models import schemas
+from src.models.stats_format import StatsFormat
+from src.models.stats_mode import StatsMode
+from src.services.stats.frames import DeltaEncoder, build_layout, encode_frame, pack, schema_descriptor
+from src.services.stats.topics import DEFAULT_TOPICS, filter_snapshot, topic_sections
+from src.utils.wsmanager import WSConnection, WSConnectionManager
+
+StreamKey = tuple[StatsFormat, frozenset[str], float]
+
+
+class StatsPublisher:
+    """
+    Публикация снимков статистики подписчикам
+
+    Подписчики группируются по режиму, формату, набору тем и интервалу: каждый кадр группы
+    сериализуется один раз и отправляется всем её участникам. Снимки приходят с частотой
+    общего сборщика, группа с более редким интервалом получает только каждый n-й из них.
+
+    :param ws_manager: менеджер подключений
+    :param keyframe_interval: период ключевых кадров дельта-потока
+    """
+
+    def __init__(self, ws_manager: WSConnectionManager, keyframe_interval: int = 20):
+        self._ws_manager = ws_manager
+        self._keyframe_interval = keyframe_interval
+        self._encoders: dict[StreamKey, DeltaEncoder] = {}
+        self._sent_at: dict[StreamKey, float] = {}
+        self._layout = build_layout(schemas.SystemStat)
+        self._schema_frames = {
+            fmt: encode_frame(schema_descriptor(schemas.SystemStat, fmt), fmt)
+            for fmt in StatsFormat if fmt != StatsFormat.JSON
+        }
+
+    @staticmethod
+    def _stream_key(connection: WSConnection) -> StreamKey:
+        return (
+            connection.options.get("format", StatsFormat.JSON),
+            connection.options.get("topics", DEFAULT_TOPICS),
+            connection.options.get("interval", 0),
+        )
+
+    def _encoder(self, key: StreamKey) -> DeltaEncoder:
+        if key not in self._encoders:
+            self._encoders[key] = DeltaEncoder(self._keyframe_interval)
+        return self._encoders[key]
+
+    async def attach(
+            self,
+            connection: WSConnection,
+            mode: StatsMode = StatsMode.FULL,
+            fmt: StatsFormat = StatsFormat.JSON,
+            topics: frozenset[str] = DEFAULT_TOPICS,
+            interval: float = 0
+    ) -> None:
+        """
+        Настройка потока подписчика
+
+        Для компактного формата сначала отправляется описание схемы,
+        в дельта-режиме - сразу ключевой кадр.
+        """
+        connection.options["mode"] = mode
+        connection.options["format"] = fmt
+        connection.options["topics"] = topics
+        connection.options["interval"] = interval
+        if fmt in self._schema_frames:
+            await self._ws_manager.enqueue(connection, self._schema_frames[fmt])
+        if mode == StatsMode.DELTA:
+            await self.resync(connection)
+
+    async def update(self, connection: WSConnection, topics: frozenset[str] = None, interval: float = None) -> None:
+        """
+        Смена тем или интервала подписчика; подписчик дельта-потока получает ключевой кадр нового потока
+
+        """
+        if topics is not None:
+            connection.options["topics"] = topics
+        if interval is not None:
+            connection.options["interval"] = interval
+        if connection.options.get("mode") == StatsMode.DELTA:
+            await self.resync(connection)
+
+    async def resync(self, connection: WSConnection) -> None:
+        """
+        Повторная отправка ключевого кадра подписчику дельта-потока
+
+        """
+        key = self._stream_key(connection)
+        encoder = self._encoders.get(key)
+        keyframe = encoder.keyframe() if encoder else None
+        if keyframe is not None:
+            await self._ws_manager.enqueue(connection, encode_frame(keyframe, key[0]))
+
+    def demand(self) -> set[str]:
+        """
+        Разделы снимка, на которые есть хотя бы один подписчик
+
+        """
+        sections = set()
+        for connection in self._ws_manager.connections.values():
+            sections |= topic_sections(connection.options.get("topics", DEFAULT_TOPICS))
+        return sections
+
+    def intervals(self) -> set[float]:
+        """
+        Интервалы, запрошенные подписчиками
+
+        """
+        return {
+            connection.options["interval"] for connection in self._ws_manager.connections.values()
+            if "interval" in connection.options
+        }
+
+    async def publish(self, snapshot: dict, tick: float = 0, now: float = None) -> None:
+        """
+        Отправка снимка группам, у которых подошёл интервал
+
+        :param snapshot: снимок статистики
+        :param tick: интервал сборщика, сек; группа получает снимок, если с прошлой отправки
+            прошло не меньше её интервала за вычетом половины такта
+        :param now: монотонное время снимка
+        """
+        now = time.monotonic() if now is None else now
+        groups: dict[tuple[StatsMode, StreamKey], list[WSConnection]] = {}
+        for connection in self._ws_manager.connections.values():
+            key = (connection.options.get("mode", StatsMode.FULL), self._stream_key(connection))
+            groups.setdefault(key, []).append(connection)
+
+        due = {
+            key for _, key in groups
+            if key not in self._sent_at or now - self._sent_at[key] >= key[2] - tick / 2
+        }
+        payloads: dict[StreamKey, Any] = {}
+        for (mode, key), connections in groups.items():
+            if key not in due:
+                continue
+            if key not in payloads:
+                fmt, topics, _ = key
+                payload = filter_snapshot(snapshot, topics)
+                payloads[key] = payload if fmt == StatsFormat.JSON else pack(payload, self._layout)
+
+            if mode == StatsMode.DELTA:
+                message = self._encoder(key).encode(payloads[key])
+            else:
+                message = payloads[key]
+            await self._ws_manager.broadcast_frame(encode_frame(message, key[0]), connections)
+
+        for key in due:
+            self._sent_at[key] = now
+
+        # Потоки без подписчиков больше не нужны
+        active = {key for mode, key in groups if mode == StatsMode.DELTA}
+        for key in list(self._encoders):
+            if key not in active:
+                del self._encoders[key]
+        streams = {key for _, key in groups}
+        for key in list(self._sent_at):
+            if key not in streams:
+                del self._sent_at[key]
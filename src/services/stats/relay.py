@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Iterable, Optional
+
+from redis.exceptions import RedisError
+
+from src.utils.bgmanager import Lease
+from src.utils.redis import RedisClient
+
+SnapshotHandler = Callable[[dict, float, float], Awaitable[None]]
+
+
+class StatsRelay:
+    """
+    Распространение снимков статистики между процессами через Redis
+
+    Собирает статистику один процесс - владелец аренды `lease` (та же аренда, что выбирает
+    лидера фоновых задач, см. `BGManager`); снимок публикуется в канал `channel`, и каждый
+    процесс рассылает его своим подписчикам, кодируя кадры локально (дельта-потоки, темы
+    и интервалы - состояние отдельных сокетов).
+    Процессы каждый такт сообщают свою потребность (разделы и минимальный интервал)
+    в хеш `demand_key`; сборщик собирает объединение потребностей. Записи процессов,
+    не обновлявшиеся дольше срока аренды, не учитываются. Если владелец аренды
+    пропал, её захватывает другой процесс не позже чем через срок аренды и ещё
+    один такт: выборы идут каждый такт сборщика.
+    Пока Redis недоступен, каждый процесс собирает статистику сам (`fallback`).
+
+    :param redis_client: клиент Redis
+    :param lease: аренда сборщика; срок аренды должен быть больше интервала сборщика
+    :param channel: канал снимков
+    :param demand_key: хеш потребностей процессов
+    """
+
+    def __init__(
+            self,
+            redis_client: RedisClient,
+            lease: Lease,
+            channel: str = "stats:snapshot",
+            demand_key: str = "stats:demand"
+    ):
+        self._redis = redis_client
+        self._lease = lease
+        self.worker_id = lease.owner
+        self._channel = channel
+        self._demand_key = demand_key
+        self._listener: Optional[asyncio.Task] = None
+        self._log = logging.getLogger(__name__)
+        self.leader = False
+        # Redis недоступен: процесс собирает статистику для своих подписчиков сам
+        self.fallback = False
+        self.elections = 0
+        self.received = 0
+
+    async def elect(self) -> bool:
+        """
+        Захват или продление аренды сборщика
+
+        :return: True, если сборщик - этот процесс
+        """
+        leader = await self._lease.acquire()
+        if leader and not self.leader:
+            self.elections += 1
+            self._log.info("Stats sampler lease acquired by %s", self.worker_id)
+        self.leader = leader
+        return leader
+
+    async def report_demand(self, sections: Iterable[str], interval: Optional[float]) -> None:
+        """
+        Потребность процесса: разделы и минимальный интервал его подписчиков
+
+        """
+        value = json.dumps({"sections": sorted(sections), "interval": interval, "time": time.time()})
+        await self._redis.hset(self._demand_key, self.worker_id, value)
+
+    async def cluster_demand(self, now: float = None) -> tuple[set[str], Optional[float]]:
+        """
+        Объединение потребностей процессов: разделы и минимальный интервал
+
+        """
+        now = time.time() if now is None else now
+        sections, intervals, stale = set(), set(), []
+        for worker_id, value in (await self._redis.hgetall(self._demand_key)).items():
+            demand = json.loads(value)
+            if now - demand["time"] > self._lease.ttl:
+                stale.append(worker_id)
+                continue
+            sections.update(demand["sections"])
+            if demand["interval"] is not None:
+                intervals.add(demand["interval"])
+        if stale:
+            await self._redis.hdel(self._demand_key, *stale)
+        return sections, min(intervals, default=None)
+
+    async def publish(self, snapshot: dict, timestamp: float, interval: float) -> None:
+        """
+        Публикация снимка остальным процессам
+
+        :param snapshot: снимок статистики
+        :param timestamp: время снимка
+        :param interval: интервал сборщика, сек
+        """
+        message = json.dumps({
+            "worker": self.worker_id,
+            "time": timestamp,
+            "interval": interval,
+            "snapshot": snapshot,
+        })
+        await self._redis.publish(self._channel, message)
+
+    async def listen(self, handler: SnapshotHandler) -> None:
+        """
+        Получение снимков других процессов до отмены задачи
+
+        :param handler: вызывается со снимком, его временем и интервалом сборщика
+        """
+        while True:
+            try:
+                await self._listen(handler)
+            except RedisError:
+                self._log.exception("Stats relay subscription failed, reconnecting")
+                await asyncio.sleep(1)
+
+    async def _listen(self, handler: SnapshotHandler) -> None:
+        pubsub = self._redis.pubsub()
+        try:
+            await pubsub.subscribe(self._channel)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                data = json.loads(message["data"])
+                # Свои снимки процесс рассылает подписчикам сам, не дожидаясь Redis
+                if data["worker"] == self.worker_id:
+                    continue
+                self.received += 1
+                try:
+                    await handler(data["snapshot"], data["time"], data["interval"])
+                except Exception:
+                    self._log.exception("Relayed stats snapshot handling failed")
+        finally:
+            await pubsub.close()
+
+    def start(self, handler: SnapshotHandler) -> None:
+        self._listener = asyncio.create_task(self.listen(handler))
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        try:
+            await self._redis.hdel(self._demand_key, self.worker_id)
+        except RedisError:
+            pass
+        if self.leader:
+            await self._lease.release()
+        self.leader = False
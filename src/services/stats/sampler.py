@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+from pydantic import BaseModel
+
+from src.models import schemas
+from src.utils import system_info
+
+DEFAULT_COLLECTORS: dict[str, Callable[[], BaseModel]] = {
+    "cpu": system_info.get_cpu_stat,
+    "ram": system_info.get_ram_stat,
+    "rom": system_info.get_rom_stat,
+    "lan": system_info.get_lan_stat,
+    "io": system_info.get_io_stat,
+    "processes": system_info.get_process_stat,
+}
+
+# Подготовка сборщиков, считающих значения между двумя вызовами
+DEFAULT_PRIMERS: dict[str, Callable[[], None]] = {
+    "cpu": system_info.prime_cpu_stat,
+}
+
+
+class StatsSampler:
+    """
+    Сборщик снимков статистики
+
+    Блокирующие сборщики (psutil, lsblk) выполняются в отдельном пуле потоков,
+    цикл событий только ожидает готовый снимок. Если сборщик не уложился в таймаут
+    или упал, в снимок попадает его последнее удачное значение; пока предыдущий
+    вызов сборщика не завершился, новый не запускается.
+
+    :param collectors: сборщики по имени раздела снимка
+    :param timeout: таймаут сборщика по умолчанию, сек
+    :param timeouts: таймауты отдельных сборщиков, сек
+    :param primers: подготовка сборщиков перед первым снимком после простоя (см. `prime`)
+    """
+
+    def __init__(
+            self,
+            collectors: dict[str, Callable[[], BaseModel]] = None,
+            timeout: float = 2.0,
+            timeouts: dict[str, float] = None,
+            primers: dict[str, Callable[[], None]] = None
+    ):
+        self._collectors = collectors if collectors is not None else DEFAULT_COLLECTORS
+        self._timeout = timeout
+        self._timeouts = timeouts or {}
+        self._primers = primers if primers is not None else DEFAULT_PRIMERS
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self._collectors) or 1,
+            thread_name_prefix="stats-sampler"
+        )
+        self._pending: dict[str, Future] = {}
+        self._last_good: dict[str, BaseModel] = {}
+        self._log = logging.getLogger(__name__)
+
+        self.snapshot: Optional[dict] = None
+        self.snapshot_time: Optional[float] = None
+        self.ticks = 0
+        self.tick_duration = 0.0
+        self.timeouts = {name: 0 for name in self._collectors}
+        self.errors = {name: 0 for name in self._collectors}
+
+    async def _collect_one(self, name: str) -> Optional[BaseModel]:
+        future = self._pending.get(name)
+        if future is None or future.done():
+            future = self._executor.submit(self._collectors[name])
+            self._pending[name] = future
+
+        try:
+            value = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                self._timeouts.get(name, self._timeout)
+            )
+        except asyncio.TimeoutError:
+            self.timeouts[name] += 1
+            self._log.warning("Stats collector %s timed out, using last good value", name)
+        except Exception:
+            self.errors[name] += 1
+            self._log.exception("Stats collector %s failed, using last good value", name)
+        else:
+            self._last_good[name] = value
+        return self._last_good.get(name)
+
+    async def collect(self, sections: Iterable[str] = None) -> dict[str, Any]:
+        """
+        Сбор снимка сборщиками параллельно
+
+        :param sections: разделы снимка; остальные разделы не собираются и равны None.
+            По умолчанию собираются все разделы.
+        """
+        start = time.perf_counter()
+        names = [name for name in self._collectors if sections is None or name in sections]
+        values = await asyncio.gather(*(self._collect_one(name) for name in names))
+        snapshot = schemas.SystemStat(**dict(zip(names, values))).dict()
+
+        self.snapshot = snapshot
+        self.snapshot_time = time.time()
+        self.ticks += 1
+        self.tick_duration = time.perf_counter() - start
+        return snapshot
+
+    def accept(self, snapshot: dict, timestamp: float) -> None:
+        """
+        Снимок, собранный сборщиком другого процесса (см. `StatsRelay`)
+
+        """
+        self.snapshot = snapshot
+        self.snapshot_time = timestamp
+        self.ticks += 1
+
+    def prime(self) -> None:
+        """
+        Установка точек отсчёта сборщиков (загрузка CPU) после простоя
+
+        Вызывается за интервал до первого снимка, чтобы первое значение
+        считалось за этот интервал, а не за всё время простоя.
+        """
+        for name, primer in self._primers.items():
+            try:
+                primer()
+            except Exception:
+                self._log.exception("Stats collector %s priming failed", name)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,118 @@
+import math
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from src.utils.bgmanager import BGManager
+
+from .publisher import StatsPublisher
+
+
+class StatsScheduler:
+    """
+    Планирование общего сборщика статистики
+
+    Сборщик один на все подключения и работает с частотой самого частого запрошенного
+    интервала; подписчики с более редким интервалом получают прореженный поток
+    (см. `StatsPublisher.publish`). Фоновые потребители (история, оповещения) держат
+    сборщик запущенным и без подписчиков со своим интервалом `background`; без них задача
+    сборщика приостанавливается. При возобновлении сначала вызывается `on_resume`
+    (подготовка точек отсчёта), первый снимок собирается через `resume_delay` после неё,
+    поэтому подписчик получает кадр сразу, а не через интервал.
+
+    :param background_manager: менеджер фоновых задач
+    :param publisher: публикация снимков; источник интервалов подписчиков
+    :param default_interval: интервал по умолчанию и интервал записи истории, сек
+    :param min_interval: минимальный интервал, который может запросить клиент, сек
+    :param max_interval: максимальный интервал, сек
+    :param background: интервал сборщика для фоновых потребителей, сек; без него сборщик
+        работает только для подписчиков
+    :param on_resume: вызывается перед возобновлением сборщика
+    :param resume_delay: задержка первого снимка после возобновления, сек
+    """
+
+    def __init__(
+            self,
+            background_manager: BGManager,
+            publisher: StatsPublisher,
+            default_interval: float = 3.0,
+            min_interval: float = 1.0,
+            max_interval: float = 60.0,
+            background: float = None,
+            on_resume: Callable[[], None] = None,
+            resume_delay: float = 0.5
+    ):
+        self._background_manager = background_manager
+        self._publisher = publisher
+        self._default_interval = default_interval
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._background = background
+        self._on_resume = on_resume
+        self._resume_delay = resume_delay
+        self._job_id = None
+        self.interval = default_interval
+        self.paused = False
+        self.resumes = 0
+        # Минимальный интервал подписчиков других процессов (см. `StatsRelay`)
+        self.remote_interval: Optional[float] = None
+
+    def start(self, func: Callable, *args) -> None:
+        interval = self.required_interval()
+        self.interval = interval or self._default_interval
+        self._job_id = self._background_manager.add_job(func, "interval", seconds=self.interval, args=args)
+        if interval is None:
+            self._background_manager.pause_job(self._job_id)
+            self.paused = True
+
+    def clamp(self, interval: float = None) -> float:
+        """
+        Интервал клиента в допустимых пределах; без интервала - интервал по умолчанию
+
+        :raise ValueError if interval is not a finite number
+        """
+        if interval is None:
+            return self._default_interval
+        if not math.isfinite(interval):
+            raise ValueError(f"Invalid interval: {interval}")
+        return min(max(interval, self._min_interval), self._max_interval)
+
+    def required_interval(self) -> Optional[float]:
+        """
+        Интервал сборщика; None, если снимки никому не нужны
+
+        """
+        intervals = self._publisher.intervals()
+        if self.remote_interval is not None:
+            intervals.add(self.clamp(self.remote_interval))
+        if self._background:
+            intervals.add(self._background)
+        return min(intervals, default=None)
+
+    def update(self) -> None:
+        """
+        Перепланирование, приостановка или возобновление сборщика после изменения подписок
+
+        """
+        if self._job_id is None:
+            return
+
+        interval = self.required_interval()
+        if interval is None:
+            if not self.paused:
+                self._background_manager.pause_job(self._job_id)
+                self.paused = True
+            return
+
+        if self.paused:
+            if self._on_resume is not None:
+                self._on_resume()
+            self.paused = False
+            self.resumes += 1
+            # Смена триггера снимает паузу; первый запуск - после подготовки точек отсчёта, а не через интервал
+            self._background_manager.reschedule_job(
+                self._job_id, "interval", seconds=interval,
+                start_date=datetime.now() + timedelta(seconds=self._resume_delay)
+            )
+        elif interval != self.interval:
+            self._background_manager.reschedule_job(self._job_id, "interval", seconds=interval)
+        self.interval = interval
@@ -0,0 +1,61 @@
+from typing import Iterable
+
+# Разделы снимка; каждому соответствует отдельный сборщик
+SECTIONS: tuple[str, ...] = ("cpu", "ram", "rom", "lan", "io", "processes", "network")
+# Подписка по умолчанию; таблица процессов и качество связи передаются только по явной подписке
+DEFAULT_TOPICS: frozenset[str] = frozenset(SECTIONS) - {"processes", "network"}
+
+
+def parse_topics(topics: Iterable[str]) -> frozenset[str]:
+    """
+    Разбор тем подписки
+
+    Тема - раздел снимка (`cpu`, `lan`) или отдельный элемент раздела по `title`
+    (`lan:eth0`, `rom:sda1`, `io:sda`).
+
+    :raise ValueError if topic is unknown
+    """
+    parsed = set()
+    for topic in topics:
+        topic = topic.strip()
+        section, _, item = topic.partition(":")
+        if section not in SECTIONS or (_ and not item):
+            raise ValueError(f"Unknown topic: {topic}")
+        parsed.add(topic)
+    return frozenset(parsed)
+
+
+def topic_sections(topics: Iterable[str]) -> set[str]:
+    """
+    Разделы снимка, нужные для тем
+    """
+    return {topic.partition(":")[0] for topic in topics}
+
+
+def filter_snapshot(snapshot: dict, topics: frozenset[str]) -> dict:
+    """
+    Снимок, содержащий только темы подписки; остальные разделы - None
+
+    """
+    if topics.issuperset(SECTIONS):
+        return snapshot
+
+    filtered = {}
+    for section, data in snapshot.items():
+        if section in topics or data is None:
+            filtered[section] = data if section in topics else None
+            continue
+        items = {topic.partition(":")[2] for topic in topics if topic.partition(":")[0] == section}
+        filtered[section] = _filter_items(data, items) if items else None
+    return filtered
+
+
+def _filter_items(data: dict, titles: set[str]) -> dict:
+    filtered = {}
+    for key, value in data.items():
+        if isinstance(value, list) and value and isinstance(value[0], dict) and "title" in value[0]:
+            filtered[key] = [item for item in value if item["title"] in titles]
+        else:
+            filtered[key] = value
+    return filtered
+
@@ -1,32 +1,243 @@
+import asyncio
+import fcntl
+import functools
+import logging
+import os
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
 from apscheduler.job import Job
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from redis.exceptions import RedisError
 
 from tzlocal import get_localzone
 
+from src.utils.redis import RedisClient
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Lease(ABC):
+    """
+    Аренда лидерства между процессами
+
+    Лидер продлевает аренду вызовом `acquire`; если лидер пропал, аренда
+    освобождается не позже чем через `ttl`, а захватывается другим процессом
+    на его ближайшей попытке после этого.
+
+    :param ttl: срок аренды, сек
+    :param owner: идентификатор процесса
+    """
+
+    def __init__(self, ttl: float = 10.0, owner: str = None):
+        self.ttl = ttl
+        self.owner = owner or default_owner()
+
+    @abstractmethod
+    async def acquire(self) -> bool:
+        """
+        Захват или продление аренды
+
+        :return: True, если аренда принадлежит этому процессу
+        """
+
+    @abstractmethod
+    async def release(self) -> None:
+        """
+        Освобождение аренды, если она принадлежит этому процессу
+
+        """
+
+
+class FileLease(Lease):
+    """
+    Аренда на блокировке файла (`flock`) для процессов одного хоста
+
+    Блокировка держится, пока открыт файл, и снимается ядром сразу при завершении
+    процесса-лидера; остальные процессы захватывают её на ближайшем продлении.
+
+    :param path: файл блокировки
+    :param ttl: период попыток захвата, сек
+    :param owner: идентификатор процесса; записывается в файл блокировки
+    """
+
+    def __init__(self, path: str, ttl: float = 10.0, owner: str = None):
+        super().__init__(ttl, owner)
+        self.path = path
+        self._fd: Optional[int] = None
+
+    async def acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_CLOEXEC", 0), 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, self.owner.encode())
+        self._fd = fd
+        return True
+
+    async def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class RedisLease(Lease):
+    """
+    Аренда на ключе Redis с истечением срока (SET NX PX)
+
+    Пока Redis недоступен, аренда не подтверждается; потеря и восстановление
+    связи журналируются один раз.
+
+    :param redis_client: клиент Redis
+    :param key: ключ аренды
+    :param ttl: срок аренды, сек
+    :param owner: идентификатор процесса
+    """
+
+    def __init__(self, redis_client: RedisClient, key: str, ttl: float = 10.0, owner: str = None):
+        super().__init__(ttl, owner)
+        self._redis = redis_client
+        self.key = key
+        self._log = logging.getLogger(__name__)
+        self._available = True
+
+    async def acquire(self) -> bool:
+        try:
+            leased = await self._redis.acquire_lease(self.key, self.owner, int(self.ttl * 1000))
+        except RedisError as error:
+            # Без связи с Redis нельзя подтвердить аренду: лидерство теряется
+            if self._available:
+                self._log.warning("Lease %s is not renewed: Redis is unavailable (%s)", self.key, error)
+                self._available = False
+            return False
+        if not self._available:
+            self._log.info("Lease %s: Redis is available again", self.key)
+            self._available = True
+        return leased
+
+    async def release(self) -> None:
+        try:
+            await self._redis.release_lease(self.key, self.owner)
+        except RedisError:
+            pass
+
 
 class BGManager:
     """
     Менеджер фоновых задач
 
+    Каждый процесс приложения запускает свой планировщик. Задачи, добавленные
+    с `singleton=True`, выполняются только в процессе-лидере: с `lease` процессы
+    выбирают лидера по аренде, продлевая её трижды за срок аренды, поэтому
+    после падения лидера задачи переходят к другому процессу не позже чем через
+    `ttl * 4 / 3`: срок аренды и период попыток захвата.
+    Без `lease` процесс считается единственным и всегда лидер.
+
+    :param lease: аренда лидерства между процессами
     """
+    ELECTION_JOB_ID = "bgmanager:election"
 
-    def __init__(self):
+    def __init__(self, lease: Lease = None):
         self._scheduler = AsyncIOScheduler(timezone=str(get_localzone()))
+        self._lease = lease
+        self._log = logging.getLogger(__name__)
+        self.leader = lease is None
+        self._resigned = False
+
+    async def elect(self) -> bool:
+        """
+        Захват или продление аренды лидерства
+
+        """
+        if self._lease is None:
+            return True
+        # Выборы, запущенные до остановки, не должны снова захватить аренду
+        leader = not self._resigned and await self._lease.acquire()
+        if leader != self.leader:
+            self._log.info("Background jobs leadership %s", "acquired" if leader else "lost")
+        self.leader = leader
+        return leader
+
+    async def resign(self) -> None:
+        """
+        Освобождение аренды лидерства при остановке процесса
+
+        """
+        self._resigned = True
+        if self._lease is not None and self.leader:
+            await self._lease.release()
+        self.leader = self._lease is None
+
+    def _singleton(self, func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if self.leader:
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if self.leader:
+                    return func(*args, **kwargs)
+        return wrapper
 
-    def add_job(self, func, trigger: str = None, **kwargs) -> str:
+    def add_job(self, func, trigger: str = None, singleton: bool = False, **kwargs) -> str:
         """
         Добавление задачи в планировщик
 
         :param func: функция
         :param trigger: триггер
+        :param singleton: выполнять только в процессе-лидере
         :param kwargs:
 
         Пример:
             `bg_manager.add_job(renewal_requests, "cron", hour=4, minute=20, args=(async_session,))`
         """
+        if singleton:
+            func = self._singleton(func)
         job = self._scheduler.add_job(func, trigger, **kwargs)
         return job.id
 
+    def reschedule_job(self, job_id, trigger: str = None, **kwargs) -> None:
+        """
+        Смена триггера задачи
+
+        :param job_id: идентификатор задачи
+        :param trigger: триггер
+        :param kwargs: параметры триггера
+
+        Пример:
+            `bg_manager.reschedule_job(job_id, "interval", seconds=1)`
+        """
+        self._scheduler.reschedule_job(job_id, trigger=trigger, **kwargs)
+
+    def pause_job(self, job_id) -> None:
+        """
+        Приостановка задачи
+
+        :param job_id: идентификатор задачи
+        """
+        self._scheduler.pause_job(job_id)
+
+    def resume_job(self, job_id) -> None:
+        """
+        Возобновление приостановленной задачи
+
+        :param job_id: идентификатор задачи
+        """
+        self._scheduler.resume_job(job_id)
+
     def remove_job(self, job_id) -> None:
         """
         Удаление задачи из планировщика
@@ -53,6 +264,15 @@ class BGManager:
         """
         Запуск планировщика
         """
+        if self._lease is not None:
+            self._scheduler.add_job(
+                self.elect, "interval",
+                seconds=self._lease.ttl / 3,
+                id=self.ELECTION_JOB_ID,
+                next_run_time=datetime.now(self._scheduler.timezone),
+                max_instances=1,
+                coalesce=True,
+            )
         self._scheduler.start()
 
     def shutdown(self) -> None:
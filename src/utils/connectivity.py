@@ -0,0 +1,340 @@
+"""
+Проверка доступности сети по интерфейсам без запуска ping
+
+Из каждого интерфейса с маршрутом по умолчанию открывается TCP-соединение с целями;
+сокет привязывается к интерфейсу (SO_BINDTODEVICE). Ответ цели (соединение или отказ RST)
+означает, что сеть через интерфейс доступна. Проверки всех интерфейсов и целей идут
+параллельно в цикле событий, имена целей разрешаются один раз за проверку.
+
+Без CAP_NET_RAW сокет привязывается только к адресу интерфейса: это задаёт адрес
+отправителя, но не выходной интерфейс - пакеты уходят по таблице маршрутизации,
+и без правил маршрутизации по источнику результат может относиться к другому интерфейсу.
+"""
+import array
+import asyncio
+import errno
+import logging
+import math
+import socket
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import psutil
+
+from src.models import schemas
+
+# Ответ цели, пусть и отказом, доказывает доступность сети
+REACHABLE_ERRNOS = {errno.ECONNREFUSED}
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    host: str
+    port: int
+
+    def __str__(self):
+        return f"{self.host}:{self.port}"
+
+
+@dataclass
+class ProbeResult:
+    ok: bool
+    rtt: Optional[float]
+    error: Optional[str]
+    timestamp: float
+
+
+class ProbeWindow:
+    """
+    Скользящее окно последних проверок одной пары интерфейс-цель
+
+    Кольцо фиксированного размера из RTT (потеря хранится как NaN): память на пару
+    не зависит от времени работы. Сводка - потери, перцентили RTT и джиттер
+    (среднее изменение RTT между соседними успешными проверками).
+
+    :param size: число хранимых проверок
+    """
+
+    def __init__(self, size: int = 120):
+        self._rtts = array.array('d', [math.nan]) * size
+        self._count = 0
+        self._cursor = 0
+
+    def add(self, rtt: Optional[float]) -> None:
+        self._rtts[self._cursor] = math.nan if rtt is None else rtt
+        self._cursor = (self._cursor + 1) % len(self._rtts)
+        self._count = min(self._count + 1, len(self._rtts))
+
+    def values(self) -> list[float]:
+        """
+        Проверки от старой к новой
+
+        """
+        if self._count < len(self._rtts):
+            return self._rtts[:self._count].tolist()
+        return self._rtts[self._cursor:].tolist() + self._rtts[:self._cursor].tolist()
+
+    def summary(self) -> dict[str, Optional[float]]:
+        """
+        Сводка окна: число проверок, потери %, перцентили RTT и джиттер, мс
+
+        """
+        values = self.values()
+        rtts = [value * 1000 for value in values if not math.isnan(value)]
+        ordered = sorted(rtts)
+
+        def percentile(rank: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, math.ceil(rank * len(ordered)) - 1)], 3)
+
+        jitter = None
+        if len(rtts) > 1:
+            jitter = round(sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / (len(rtts) - 1), 3)
+        return {
+            "samples": len(values),
+            "loss": round((len(values) - len(rtts)) / len(values) * 100, 1) if values else None,
+            "rtt_p50": percentile(0.5),
+            "rtt_p90": percentile(0.9),
+            "rtt_p99": percentile(0.99),
+            "jitter": jitter,
+        }
+
+
+def parse_targets(value: str) -> list[ProbeTarget]:
+    """
+    Разбор целей из конфигурации: `1.1.1.1:443,8.8.8.8:53`
+
+    """
+    targets = []
+    for item in value.split(","):
+        item = item.strip()
+        if item:
+            host, _, port = item.rpartition(":")
+            targets.append(ProbeTarget(host.strip("[]"), int(port)))
+    return targets
+
+
+# Флаги маршрутов ядра (linux/route.h)
+RTF_UP = 0x0001
+RTF_REJECT = 0x0200
+
+
+def _default_routes() -> Optional[list[str]]:
+    interfaces = []
+    try:
+        with open("/proc/net/route", encoding="ascii") as file:
+            next(file, None)
+            for line in file:
+                fields = line.split()
+                # Назначение и маска 0.0.0.0/0
+                if len(fields) > 7 and fields[1] == fields[7] == "00000000" and int(fields[3], 16) & RTF_UP:
+                    interfaces.append(fields[0])
+    except OSError:
+        return None
+    try:
+        with open("/proc/net/ipv6_route", encoding="ascii") as file:
+            for line in file:
+                fields = line.split()
+                flags = int(fields[8], 16) if len(fields) > 9 else 0
+                # Назначение ::/0; маршрут-заглушка на lo помечен RTF_REJECT
+                if fields[0] == "0" * 32 and fields[1] == "00" and flags & RTF_UP and not flags & RTF_REJECT:
+                    interfaces.append(fields[9])
+    except OSError:
+        pass
+    return list(dict.fromkeys(interfaces))
+
+
+def default_interfaces() -> list[str]:
+    """
+    Интерфейсы с маршрутом по умолчанию (IPv4 или IPv6)
+
+    Мосты контейнеров, veth и другие интерфейсы без выхода в сеть не проверяются.
+    Без /proc (не Linux) - все поднятые интерфейсы, кроме lo.
+    """
+    interfaces = _default_routes()
+    if interfaces is None:
+        interfaces = [name for name, stats in psutil.net_if_stats().items() if stats.isup and name != "lo"]
+    return interfaces
+
+
+def _bind(sock: socket.socket, interface: str, family: int) -> None:
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, interface.encode() + b"\0")
+        return
+    except (AttributeError, PermissionError):
+        pass
+    # Без CAP_NET_RAW сокет привязывается к адресу интерфейса: выходной интерфейс выбирает маршрутизация
+    for address in psutil.net_if_addrs().get(interface, []):
+        if address.family == family:
+            sock.bind((address.address.split("%")[0], 0))
+            return
+    raise OSError(errno.EADDRNOTAVAIL, f"No address on {interface}")
+
+
+async def tcp_probe(address: tuple, family: int, interface: Optional[str], timeout: float) -> float:
+    """
+    Время ответа цели через интерфейс, сек
+
+    :raise OSError, asyncio.TimeoutError if the target is unreachable
+    """
+    loop = asyncio.get_running_loop()
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.setblocking(False)
+        if interface is not None:
+            _bind(sock, interface, family)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, address), timeout)
+        except OSError as error:
+            if error.errno not in REACHABLE_ERRNOS:
+                raise
+        return time.perf_counter() - start
+
+
+class ConnectivityProber:
+    """
+    Фоновая проверка доступности сети по интерфейсам
+
+    Результаты последней проверки хранятся в памяти, запрос `/info/network`
+    читает их и запускает проверку (`refresh`), если они устарели; периодическую
+    проверку может запускать планировщик.
+    Для каждой пары интерфейс-цель копится окно последних `window` проверок
+    (см. `ProbeWindow`), по нему видно ухудшение связи до её полной потери.
+
+    :param targets: цели проверки
+    :param timeout: таймаут соединения, сек
+    :param interfaces: список проверяемых интерфейсов (по умолчанию - с маршрутом по умолчанию)
+    :param window: размер окна проверок
+    :param max_age: возраст результатов, после которого они устарели и проверка
+        выполняется по запросу, сек
+    """
+
+    def __init__(
+            self,
+            targets: list[ProbeTarget],
+            timeout: float = 1.0,
+            interfaces: Callable[[], list[str]] = default_interfaces,
+            window: int = 120,
+            max_age: float = None
+    ):
+        self.targets = targets
+        self._timeout = timeout
+        self._interfaces = interfaces
+        self._window = window
+        self._max_age = max_age
+        self._log = logging.getLogger(__name__)
+        self.windows: dict[tuple[str, ProbeTarget], ProbeWindow] = {}
+        # Результаты и сводки окон заменяются одним присваиванием: их читает поток сборщика статистики
+        self._state: tuple[dict[str, dict[ProbeTarget, ProbeResult]], dict[tuple[str, ProbeTarget], dict]] = {}, {}
+        self.updated_at: Optional[float] = None
+        self.probes = 0
+
+    async def _resolve(self, target: ProbeTarget) -> Optional[tuple[int, tuple]]:
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(target.host, target.port, type=socket.SOCK_STREAM), self._timeout
+            )
+        except (OSError, asyncio.TimeoutError) as error:
+            self._log.warning("Cannot resolve probe target %s: %s", target, error)
+            return None
+        family, _, _, _, address = infos[0]
+        return family, address
+
+    async def _probe(self, interface: str, target: ProbeTarget, resolved: Optional[tuple]) -> ProbeResult:
+        if resolved is None:
+            return ProbeResult(ok=False, rtt=None, error="resolve failed", timestamp=time.time())
+        try:
+            rtt = await tcp_probe(resolved[1], resolved[0], interface, self._timeout)
+        except asyncio.TimeoutError:
+            return ProbeResult(ok=False, rtt=None, error="timeout", timestamp=time.time())
+        except OSError as error:
+            return ProbeResult(ok=False, rtt=None, error=error.strerror or str(error), timestamp=time.time())
+        return ProbeResult(ok=True, rtt=rtt, error=None, timestamp=time.time())
+
+    async def refresh(self) -> None:
+        """
+        Проверка всех интерфейсов и целей
+
+        """
+        resolved = await asyncio.gather(*(self._resolve(target) for target in self.targets))
+        interfaces = self._interfaces()
+        pairs = [
+            (interface, target, address)
+            for interface in interfaces for target, address in zip(self.targets, resolved)
+        ]
+        outcomes = await asyncio.gather(*(self._probe(*pair) for pair in pairs))
+
+        results: dict[str, dict[ProbeTarget, ProbeResult]] = {interface: {} for interface in interfaces}
+        windows, summaries = {}, {}
+        for (interface, target, _), result in zip(pairs, outcomes):
+            results[interface][target] = result
+            # Окна пропавших интерфейсов и целей отбрасываются
+            window = self.windows.get((interface, target)) or ProbeWindow(self._window)
+            window.add(result.rtt)
+            windows[(interface, target)] = window
+            summaries[(interface, target)] = window.summary()
+        self.windows = windows
+        self._state = results, summaries
+        self.updated_at = time.time()
+        self.probes += len(pairs)
+
+    def stale(self, now: float = None) -> bool:
+        """
+        Нужна ли проверка до ответа: её ещё не было или результаты устарели
+
+        """
+        if self.updated_at is None:
+            return True
+        now = time.time() if now is None else now
+        return self._max_age is not None and now - self.updated_at > self._max_age
+
+    @property
+    def results(self) -> dict[str, dict[ProbeTarget, ProbeResult]]:
+        return self._state[0]
+
+    def info(self) -> schemas.LANNetworkInfo:
+        """
+        Доступность сети по интерфейсам по последней проверке
+
+        """
+        results_by_interface, summaries = self._state
+        return schemas.LANNetworkInfo(interfaces=[
+            schemas.LANNetworkItemInfo(
+                interface=interface,
+                has_global_network=any(result.ok for result in results.values()),
+                targets=[
+                    schemas.LANNetworkTargetInfo(
+                        target=str(target),
+                        available=result.ok,
+                        **summaries[(interface, target)],
+                    )
+                    for target, result in results.items()
+                ],
+            )
+            for interface, results in results_by_interface.items()
+        ])
+
+    def get_stat(self) -> schemas.NetworkStat:
+        """
+        Качество связи по интерфейсам для потока статистики (тема `network`)
+
+        """
+        results_by_interface, summaries = self._state
+        return schemas.NetworkStat(interfaces=[
+            schemas.NetworkStatInterface(
+                title=interface,
+                has_global_network=any(result.ok for result in results.values()),
+                targets=[
+                    schemas.NetworkStatTarget(
+                        title=str(target),
+                        available=result.ok,
+                        **{key: value for key, value in summaries[(interface, target)].items() if key != "samples"},
+                    )
+                    for target, result in results.items()
+                ],
+            )
+            for interface, results in results_by_interface.items()
+        ])
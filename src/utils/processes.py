@@ -0,0 +1,136 @@
+"""
+Таблица процессов с инкрементальным сканированием
+
+Состояние процессов хранится между сканированиями: загрузка CPU считается по приросту
+времени процессора с прошлого сканирования (как `psutil.Process.cpu_percent`), завершившиеся
+процессы вытесняются. Верхние N процессов выбираются кучей, без полной сортировки.
+"""
+import heapq
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import psutil
+
+from src.models.process_sort import ProcessSort
+
+PROC_PATH = "/proc"
+
+
+@dataclass
+class ProcessSample:
+    pid: int
+    name: str
+    cpu_time: float
+    rss: int
+    start_time: int
+
+
+@dataclass
+class ProcessEntry:
+    pid: int
+    name: str
+    cpu_percent: Optional[float]
+    rss: int
+
+
+def _scan_procfs() -> Iterator[ProcessSample]:
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    with os.scandir(PROC_PATH) as entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"{PROC_PATH}/{entry.name}/stat", "rb") as file:
+                    data = file.read()
+            except OSError:
+                # Процесс завершился во время сканирования
+                continue
+            # Имя процесса может содержать пробелы и скобки
+            name = data[data.index(b"(") + 1:data.rindex(b")")]
+            fields = data[data.rindex(b")") + 2:].split()
+            yield ProcessSample(
+                pid=int(entry.name),
+                name=name.decode(errors="replace"),
+                cpu_time=(int(fields[11]) + int(fields[12])) / clock_ticks,
+                rss=int(fields[21]) * page_size,
+                start_time=int(fields[19]),
+            )
+
+
+def _scan_psutil() -> Iterator[ProcessSample]:
+    for process in psutil.process_iter(["name", "cpu_times", "memory_info", "create_time"]):
+        info = process.info
+        if info["cpu_times"] is None or info["memory_info"] is None:
+            continue
+        yield ProcessSample(
+            pid=process.pid,
+            name=info["name"],
+            cpu_time=info["cpu_times"].user + info["cpu_times"].system,
+            rss=info["memory_info"].rss,
+            start_time=int(info["create_time"] * 100),
+        )
+
+
+class ProcessTable:
+    """
+    Таблица процессов
+
+    Сканирование - одно чтение /proc/<pid>/stat на процесс (без /proc - psutil).
+    Повторный запрос в течение `min_interval` использует результат прошлого сканирования.
+
+    :param min_interval: минимальный интервал между сканированиями, сек
+    """
+
+    def __init__(self, min_interval: float = 1.0):
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._scan = _scan_procfs if os.path.isdir(f"{PROC_PATH}/self") else _scan_psutil
+        # pid -> (время запуска, время процессора) на прошлом сканировании
+        self._state: dict[int, tuple[int, float]] = {}
+        self._scanned_at: Optional[float] = None
+        self._entries: list[ProcessEntry] = []
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._scanned_at is not None and now - self._scanned_at < self._min_interval:
+            return
+        elapsed = now - self._scanned_at if self._scanned_at is not None else 0
+
+        state = {}
+        entries = []
+        for sample in self._scan():
+            last = self._state.get(sample.pid)
+            cpu_percent = None
+            # Совпадение времени запуска отличает тот же процесс от нового с переиспользованным PID
+            if last is not None and last[0] == sample.start_time and elapsed > 0:
+                cpu_percent = round(max(sample.cpu_time - last[1], 0.0) / elapsed * 100, 1)
+            state[sample.pid] = (sample.start_time, sample.cpu_time)
+            entries.append(ProcessEntry(pid=sample.pid, name=sample.name, cpu_percent=cpu_percent, rss=sample.rss))
+
+        # PID, не попавшие в сканирование, завершились
+        self._state = state
+        self._entries = entries
+        self._scanned_at = now
+
+    def top(self, limit: int = 10, sort: ProcessSort = ProcessSort.CPU) -> list[ProcessEntry]:
+        """
+        Верхние процессы по загрузке CPU или по резидентной памяти
+
+        """
+        if sort == ProcessSort.CPU:
+            key = lambda entry: (entry.cpu_percent or 0.0, entry.rss)  # noqa: E731
+        else:
+            key = lambda entry: entry.rss  # noqa: E731
+        with self._lock:
+            self._refresh()
+            return heapq.nlargest(limit, self._entries, key=key)
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+process_table = ProcessTable()
@@ -0,0 +1,220 @@
+"""
+Быстрое чтение горячих метрик Linux напрямую из /proc
+
+Файлы открываются один раз и перечитываются `pread` с нулевого смещения в заранее
+выделенный буфер; разбираются только нужные поля. Значения совпадают с psutil
+(см. `psutil._pslinux`), но без повторного открытия файлов и разбора лишних строк.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+PROC_PATH = "/proc"
+
+
+class ProcFile:
+    """
+    Файл /proc, открытый на всё время работы
+
+    :param path: путь к файлу
+    :param size: начальный размер буфера; увеличивается, если файл не поместился
+    """
+
+    def __init__(self, path: str, size: int = 4096):
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+        self._buffer = bytearray(size)
+
+    def read(self) -> bytes:
+        """
+        Текущее содержимое файла
+
+        """
+        while True:
+            length = os.preadv(self._fd, [self._buffer], 0)
+            if length < len(self._buffer):
+                return bytes(memoryview(self._buffer)[:length])
+            # Файлы /proc не сообщают размер заранее: буфер растёт, пока содержимое не поместится
+            self._buffer = bytearray(len(self._buffer) * 2)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+@dataclass
+class MemoryInfo:
+    total: int
+    used: int
+    free: int
+    available: int
+    swap_total: int
+    swap_used: int
+    swap_free: int
+
+
+class CPUPercent:
+    """
+    Загрузка процессора по /proc/stat
+
+    Как и `psutil.cpu_percent`, считает долю занятого времени между двумя вызовами.
+    Общая загрузка и загрузка по ядрам вычисляются из одного чтения файла.
+    """
+
+    def __init__(self, path: str = f"{PROC_PATH}/stat"):
+        self._file = ProcFile(path)
+        self._lock = threading.Lock()
+        self._last: Optional[list[tuple[int, int]]] = None
+
+    def _read_times(self) -> list[tuple[int, int]]:
+        # (всего, занято) для строки "cpu" и каждой строки "cpuN"
+        times = []
+        for line in self._file.read().split(b"\n"):
+            if not line.startswith(b"cpu"):
+                break
+            fields = [int(value) for value in line.split()[1:]]
+            # guest и guest_nice уже учтены в user и nice
+            total = sum(fields) - sum(fields[8:10])
+            busy = total - fields[3] - (fields[4] if len(fields) > 4 else 0)
+            times.append((total, busy))
+        return times
+
+    def read(self) -> tuple[float, list[float]]:
+        """
+        Загрузка с прошлого вызова: общая и по логическим ядрам, %
+
+        Первый вызов задаёт точку отсчёта и возвращает загрузку с момента загрузки системы.
+        """
+        with self._lock:
+            times = self._read_times()
+            last = self._last if self._last is not None and len(self._last) == len(times) else [(0, 0)] * len(times)
+            self._last = times
+
+        percents = []
+        for (total, busy), (last_total, last_busy) in zip(times, last):
+            total_delta = total - last_total
+            busy_delta = busy - last_busy
+            if total_delta <= 0 or busy_delta <= 0:
+                percents.append(0.0)
+            else:
+                percents.append(round(min(busy_delta / total_delta * 100, 100.0), 1))
+        return percents[0], percents[1:]
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class MemInfo:
+    """
+    Память по /proc/meminfo
+
+    `used` считается как в psutil и утилите free: total - free - buffers - cached.
+    """
+    FIELDS = {
+        b"MemTotal:", b"MemFree:", b"MemAvailable:", b"Buffers:", b"Cached:", b"SReclaimable:",
+        b"SwapTotal:", b"SwapFree:",
+    }
+
+    def __init__(self, path: str = f"{PROC_PATH}/meminfo"):
+        self._file = ProcFile(path)
+
+    def read(self) -> MemoryInfo:
+        fields = {}
+        for line in self._file.read().split(b"\n"):
+            name, _, value = line.partition(b" ")
+            if name in self.FIELDS:
+                fields[name] = int(value.split()[0]) * 1024
+                if len(fields) == len(self.FIELDS):
+                    break
+
+        total = fields[b"MemTotal:"]
+        free = fields[b"MemFree:"]
+        cached = fields.get(b"Cached:", 0) + fields.get(b"SReclaimable:", 0)
+        used = total - free - cached - fields.get(b"Buffers:", 0)
+        if used < 0:
+            used = total - free
+        swap_total = fields.get(b"SwapTotal:", 0)
+        swap_free = fields.get(b"SwapFree:", 0)
+        return MemoryInfo(
+            total=total,
+            used=used,
+            free=free,
+            available=fields.get(b"MemAvailable:", free),
+            swap_total=swap_total,
+            swap_used=swap_total - swap_free,
+            swap_free=swap_free,
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class NetDev:
+    """
+    Счётчики сетевых интерфейсов по /proc/net/dev
+
+    """
+
+    def __init__(self, path: str = f"{PROC_PATH}/net/dev"):
+        self._file = ProcFile(path)
+
+    def read(self) -> dict[str, tuple[int, int]]:
+        """
+        Принятые и отправленные байты по интерфейсам: {имя: (bytes_recv, bytes_sent)}
+
+        """
+        counters = {}
+        # Первые две строки - заголовок таблицы
+        for line in self._file.read().split(b"\n")[2:]:
+            name, _, values = line.partition(b":")
+            if not values:
+                continue
+            fields = values.split()
+            counters[name.strip().decode()] = (int(fields[0]), int(fields[8]))
+        return counters
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class DiskStats:
+    """
+    Счётчики блочных устройств по /proc/diskstats
+
+    """
+    SECTOR_SIZE = 512
+
+    def __init__(self, path: str = f"{PROC_PATH}/diskstats"):
+        self._file = ProcFile(path, size=16384)
+
+    def read(self) -> dict[str, tuple[int, int, int, int, int]]:
+        """
+        Счётчики по устройствам: {имя: (чтения, прочитано байт, записи, записано байт, время занятости, мс)}
+
+        """
+        counters = {}
+        for line in self._file.read().split(b"\n"):
+            fields = line.split()
+            if len(fields) < 14:
+                continue
+            counters[fields[2].decode()] = (
+                int(fields[3]),
+                int(fields[5]) * self.SECTOR_SIZE,
+                int(fields[7]),
+                int(fields[9]) * self.SECTOR_SIZE,
+                int(fields[12]),
+            )
+        return counters
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def available() -> bool:
+    """
+    Доступность /proc (Linux)
+
+    """
+    return os.path.exists(f"{PROC_PATH}/stat") and hasattr(os, "preadv")
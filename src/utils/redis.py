@@ -3,6 +3,7 @@ import logging
 from typing import Any, AsyncIterator
 
 import redis.asyncio as redis
+from redis.asyncio.client import PubSub
 from redis.exceptions import RedisError
 
 
@@ -189,3 +190,146 @@ class RedisClient:
                 exc_info=(type(ex), ex, ex.__traceback__),
             )
             raise ex
+
+    async def publish(self, channel: str, message: str):
+        """Выполнить команду Redis PUBLISH.
+         Отправляет сообщение всем подписчикам канала.
+        Args:
+            channel (str): Канал.
+            message (str): Сообщение.
+        Returns:
+            response: Число подписчиков, получивших сообщение.
+        Raises:
+            aioredis.RedisError: Если клиент Redis дал сбой при выполнении команды;
+                сбой журналирует вызывающий, один раз на смену состояния.
+        """
+
+        self.log.debug(f"Сформирована Redis PUBLISH команда, channel: {channel}")
+        try:
+            return await self.redis_client.publish(channel, message)
+        except RedisError as ex:
+            self.log.debug("Команда Redis PUBLISH завершена с исключением: %s", ex)
+            raise ex
+
+    def pubsub(self) -> PubSub:
+        """Создать объект подписки на каналы.
+         Подписка занимает отдельное соединение из пула до вызова `close()`.
+        Returns:
+            response: Объект PubSub.
+        """
+        return self.redis_client.pubsub(ignore_subscribe_messages=True)
+
+    async def hset(self, key: str, field: str, value: str):
+        """Выполнить команду Redis HSET.
+         Устанавливает значение поля хеша.
+        Args:
+            key (str): Ключ.
+            field (str): Поле.
+            value (str): Значение.
+        Raises:
+            aioredis.RedisError: Если клиент Redis дал сбой при выполнении команды;
+                сбой журналирует вызывающий, один раз на смену состояния.
+        """
+
+        self.log.debug(f"Сформирована Redis HSET команда, key: {key}, field: {field}")
+        try:
+            return await self.redis_client.hset(key, field, value)
+        except RedisError as ex:
+            self.log.debug("Команда Redis HSET завершена с исключением: %s", ex)
+            raise ex
+
+    async def hgetall(self, key: str) -> dict:
+        """Выполнить команду Redis HGETALL.
+         Возвращает все поля и значения хеша.
+        Args:
+            key (str): Ключ.
+        Returns:
+            response: Словарь полей хеша.
+        Raises:
+            aioredis.RedisError: Если клиент Redis дал сбой при выполнении команды;
+                сбой журналирует вызывающий, один раз на смену состояния.
+        """
+
+        self.log.debug(f"Сформирована Redis HGETALL команда, key: {key}")
+        try:
+            return await self.redis_client.hgetall(key)
+        except RedisError as ex:
+            self.log.debug("Команда Redis HGETALL завершена с исключением: %s", ex)
+            raise ex
+
+    async def hdel(self, key: str, *fields: str):
+        """Выполнить команду Redis HDEL.
+         Удаляет поля хеша.
+        Args:
+            key (str): Ключ.
+            fields (str): Поля.
+        Raises:
+            aioredis.RedisError: Если клиент Redis дал сбой при выполнении команды;
+                сбой журналирует вызывающий, один раз на смену состояния.
+        """
+
+        self.log.debug(f"Сформирована Redis HDEL команда, key: {key}, fields: {fields}")
+        try:
+            return await self.redis_client.hdel(key, *fields)
+        except RedisError as ex:
+            self.log.debug("Команда Redis HDEL завершена с исключением: %s", ex)
+            raise ex
+
+    async def acquire_lease(self, key: str, owner: str, ttl: int) -> bool:
+        """Захватить или продлить аренду (SET NX PX).
+         Аренда принадлежит одному владельцу и истекает через `ttl` мс, если её не продлевать.
+         Владелец продлевает свою аренду, чужая аренда не затрагивается.
+        Args:
+            key (str): Ключ аренды.
+            owner (str): Идентификатор владельца.
+            ttl (int): Срок аренды, мс.
+        Returns:
+            response: True, если аренда принадлежит `owner`.
+        Raises:
+            aioredis.RedisError: Если клиент Redis дал сбой при выполнении команды;
+                сбой журналирует вызывающий, один раз на смену состояния.
+        """
+
+        self.log.debug(f"Сформирована Redis команда аренды, key: {key}, owner: {owner}")
+        try:
+            return bool(await self.redis_client.eval(self._ACQUIRE_LEASE, 1, key, owner, ttl))
+        except RedisError as ex:
+            self.log.debug("Команда Redis аренды завершена с исключением: %s", ex)
+            raise ex
+
+    async def release_lease(self, key: str, owner: str) -> bool:
+        """Освободить аренду, если она принадлежит `owner`.
+        Args:
+            key (str): Ключ аренды.
+            owner (str): Идентификатор владельца.
+        Returns:
+            response: True, если аренда была освобождена.
+        Raises:
+            aioredis.RedisError: Если клиент Redis дал сбой при выполнении команды;
+                сбой журналирует вызывающий, один раз на смену состояния.
+        """
+
+        self.log.debug(f"Сформирована Redis команда освобождения аренды, key: {key}, owner: {owner}")
+        try:
+            return bool(await self.redis_client.eval(self._RELEASE_LEASE, 1, key, owner))
+        except RedisError as ex:
+            self.log.debug("Команда Redis освобождения аренды завершена с исключением: %s", ex)
+            raise ex
+
+    # Проверка владельца и изменение ключа выполняются атомарно на сервере
+    _ACQUIRE_LEASE = """
+        if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+            return 1
+        end
+        if redis.call('GET', KEYS[1]) == ARGV[1] then
+            redis.call('PEXPIRE', KEYS[1], ARGV[2])
+            return 1
+        end
+        return 0
+    """
+    _RELEASE_LEASE = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then
+            return redis.call('DEL', KEYS[1])
+        end
+        return 0
+    """
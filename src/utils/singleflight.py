@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Объединение одновременных вызовов одной операции
+
+    Пока операция с ключом `key` выполняется, остальные вызовы с тем же ключом не запускают
+    её повторно, а ждут её результат (или исключение). Операция выполняется отдельной задачей:
+    если первый вызвавший отменён (клиент отключился), остальные всё равно получат результат.
+
+    Счётчики по ключам: `calls` - выполненные операции, `coalesced` - вызовы, дождавшиеся чужой.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self.calls: dict[Hashable, int] = {}
+        self.coalesced: dict[Hashable, int] = {}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Результат операции `func(*args, **kwargs)`, общий для одновременных вызовов с ключом `key`
+
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._tasks[key] = task
+            self.calls[key] = self.calls.get(key, 0) + 1
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced[key] = self.coalesced.get(key, 0) + 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Исключение получили ожидающие; без них оно не должно попасть в лог как необработанное
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
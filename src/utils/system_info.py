@@ -1,8 +1,11 @@
-import asyncio
+import array
 import json
 import logging
-import re
+import os
 import subprocess
+import threading
+import time
+import zlib
 from functools import lru_cache
 from typing import Union, Any, List, Optional
 from socket import AddressFamily
@@ -15,6 +18,9 @@ import psutil
 import cpuinfo
 
 from src.models import schemas
+from src.utils import procfs
+from src.utils.processes import process_table
+from src.models.process_sort import ProcessSort
 
 
 def get_ram_info():
@@ -28,16 +34,20 @@ def get_ram_info():
     )
 
 
-def get_rom_info():
+def read_rom_info() -> schemas.ROMInfo:
+    """
+    Чтение блочных устройств через lsblk (без кэша)
+    """
     disks = []
     output = subprocess.check_output(
-        ["lsblk", "-J", "-T", "-oKNAME,TYPE,SIZE,RO,RM,SERIAL,TRAN,MODEL,VENDOR,PATH,FSTYPE,MOUNTPOINT"]
+        ["lsblk", "-J", "-T", "-oKNAME,TYPE,SIZE,RO,RM,SERIAL,TRAN,MODEL,VENDOR,PATH,FSTYPE,MOUNTPOINT"],
+        timeout=10,
     )
     block_devices = json.loads(output)["blockdevices"]
     for disk in block_devices:
         if disk['type'] == "disk":
             volumes = []
-            for volume in disk['children']:
+            for volume in disk.get('children', []):
                 if not volume['fstype']:
                     continue
 
@@ -78,6 +88,70 @@ def get_rom_info():
     return schemas.ROMInfo(disks=disks)
 
 
+class BlockDeviceInventory:
+    """
+    Кэш блочных устройств и томов
+
+    lsblk вызывается только при изменении топологии: меняется содержимое /proc/mounts
+    или список /sys/block; на случай пропущенного изменения есть длинный TTL.
+    Проверка изменений - чтение пары псевдофайлов, без порождения процессов.
+
+    :param ttl: максимальный срок жизни кэша, сек
+    """
+
+    def __init__(self, ttl: float = 600):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._loaded_at = 0.0
+        self._info: Optional[schemas.ROMInfo] = None
+        self._volumes: list[schemas.ROMVolumeInfo] = []
+
+    @staticmethod
+    def _signature_now() -> Optional[tuple]:
+        try:
+            with open('/proc/mounts', 'rb') as file:
+                mounts = zlib.crc32(file.read())
+            return mounts, tuple(sorted(os.listdir('/sys/block')))
+        except OSError:
+            return None
+
+    def _refresh(self) -> None:
+        signature = self._signature_now()
+        if (
+                self._info is not None
+                and signature is not None
+                and signature == self._signature
+                and time.monotonic() - self._loaded_at < self._ttl
+        ):
+            return
+        self._info = read_rom_info()
+        self._volumes = [volume for disk in self._info.disks for volume in disk.volumes]
+        self._signature = signature
+        self._loaded_at = time.monotonic()
+
+    def get_info(self) -> schemas.ROMInfo:
+        with self._lock:
+            self._refresh()
+            return self._info
+
+    def get_volumes(self) -> list[schemas.ROMVolumeInfo]:
+        with self._lock:
+            self._refresh()
+            return self._volumes
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._info = None
+
+
+rom_inventory = BlockDeviceInventory()
+
+
+def get_rom_info() -> schemas.ROMInfo:
+    return rom_inventory.get_info()
+
+
 @lru_cache(maxsize=128)
 def get_cpu_info():
     cpu = cpuinfo.get_cpu_info()
@@ -107,75 +181,72 @@ def get_os_info() -> schemas.OSInfo:
     )
 
 
-def get_mac_address(interface: str) -> Optional[str]:
-    """
-    Get the MAC address of a network interface
-    """
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    info = fcntl.ioctl(s.fileno(), 0x8927, struct.pack('256s', bytes(interface, 'utf-8')[:15]))
-    return ':'.join('%02x' % b for b in info[18:24])
+DMI_PATH = "/sys/class/dmi/id"
 
+# Поле схемы -> файл в DMI_PATH
+DMI_FIELDS = {
+    "vendor": "sys_vendor",
+    "product": "product_name",
+    "product_version": "product_version",
+    "board_vendor": "board_vendor",
+    "board": "board_name",
+    "bios_vendor": "bios_vendor",
+    "bios_version": "bios_version",
+    "bios_date": "bios_date",
+}
 
-async def async_ping(host: str, interface: str, timeout: int) -> schemas.LANNetworkItemInfo:
-    """
-    Ping host using interface
 
-    async vers
+def get_dmi_info(path: str = DMI_PATH) -> schemas.DMIInfo:
     """
-    proc = await asyncio.create_subprocess_shell(
-        f"ping -I {interface} -c 1 -W {timeout} {host}",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE)
-
-    stdout, stderr = await proc.communicate()
-    if stdout:
-        result = re.findall(r"(\d+)% packet loss", stdout.decode())
-
-        if not result:
-            schemas.LANNetworkItemInfo(
-                interface=interface,
-                has_global_network=False,
-            )
-
-        loss_perc = int(result[0])
-        return schemas.LANNetworkItemInfo(
-            interface=interface,
-            has_global_network=loss_perc == 0,
-        )
+    Сведения о платформе из DMI (производитель, модель, плата, BIOS)
 
-    if stderr:
-        logging.warning("Error ping host: %s", stderr.decode())
-        schemas.LANNetworkItemInfo(
-            interface=interface,
-            has_global_network=False,
-        )
+    Недоступные поля (нет DMI в контейнере или на ARM) остаются пустыми.
+    """
+    values = {}
+    for field, name in DMI_FIELDS.items():
+        try:
+            with open(os.path.join(path, name), encoding="utf-8", errors="replace") as file:
+                values[field] = file.read().strip() or None
+        except OSError:
+            values[field] = None
+    return schemas.DMIInfo(**values)
 
 
-async def get_network_info() -> schemas.LANNetworkInfo:
-    interface_names = []
-    for interface_name, interface_addresses in psutil.net_if_addrs().items():
-        if interface_name == 'lo':
-            continue
-        interface_names.append(interface_name)
+def get_mac_address(interface: str) -> Optional[str]:
+    """
+    Get the MAC address of a network interface
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        info = fcntl.ioctl(s.fileno(), 0x8927, struct.pack('256s', bytes(interface, 'utf-8')[:15]))
+    return ':'.join('%02x' % b for b in info[18:24])
 
-    result = await asyncio.gather(
-        *[async_ping('google.com', interface, 1) for interface in interface_names],
-    )
-    return schemas.LANNetworkInfo(interfaces=result)
 
+def read_lan_info() -> schemas.LANInfo:
+    """
+    Чтение сетевых интерфейсов (без кэша)
 
-def get_lan_info() -> schemas.LANInfo:
+    Адреса и состояние всех интерфейсов читаются одним снимком; MAC берётся
+    из адреса канального уровня, ioctl - только если его нет.
+    """
     interfaces = []
+    interface_stats = psutil.net_if_stats()
     for interface_name, interface_addresses in psutil.net_if_addrs().items():
         if interface_name == 'lo':
             continue
 
+        stats = interface_stats.get(interface_name)
+        mac = next((address.address for address in interface_addresses if address.family == psutil.AF_LINK), None)
+        if mac is None:
+            try:
+                mac = get_mac_address(interface_name)
+            except OSError:
+                mac = None
         interfaces.append(
             schemas.LANItemInfo(
                 title=interface_name,
-                is_up=psutil.net_if_stats()[interface_name].isup,
-                speed=psutil.net_if_stats()[interface_name].speed,
-                mac=get_mac_address(interface_name),
+                is_up=stats.isup if stats else None,
+                speed=stats.speed if stats else None,
+                mac=mac,
                 addresses=[schemas.LANAddressInfo(
                     address=address.address,
                     netmask=address.netmask,
@@ -187,9 +258,134 @@ def get_lan_info() -> schemas.LANInfo:
     return schemas.LANInfo(interfaces=interfaces)
 
 
+class NetworkInventory:
+    """
+    Кэш сетевых интерфейсов
+
+    Интерфейсы перечитываются при изменении списка /sys/class/net или IPv6-адресов
+    (/proc/net/if_inet6); изменения IPv4-адресов, состояния и скорости подхватываются по TTL.
+
+    :param ttl: максимальный срок жизни кэша, сек
+    """
+
+    def __init__(self, ttl: float = 60):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._loaded_at = 0.0
+        self._info: Optional[schemas.LANInfo] = None
+
+    @staticmethod
+    def _signature_now() -> Optional[tuple]:
+        try:
+            try:
+                with open('/proc/net/if_inet6', 'rb') as file:
+                    addresses = zlib.crc32(file.read())
+            except FileNotFoundError:
+                addresses = None
+            return addresses, tuple(sorted(os.listdir('/sys/class/net')))
+        except OSError:
+            return None
+
+    def get_info(self) -> schemas.LANInfo:
+        with self._lock:
+            signature = self._signature_now()
+            if (
+                    self._info is None
+                    or signature is None
+                    or signature != self._signature
+                    or time.monotonic() - self._loaded_at >= self._ttl
+            ):
+                self._info = read_lan_info()
+                self._signature = signature
+                self._loaded_at = time.monotonic()
+            return self._info
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._info = None
+
+
+lan_inventory = NetworkInventory()
+
+
+def get_lan_info() -> schemas.LANInfo:
+    return lan_inventory.get_info()
+
+
+class InterfaceRates:
+    """
+    Скорость приёма и передачи по интерфейсам между двумя снимками счётчиков
+
+    """
+
+    def __init__(self):
+        self._last: dict[str, tuple[int, int]] = {}
+        self._last_time: Optional[float] = None
+
+    def update(
+            self,
+            counters: dict[str, tuple[int, int]],
+            now: float = None
+    ) -> dict[str, tuple[Optional[float], Optional[float]]]:
+        """
+        Скорости с прошлого снимка, байт/с: {имя: (приём, передача)}
+
+        Для новых интерфейсов и после сброса счётчиков скорость - None.
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._last_time if self._last_time is not None else 0
+        rates = {}
+        for name, (recv, sent) in counters.items():
+            last = self._last.get(name)
+            if last is None or elapsed <= 0 or recv < last[0] or sent < last[1]:
+                rates[name] = (None, None)
+            else:
+                rates[name] = ((recv - last[0]) / elapsed, (sent - last[1]) / elapsed)
+        self._last = counters
+        self._last_time = now
+        return rates
+
+
+lan_rates = InterfaceRates()
+
+
+def _open_procfs(reader: type):
+    if not procfs.available():
+        return None
+    try:
+        return reader()
+    except OSError:
+        logging.getLogger(__name__).warning("Cannot open %s, falling back to psutil", reader.__name__)
+        return None
+
+
+# Читатели /proc для горячих метрик; без /proc (не Linux) используется psutil
+proc_cpu_percent: Optional[procfs.CPUPercent] = _open_procfs(procfs.CPUPercent)
+proc_meminfo: Optional[procfs.MemInfo] = _open_procfs(procfs.MemInfo)
+proc_net_dev: Optional[procfs.NetDev] = _open_procfs(procfs.NetDev)
+proc_diskstats: Optional[procfs.DiskStats] = _open_procfs(procfs.DiskStats)
+
+
+def _cpu_percent() -> tuple[float, list[float]]:
+    if proc_cpu_percent is not None:
+        return proc_cpu_percent.read()
+    return psutil.cpu_percent(), psutil.cpu_percent(percpu=True)
+
+
+def prime_cpu_stat() -> None:
+    """
+    Установка точки отсчёта загрузки процессора
+
+    Загрузка считается между двумя вызовами; после простоя первый
+    вызов вернул бы среднее за весь простой.
+    """
+    _cpu_percent()
+
+
 def get_cpu_stat() -> schemas.CPUStat:
     count_of_cores = psutil.cpu_count(logical=False)
-    cores_percent: list[float] = psutil.cpu_percent(percpu=True)
+    percent, cores_percent = _cpu_percent()
     cores_freq: list[Any] = psutil.cpu_freq(percpu=True)
     cores_temp: list[Any] = psutil.sensors_temperatures().get('coretemp')
     cores = []
@@ -203,7 +399,7 @@ def get_cpu_stat() -> schemas.CPUStat:
         )
 
     return schemas.CPUStat(
-        percent=psutil.cpu_percent(),
+        percent=percent,
         freq=psutil.cpu_freq().current,
         temperature=None if cores_temp is None else cores_temp[0].current,
         cores=cores,
@@ -211,6 +407,17 @@ def get_cpu_stat() -> schemas.CPUStat:
 
 
 def get_ram_stat() -> schemas.RAMStat:
+    if proc_meminfo is not None:
+        memory = proc_meminfo.read()
+        return schemas.RAMStat(
+            total_space=int(memory.total / 1024 / 1024),
+            used_space=int(memory.used / 1024 / 1024),
+            free_space=int(memory.free / 1024 / 1024),
+            swap_total_space=int(memory.swap_total / 1024 / 1024),
+            swap_used_space=int(memory.swap_used / 1024 / 1024),
+            swap_free_space=int(memory.swap_free / 1024 / 1024),
+        )
+
     memory = psutil.virtual_memory()
     return schemas.RAMStat(
         total_space=int(memory.total / 1024 / 1024),
@@ -222,38 +429,136 @@ def get_ram_stat() -> schemas.RAMStat:
 
 def get_rom_stat() -> schemas.ROMStat:
     volumes = []
-    disks = get_rom_info().disks
-    if not disks:
-        return schemas.ROMStat(disks=[])
-    for disk in disks:
-        for volume in disk.volumes:
-            total, used, free, percent = psutil.disk_usage(volume.path)
-            volumes.append(
-                schemas.ROMStatVolume(
-                    title=volume.title,
-                    path=volume.path,
-                    fs_type=volume.fs_type,
-                    type=volume.type,
-                    total_space=total,
-                    used_space=used,
-                    free_space=free,
-                    percent=percent,
-                )
+    for volume in rom_inventory.get_volumes():
+        total, used, free, percent = psutil.disk_usage(volume.mount_point)
+        volumes.append(
+            schemas.ROMStatVolume(
+                title=volume.title,
+                path=volume.path,
+                fs_type=volume.fs_type,
+                type=volume.type,
+                total_space=total,
+                used_space=used,
+                free_space=free,
+                percent=percent,
             )
+        )
     return schemas.ROMStat(volumes=volumes)
 
 
 def get_lan_stat() -> schemas.LANStat:
+    if proc_net_dev is not None:
+        counters = proc_net_dev.read()
+    else:
+        counters = {
+            name: (counter.bytes_recv, counter.bytes_sent)
+            for name, counter in psutil.net_io_counters(pernic=True).items()
+        }
+
+    rates = lan_rates.update(counters)
     interfaces = []
-    for interface_name, interface_addresses in psutil.net_if_addrs().items():
+    for interface_name, (bytes_recv, bytes_sent) in counters.items():
         if interface_name == 'lo':
             continue
 
+        recv_rate, sent_rate = rates[interface_name]
         interfaces.append(
             schemas.LANStatInterface(
                 title=interface_name,
-                bytes_sent=psutil.net_io_counters(pernic=True)[interface_name].bytes_sent,
-                bytes_recv=psutil.net_io_counters(pernic=True)[interface_name].bytes_recv,
+                bytes_sent=bytes_sent,
+                bytes_recv=bytes_recv,
+                bytes_sent_rate=sent_rate,
+                bytes_recv_rate=recv_rate,
             )
         )
     return schemas.LANStat(interfaces=interfaces)
+
+
+class DiskIORates:
+    """
+    Скорость ввода-вывода по устройствам между двумя снимками счётчиков
+
+    Прошлые счётчики хранятся в одном массиве double (по FIELDS значений на устройство);
+    пока набор устройств не меняется, снимок только перезаписывает массив.
+    """
+    FIELDS = 5
+
+    def __init__(self):
+        self._names: tuple[str, ...] = ()
+        self._last = array.array('d')
+        self._last_time: Optional[float] = None
+
+    def update(self, counters: dict[str, tuple[int, ...]], now: float = None) -> list[schemas.IOStatDevice]:
+        """
+        Скорости с прошлого снимка: байт/с, операций/с и занятость устройства, %
+
+        Для новых устройств и после сброса счётчиков значения - None.
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._last_time if self._last_time is not None else 0
+        names = tuple(counters)
+        if names != self._names:
+            previous = {name: self._last[i * self.FIELDS:(i + 1) * self.FIELDS] for i, name in enumerate(self._names)}
+            self._last = array.array('d', [-1.0] * (len(names) * self.FIELDS))
+            for i, name in enumerate(names):
+                if name in previous:
+                    self._last[i * self.FIELDS:(i + 1) * self.FIELDS] = previous[name]
+            self._names = names
+
+        devices = []
+        last = self._last
+        for i, (name, values) in enumerate(counters.items()):
+            offset = i * self.FIELDS
+            deltas = [value - last[offset + field] for field, value in enumerate(values)]
+            if elapsed <= 0 or last[offset] < 0 or min(deltas) < 0:
+                devices.append(schemas.IOStatDevice(title=name))
+            else:
+                reads, read_bytes, writes, write_bytes, busy_ms = deltas
+                devices.append(schemas.IOStatDevice(
+                    title=name,
+                    read_bytes_rate=read_bytes / elapsed,
+                    write_bytes_rate=write_bytes / elapsed,
+                    read_iops=reads / elapsed,
+                    write_iops=writes / elapsed,
+                    utilization=min(busy_ms / (elapsed * 1000) * 100, 100.0),
+                ))
+            last[offset:offset + self.FIELDS] = array.array('d', values)
+        self._last_time = now
+        return devices
+
+
+io_rates = DiskIORates()
+
+
+@lru_cache(maxsize=4)
+def _whole_disks(names: tuple[str, ...]) -> tuple[str, ...]:
+    # Разделы и виртуальные устройства (loop, ram) не показываются
+    try:
+        block_devices = set(os.listdir('/sys/block'))
+    except OSError:
+        block_devices = set(names)
+    return tuple(
+        name for name in names
+        if name in block_devices and not name.startswith(('loop', 'ram', 'zram'))
+    )
+
+
+def get_io_stat() -> schemas.IOStat:
+    if proc_diskstats is not None:
+        counters = proc_diskstats.read()
+    else:
+        counters = {
+            name: (counter.read_count, counter.read_bytes, counter.write_count, counter.write_bytes,
+                   getattr(counter, 'busy_time', 0))
+            for name, counter in psutil.disk_io_counters(perdisk=True).items()
+        }
+
+    disks = _whole_disks(tuple(counters))
+    return schemas.IOStat(devices=io_rates.update({name: counters[name] for name in disks}))
+
+
+def get_process_stat(limit: int = 10, sort: ProcessSort = ProcessSort.CPU) -> schemas.ProcessStat:
+    return schemas.ProcessStat(items=[
+        schemas.ProcessStatItem(pid=entry.pid, title=entry.name, cpu_percent=entry.cpu_percent, rss=entry.rss)
+        for entry in process_table.top(limit, sort)
+    ])
@@ -1,5 +1,9 @@
+import asyncio
+import json
 import logging
 import time
+from enum import Enum, unique
+from typing import Any, Iterable, Optional
 
 from fastapi.websockets import WebSocket
 from fastapi.websockets import WebSocketState
@@ -8,43 +12,270 @@ from fastapi.websockets import WebSocketDisconnect
 from src.exceptions import AccessDenied
 
 
+def encode_message(message: str | dict | bytes, json_mode: str = "binary") -> dict[str, Any]:
+    """
+    Сериализация сообщения в готовый ASGI-кадр
+
+    Кадр можно отправить любому количеству соединений без повторной сериализации.
+
+    :param message: сообщение
+    :param json_mode: режим отправки словаря ("text" или "binary")
+    :return: ASGI-сообщение "websocket.send"
+    """
+    if isinstance(message, str):
+        return {"type": "websocket.send", "text": message}
+    elif isinstance(message, dict):
+        if json_mode not in {"text", "binary"}:
+            raise RuntimeError('The "json_mode" argument should be "text" or "binary".')
+        text = json.dumps(message, separators=(",", ":"))
+        if json_mode == "text":
+            return {"type": "websocket.send", "text": text}
+        return {"type": "websocket.send", "bytes": text.encode("utf-8")}
+    elif isinstance(message, bytes):
+        return {"type": "websocket.send", "bytes": message}
+    else:
+        raise TypeError("Message type not supported")
+
+
+# Ответ на `ping` клиента сериализуется один раз на все подключения
+PONG_FRAME = encode_message("pong")
+
+
+@unique
+class OverflowPolicy(str, Enum):
+    """
+    Политика переполнения очереди исходящих кадров подключения
+
+    """
+    DROP_OLDEST = "drop_oldest"  # вытеснять самый старый кадр
+    KEEP_LATEST = "keep_latest"  # хранить только последний кадр
+    DISCONNECT = "disconnect"  # отключать клиента после N потерянных кадров
+
+
+class WSConnection:
+    """
+    Подключение: ограниченная очередь исходящих кадров, задача-писатель и счётчики
+
+    """
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[tuple[float, dict[str, Any]]] = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.options: dict[str, Any] = {}
+        self.connected_at = time.time()
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    def info(self) -> dict[str, Any]:
+        client = self.websocket.client
+        return {
+            "host": client.host if client else None,
+            "port": client.port if client else None,
+            "connected_at": self.connected_at,
+            "pending": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag": self.lag,
+            "max_lag": self.max_lag,
+        }
+
+
 class WSConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+    """
+    Менеджер подключений ws
+
+    Каждое подключение получает собственную ограниченную очередь и задачу-писатель,
+    поэтому рассылка никогда не ждёт медленного клиента.
+
+    Живость подключений проверяет сервер ASGI ping-кадрами протокола WebSocket
+    (`uvicorn --ws-ping-interval/--ws-ping-timeout`, включено по умолчанию): оборванное
+    соединение закрывается сервером, писатель и цикл чтения получают отключение
+    и снимают подключение. Текстовый `ping` клиента получает ответ `pong` через очередь подключения.
+
+    :param queue_size: размер очереди исходящих кадров подключения
+    :param overflow_policy: политика переполнения очереди
+    :param max_dropped: число потерянных кадров до отключения (для OverflowPolicy.DISCONNECT)
+    :param close_timeout: ожидание закрытия соединения с клиентом, сек
+    """
+
+    def __init__(
+            self,
+            queue_size: int = 8,
+            overflow_policy: OverflowPolicy | str = OverflowPolicy.DROP_OLDEST,
+            max_dropped: int = 100,
+            close_timeout: float = 5.0
+    ):
+        self.connections: dict[WebSocket, WSConnection] = {}
+        self._queue_size = queue_size
+        self._overflow_policy = OverflowPolicy(overflow_policy)
+        self._max_dropped = max_dropped
+        self._close_timeout = close_timeout
+        self._closing: set[asyncio.Task] = set()
+        self._log = logging.getLogger(__name__)
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket, subprotocol: str = None) -> WSConnection:
+        await websocket.accept(subprotocol=subprotocol)
+        connection = WSConnection(websocket, self._queue_size)
+        connection.writer = asyncio.create_task(self._writer(connection))
+        self.connections[websocket] = connection
+        return connection
 
-    async def connect(self, websocket: WebSocket) -> None:
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    def _unregister(self, websocket: WebSocket) -> None:
+        connection = self.connections.pop(websocket, None)
+        if connection:
+            connection.closed = True
+            if connection.writer and connection.writer is not asyncio.current_task():
+                connection.writer.cancel()
+
+    async def _close(self, websocket: WebSocket, code: int, reason: Optional[str]) -> None:
+        if websocket.client_state != WebSocketState.CONNECTED:
+            return
+        try:
+            # Закрытие ждёт ответа клиента; зависший клиент не задерживает дольше close_timeout
+            await asyncio.wait_for(websocket.close(code=code, reason=reason), self._close_timeout)
+        except (RuntimeError, asyncio.TimeoutError):
+            pass
 
     async def disconnect(self, websocket: WebSocket, code: int = 1000, reason: str = None) -> None:
-        if websocket.client_state == WebSocketState.CONNECTED:
-            await websocket.close(code=code, reason=reason)
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self._unregister(websocket)
+        await self._close(websocket, code, reason)
+
+    def disconnect_later(self, websocket: WebSocket, code: int = 1000, reason: str = None) -> None:
+        """
+        Отключение без ожидания клиента: подключение снимается сразу, закрытие идёт в отдельной задаче
+
+        Используется из рассылки и проверок, которые не должны ждать медленного клиента.
+        """
+        self._unregister(websocket)
+        task = asyncio.create_task(self._close(websocket, code, reason))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def get_connection(self, websocket: WebSocket) -> Optional[WSConnection]:
+        return self.connections.get(websocket)
 
     async def send_message(self, websocket: WebSocket, *, message: str | dict | bytes, json_mode: str = "binary"):
+        connection = self.connections.get(websocket)
+        if connection:
+            await self.enqueue(connection, encode_message(message, json_mode))
+
+    async def send_frame(self, websocket: WebSocket, frame: dict[str, Any]) -> None:
+        """
+        Отправка заранее сериализованного кадра (см. `encode_message`) в обход очереди
+
+        """
         if websocket.client_state == WebSocketState.CONNECTED:
-            if isinstance(message, str):
-                await websocket.send_text(message)
-            elif isinstance(message, dict):
-                await websocket.send_json(message, json_mode)
-            elif isinstance(message, bytes):
-                await websocket.send_bytes(message)
-            else:
-                raise TypeError("Message type not supported")
+            try:
+                await websocket.send(frame)
+            except (WebSocketDisconnect, RuntimeError):
+                await self.disconnect(websocket)
 
-    async def receive_text(self, websocket: WebSocket) -> str:
+    async def enqueue(self, connection: WSConnection, frame: dict[str, Any]) -> None:
+        """
+        Постановка кадра в очередь подключения с учётом политики переполнения
+
+        """
+        if connection.closed:
+            return
+        item = (time.monotonic(), frame)
+        if not connection.queue.full():
+            connection.queue.put_nowait(item)
+            return
+
+        if self._overflow_policy == OverflowPolicy.DROP_OLDEST:
+            connection.queue.get_nowait()
+            connection.dropped += 1
+        elif self._overflow_policy == OverflowPolicy.KEEP_LATEST:
+            while not connection.queue.empty():
+                connection.queue.get_nowait()
+                connection.dropped += 1
+        else:
+            connection.dropped += 1
+            if connection.dropped >= self._max_dropped:
+                self._log.warning("Disconnecting slow ws client %s", connection.websocket.client)
+                self.disconnect_later(connection.websocket, code=1008, reason="Too slow")
+            return
+        connection.queue.put_nowait(item)
+
+    async def _writer(self, connection: WSConnection) -> None:
         try:
-            return await websocket.receive_text()
-        except (WebSocketDisconnect, RuntimeError):
-            await self.disconnect(websocket)
-
-    async def broadcast(self, dictionary: dict) -> None:
-        for connection in self.active_connections:
-            if connection.client_state == WebSocketState.CONNECTED:
-                await self.send_message(connection, message=dictionary)
+            while not connection.closed:
+                enqueued_at, frame = await connection.queue.get()
+                await self.send_frame(connection.websocket, frame)
+                connection.sent += 1
+                connection.lag = time.monotonic() - enqueued_at
+                connection.max_lag = max(connection.max_lag, connection.lag)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._log.exception("ws writer failed for client %s", connection.websocket.client)
+        finally:
+            # Без писателя очередь некому разбирать: подключение закрывается
+            if not connection.closed:
+                await self.disconnect(connection.websocket, code=1011, reason="Internal error")
+
+    async def receive_text(self, websocket: WebSocket) -> str:
+        """
+        Следующее сообщение клиента; `ping` получает ответ `pong` здесь
+
+        """
+        connection = self.connections.get(websocket)
+        while True:
+            try:
+                message = await websocket.receive_text()
+            except (WebSocketDisconnect, RuntimeError):
+                await self.disconnect(websocket)
+                return None
+            if connection is None or message != "ping":
+                return message
+            await self.enqueue(connection, PONG_FRAME)
+
+    async def broadcast(
+            self,
+            message: str | dict | bytes,
+            json_mode: str = "binary",
+            connections: Iterable[WSConnection] = None
+    ) -> None:
+        """
+        Рассылка сообщения подключениям
+
+        Сообщение сериализуется один раз, после чего один и тот же кадр
+        ставится в очередь каждого подключения: медленный клиент не задерживает остальных.
+
+        :param message: сообщение
+        :param json_mode: режим отправки словаря
+        :param connections: получатели (по умолчанию - все подключения)
+        """
+        await self.broadcast_frame(encode_message(message, json_mode), connections)
+
+    async def broadcast_frame(self, frame: dict[str, Any], connections: Iterable[WSConnection] = None) -> None:
+        """
+        Рассылка заранее сериализованного кадра (см. `encode_message`)
+
+        """
+        if connections is None:
+            connections = self.connections.values()
+        for connection in list(connections):
+            if connection.websocket.client_state == WebSocketState.CONNECTED:
+                await self.enqueue(connection, frame)
             else:
-                await self.disconnect(connection)
+                self._unregister(connection.websocket)
+
+    def get_connections_info(self) -> list[dict[str, Any]]:
+        """
+        Счётчики потерь и задержки по каждому подключению
+
+        """
+        return [connection.info() for connection in self.connections.values()]
 
 
 def _ws_jwt_auth(func):
@@ -66,12 +297,9 @@ class WSJWTConnectionManager(WSConnectionManager):
 
     """
 
-    def __init__(self):
-        super().__init__()
-
     @_ws_jwt_auth
-    async def send_message(self, websocket: WebSocket, *, message: str | dict | bytes, json_mode: str = "binary"):
-        await super().send_message(websocket, message=message, json_mode=json_mode)
+    async def send_frame(self, websocket: WebSocket, frame: dict[str, Any]) -> None:
+        await super().send_frame(websocket, frame)
 
     async def receive_text(self, websocket: WebSocket) -> str:
         return await super().receive_text(websocket)
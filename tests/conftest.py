@@ -1,4 +1,6 @@
 import asyncio
+import os
+import tempfile
 
 import pytest
 from fastapi.testclient import TestClient
@@ -6,7 +8,7 @@ from fastapi.testclient import TestClient
 from src.dependencies.repos import get_repos
 from src.services.repository import RepoFactory
 from src.db import create_sqlite_async_session
-from src.app import app, tables, redis_pool
+from src.app import app, config, tables, redis_pool
 from src.utils import RedisClient
 
 
@@ -18,6 +20,48 @@ async def get_repos_fake():
 app.dependency_overrides[get_repos] = get_repos_fake
 
 
+@pytest.fixture(autouse=True, scope="session")
+def app_storage(tmp_path_factory):
+    """
+    Файлы истории статистики и снимок сведений о системе пишутся во временный каталог
+
+    """
+    storage = tmp_path_factory.mktemp("storage")
+    config.STATS.HISTORY_PATH = str(storage / "stats")
+    config.INFO.INVENTORY_PATH = str(storage / "inventory.json")
+    yield storage
+
+
+@pytest.fixture(autouse=True, scope="session")
+def local_network_probe():
+    """
+    Проверка сети в тестах не обращается к внешним адресам: только по запросу и к loopback
+
+    """
+    config.INFO.PROBE_BACKGROUND = False
+    config.INFO.PROBE_TARGETS = "127.0.0.1:9"
+    config.INFO.PROBE_TIMEOUT = 0.2
+
+
+@pytest.fixture(autouse=True, scope="session")
+def redis_storage():
+    """
+    Снимки тестового Redis (dump.rdb) пишутся во временный каталог, а не в рабочий
+
+    Каталог не удаляется после тестов: Redis продолжает сохранять в него снимки.
+    """
+    path = os.path.join(tempfile.gettempdir(), "webpanel-test-redis")
+    os.makedirs(path, exist_ok=True)
+
+    async def configure():
+        pool = await redis_pool(1)
+        await pool.config_set("dir", path)
+        await pool.close()
+
+    asyncio.run(configure())
+    yield path
+
+
 async def on_startup_event():
     """
             for testing use 'test.db'
@@ -16,6 +16,17 @@ def test_test_system_info():
         assert response.status_code == 200
         assert response.json().get("cpu") is not None
 
+        # Повторная загрузка без изменений - 304 без тела
+        cookies = dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        )
+        etag = response.headers["etag"]
+        response = init_client.get("/api/v1/info/system", headers={"If-None-Match": etag}, cookies=cookies)
+        assert response.status_code == 304
+        assert response.content == b""
+
 
 def test_version():
     with client as init_client:
@@ -1,3 +1,135 @@
+import msgpack
+
+from .auth_router_test import get_register_data
 from ...conftest import client
 
 
+def test_stats_ws_ping():
+    with client as init_client:
+        user_data = get_register_data(init_client)
+        init_client.cookies.update(dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        ))
+        with init_client.websocket_connect("/api/v1/stats/ws") as websocket:
+            websocket.send_text("ping")
+            assert websocket.receive_text() == "pong"
+        init_client.cookies.clear()
+
+
+def test_stats_ws_delta_resync():
+    with client as init_client:
+        user_data = get_register_data(init_client)
+        init_client.cookies.update(dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        ))
+        with init_client.websocket_connect("/api/v1/stats/ws?mode=delta") as websocket:
+            websocket.send_text("resync")
+            websocket.send_text("ping")
+            assert websocket.receive_text() == "pong"
+        init_client.cookies.clear()
+
+
+def test_stats_ws_msgpack_schema():
+    with client as init_client:
+        user_data = get_register_data(init_client)
+        init_client.cookies.update(dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        ))
+        with init_client.websocket_connect("/api/v1/stats/ws?format=msgpack") as websocket:
+            schema = msgpack.unpackb(websocket.receive_bytes())
+            assert schema["type"] == "schema"
+            assert schema["format"] == "msgpack"
+            assert [field["name"] for field in schema["layout"]][:4] == ["cpu", "ram", "rom", "lan"]
+
+        with init_client.websocket_connect("/api/v1/stats/ws", subprotocols=["stats.msgpack"]) as websocket:
+            assert websocket.accepted_subprotocol == "stats.msgpack"
+            assert msgpack.unpackb(websocket.receive_bytes())["type"] == "schema"
+        init_client.cookies.clear()
+
+
+def test_stats_history():
+    with client as init_client:
+        user_data = get_register_data(init_client)
+        cookies = dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        )
+        response = init_client.get("/api/v1/stats/history", params={"metrics": "cpu.*"}, cookies=cookies)
+        assert response.status_code == 200
+        assert response.json()["resolution"] == 3
+
+        response = init_client.get("/api/v1/stats/history", params={"resolution": 5}, cookies=cookies)
+        assert response.status_code == 400
+
+
+def test_stats_ws_topics():
+    with client as init_client:
+        user_data = get_register_data(init_client)
+        init_client.cookies.update(dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        ))
+        with init_client.websocket_connect("/api/v1/stats/ws?topics=cpu") as websocket:
+            websocket.send_text('{"subscribe": ["ram", "lan:lo"]}')
+            assert websocket.receive_json() == {"type": "subscription", "topics": ["lan:lo", "ram"], "interval": 3}
+            websocket.send_text('{"unsubscribe": ["ram"]}')
+            assert websocket.receive_json()["topics"] == ["lan:lo"]
+            websocket.send_text('{"subscribe": ["gpu"]}')
+            assert websocket.receive_text() == "Unknown topic: gpu"
+        init_client.cookies.clear()
+
+
+def test_stats_ws_interval():
+    with client as init_client:
+        user_data = get_register_data(init_client)
+        init_client.cookies.update(dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        ))
+        scheduler = init_client.app.state.stats_scheduler
+        with init_client.websocket_connect("/api/v1/stats/ws?interval=10") as websocket:
+            websocket.send_text('{"interval": 0.1}')
+            assert websocket.receive_json()["interval"] == 1
+            assert scheduler.interval == 1
+        init_client.cookies.clear()
+
+
+def test_stats_processes():
+    with client as init_client:
+        user_data = get_register_data(init_client)
+        cookies = dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        )
+        response = init_client.get("/api/v1/stats/processes", params={"sort": "rss", "limit": 3}, cookies=cookies)
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert len(items) == 3
+        assert items[0]["rss"] >= items[1]["rss"] >= items[2]["rss"]
+
+
+def test_metrics():
+    with client as init_client:
+        response = init_client.get("/api/v1/metrics")
+        assert response.status_code != 200
+
+        user_data = get_register_data(init_client)
+        cookies = dict(
+            access_token=user_data["access_token"],
+            refresh_token=user_data["refresh_token"],
+            session_id=user_data["session_id"]
+        )
+        response = init_client.get("/api/v1/metrics", cookies=cookies)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE webpanel_sampler_ticks_total counter" in response.text
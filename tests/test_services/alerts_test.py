@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import redis.asyncio as redis
+
+from src.models.notify_level import NotifyLevel
+from src.services.stats import notify_alerts
+from src.services.stats.alerts import AlertEngine, SlidingWindow, parse_rules
+from src.utils import RedisClient
+
+
+def test_parse_rules():
+    cpu, volume = parse_rules("cpu.percent > 90 for 60\nrom.volumes.*.percent >= 95 clear 90 level error;")
+    assert (cpu.threshold, cpu.duration, cpu.aggregate, cpu.clear) == (90, 60, "min", 85.5)
+    assert (volume.op, volume.clear, volume.level) == (">=", 90, NotifyLevel.ERROR)
+    assert parse_rules("") == []
+    with pytest.raises(ValueError):
+        parse_rules("cpu.percent is high")
+
+
+def test_sliding_window():
+    window = SlidingWindow(10)
+    for timestamp, value in enumerate([5, 1, 7, 3]):
+        window.add(timestamp * 5, value)
+    # В окне значения за [5, 15]
+    assert (window.value("min"), window.value("max"), window.value("avg")) == (1, 7, 11 / 3)
+    window.add(100, 2)
+    assert not window.full(100)
+
+
+def test_alert_fires_after_duration_with_hysteresis():
+    engine = AlertEngine(parse_rules("cpu.percent > 90 for 6; rom.volumes.*.percent > 95"))
+    assert engine.sections() == {"cpu", "rom"}
+
+    def run(timestamp, cpu):
+        return [(event.metric, event.firing) for event in engine.evaluate({"cpu.percent": cpu}, timestamp)]
+
+    assert run(0, 95) == []
+    assert run(3, 95) == []
+    assert run(6, 95) == [("cpu.percent", True)]
+    # Колебания около порога не снимают оповещение
+    assert run(9, 89) == []
+    assert run(12, 91) == []
+    assert run(15, 80) == [("cpu.percent", False)]
+    assert run(18, 95) == []
+
+    events = engine.evaluate({"rom.volumes.vda1.percent": 97, "rom.volumes.vdb1.percent": 50}, 0)
+    assert [event.metric for event in events] == ["rom.volumes.vda1.percent"]
+    assert engine.active() == [("rom.volumes.vda1.percent", engine.rules[1])]
+
+
+def test_alert_resolved_when_metric_disappears():
+    engine = AlertEngine(parse_rules("rom.volumes.*.percent > 95 for 6"))
+    for timestamp in (0, 3, 6):
+        events = engine.evaluate({"rom.volumes.sdb1.percent": 99}, timestamp)
+    assert [(event.metric, event.firing) for event in events] == [("rom.volumes.sdb1.percent", True)]
+
+    # Диск отключён: оповещение держится, пока метрики нет дольше окна (не меньше STALE_AFTER)
+    assert engine.evaluate({}, 30) == []
+    events = engine.evaluate({}, 37)
+    assert [(event.metric, event.value, event.firing) for event in events] == [
+        ("rom.volumes.sdb1.percent", None, False)
+    ]
+    assert engine.active() == []
+
+
+def test_disappeared_metrics_are_forgotten():
+    engine = AlertEngine(parse_rules("rom.volumes.*.percent > 95 for 6"))
+    engine.evaluate({"rom.volumes.sdb1.percent": 10, "lan.interfaces.veth1.bytes_recv": 1}, 0)
+    assert "rom.volumes.sdb1.percent" in engine._index
+
+    # Метрик нет дольше окон всех правил: индекс не хранит исчезнувшие диски и интерфейсы
+    for timestamp in range(3, 70, 3):
+        engine.evaluate({"rom.volumes.sda1.percent": 10}, timestamp)
+    assert set(engine._seen) == {"rom.volumes.sda1.percent"}
+    assert set(engine._index) == {"rom.volumes.sda1.percent"}
+
+def test_notify_alerts_survives_redis_failure():
+    async def run():
+        redis_client = RedisClient(redis.from_url("redis://localhost:1/0", decode_responses=True))
+        app = SimpleNamespace(state=SimpleNamespace(redis=redis_client))
+        engine = AlertEngine(parse_rules("cpu.percent > 90"))
+        # Уведомление не доставлено, но оповещение сработало и такт не прерван
+        await notify_alerts(app, engine, {"cpu": {"percent": 95}}, 0)
+        assert engine.active() == [("cpu.percent", engine.rules[0])]
+
+    asyncio.run(run())
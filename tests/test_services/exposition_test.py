@@ -0,0 +1,49 @@
+from src.services.stats.exposition import MetricsExposition
+from src.services.stats.sampler import StatsSampler
+from src.utils.singleflight import SingleFlight
+from src.utils.wsmanager import WSConnectionManager
+
+
+def test_snapshot_cached_per_tick():
+    sampler = StatsSampler({})
+    sampler.snapshot = {
+        "cpu": {"percent": 12.5, "cores": [{"percent": 3.0}]},
+        "ram": {"total_space": 2, "used_space": 1, "free_space": 1},
+        "lan": {"interfaces": [{"title": 'eth"0', "bytes_recv": 10, "bytes_sent": 5}]},
+    }
+    sampler.ticks = 1
+    exposition = MetricsExposition(sampler, WSConnectionManager(), token="secret")
+
+    body = exposition.body().decode()
+    assert "webpanel_cpu_percent 12.5\n" in body
+    assert 'webpanel_cpu_core_percent{core="0"} 3.0\n' in body
+    assert 'webpanel_memory_bytes{kind="total"} 2097152.0\n' in body
+    assert 'webpanel_network_receive_bytes_total{interface="eth\\"0"} 10.0\n' in body
+    assert "webpanel_ws_connections 0.0\n" in body
+
+    # Снимок отображается раз за такт, собственные метрики - при каждом опросе
+    exposition.body()
+    assert exposition.renders == 1
+    sampler.snapshot_time = 100.0
+    assert "webpanel_sampler_snapshot_age_seconds 50.0\n" in exposition.body(now=150.0).decode()
+    assert "webpanel_sampler_snapshot_age_seconds 80.0\n" in exposition.body(now=180.0).decode()
+    assert exposition.renders == 1
+    sampler.ticks = 2
+    exposition.body()
+    assert exposition.renders == 2
+
+    assert exposition.check_token("secret")
+    assert not exposition.check_token("wrong") and not exposition.check_token(None)
+    sampler.close()
+
+
+def test_render_info_counters():
+    sampler = StatsSampler({})
+    flight = SingleFlight()
+    flight.calls["system"], flight.coalesced["system"] = 1, 4
+    exposition = MetricsExposition(sampler, WSConnectionManager(), info_flight=flight)
+
+    body = exposition.body().decode()
+    assert 'webpanel_singleflight_calls_total{operation="system"} 1.0\n' in body
+    assert 'webpanel_singleflight_coalesced_total{operation="system"} 4.0\n' in body
+    sampler.close()
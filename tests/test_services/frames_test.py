@@ -0,0 +1,57 @@
+from src.models import schemas
+from src.services.stats.frames import DeltaEncoder, flatten, build_layout, pack
+
+
+def _snapshot(percent: float, volumes: int = 1) -> dict:
+    return {
+        "cpu": {"percent": percent, "cores": [{"percent": percent}, {"percent": 1.0}]},
+        "rom": {"volumes": [{"title": f"sda{i}", "total_space": 100} for i in range(volumes)]},
+    }
+
+
+def test_flatten():
+    assert flatten(_snapshot(5.0)) == {
+        "cpu.percent": 5.0,
+        "cpu.cores.0.percent": 5.0,
+        "cpu.cores.1.percent": 1.0,
+        "rom.volumes.0.title": "sda0",
+        "rom.volumes.0.total_space": 100,
+    }
+
+
+def test_delta_stream():
+    encoder = DeltaEncoder(keyframe_interval=3)
+
+    frame = encoder.encode(_snapshot(5.0))
+    assert frame == {"type": "keyframe", "seq": 1, "data": _snapshot(5.0)}
+
+    frame = encoder.encode(_snapshot(7.0))
+    assert frame == {"type": "delta", "seq": 2, "changes": {"cpu.percent": 7.0, "cpu.cores.0.percent": 7.0}}
+
+    frame = encoder.encode(_snapshot(7.0))
+    assert frame == {"type": "delta", "seq": 3, "changes": {}}
+
+    assert encoder.keyframe() == {"type": "keyframe", "seq": 3, "data": _snapshot(7.0)}
+
+
+def test_keyframe_on_structure_change_and_interval():
+    encoder = DeltaEncoder(keyframe_interval=2)
+    encoder.encode(_snapshot(1.0))
+    assert encoder.encode(_snapshot(1.0, volumes=2))["type"] == "keyframe"
+
+    assert encoder.encode(_snapshot(2.0, volumes=2))["type"] == "delta"
+    assert encoder.encode(_snapshot(3.0, volumes=2))["type"] == "delta"
+    assert encoder.encode(_snapshot(4.0, volumes=2))["type"] == "keyframe"
+
+
+def test_pack_by_layout():
+    layout = build_layout(schemas.CPUStat)
+    assert layout == [
+        "percent", "freq", "temperature",
+        {"name": "cores", "list": True, "fields": ["percent", "freq", "temperature"]},
+    ]
+    cpu = schemas.CPUStat(
+        percent=5.0, freq=3000.0, temperature=None,
+        cores=[schemas.CPUStatCore(percent=5.0, freq=3000.0, temperature=None)],
+    ).dict()
+    assert pack(cpu, layout) == [5.0, 3000.0, None, [[5.0, 3000.0, None]]]
@@ -0,0 +1,117 @@
+from src.services.stats.history import StatsHistory, metric_points, parse_tiers
+
+
+def _snapshot(percent: float) -> dict:
+    return {
+        "cpu": {"percent": percent, "temperature": None, "cores": [{"percent": percent}]},
+        "lan": {"interfaces": [{"title": "eth0", "bytes_recv": 100}]},
+    }
+
+
+def test_metric_points():
+    assert metric_points(_snapshot(5.0)) == {
+        "cpu.percent": 5.0,
+        "cpu.cores.0.percent": 5.0,
+        "lan.interfaces.eth0.bytes_recv": 100.0,
+    }
+
+
+def test_rollup_tiers():
+    history = StatsHistory()
+    base = 1_700_000_040.0  # начало минуты
+    for i, percent in enumerate([10.0, 20.0, 30.0, 40.0]):
+        history.add(_snapshot(percent), base + i * 3)
+
+    raw = history.query(["cpu.percent"], base, base + 60, resolution=3)
+    assert raw["timestamps"] == [base, base + 3, base + 6, base + 9]
+    assert raw["series"][0]["avg"] == [10.0, 20.0, 30.0, 40.0]
+    assert raw["series"][0]["min"] is None
+
+    minute = history.query(["cpu.*"], base, base + 60, resolution=60)
+    assert minute["timestamps"] == [base]
+    assert [series["metric"] for series in minute["series"]] == ["cpu.percent", "cpu.cores.0.percent"]
+    assert minute["series"][0]["min"] == [10.0]
+    assert minute["series"][0]["avg"] == [25.0]
+    assert minute["series"][0]["max"] == [40.0]
+
+
+def test_ring_overwrites_and_memory_is_bounded():
+    history = StatsHistory(max_metrics=2, tiers=((3, 30),))
+    for i in range(100):
+        history.add(_snapshot(float(i)), 3.0 * i)
+    assert history.metrics == ["cpu.percent", "cpu.cores.0.percent"]
+
+    result = history.query(["*"], 0, 300)
+    assert len(result["timestamps"]) == 10
+    assert result["series"][0]["avg"] == [float(i) for i in range(90, 100)]
+
+
+def test_stale_metric_slot_reclaimed():
+    history = StatsHistory(max_metrics=2, tiers=((3, 30),))
+    history.add({"a": 1, "veth0": 2}, 0.0)
+    history.add({"a": 1, "veth1": 3}, 3.0)
+    assert history.dropped == {"veth1"}
+
+    # veth0 не встречался дольше окна: его ряд очищается и достаётся veth1
+    history.add({"a": 1, "veth1": 4}, 36.0)
+    assert history.metrics == ["a", "veth1"] and not history.dropped
+    result = history.query(["veth*"], 0, 40)
+    assert result["series"][0]["metric"] == "veth1"
+    assert [value for value in result["series"][0]["avg"] if value is not None] == [4.0]
+
+
+def test_store_survives_reopen(tmp_path):
+    base = 1_700_000_040.0
+    history = StatsHistory(path=str(tmp_path), flush_interval=0)
+    history.add(_snapshot(10.0), base)
+    history.add(_snapshot(30.0), base + 3)
+    history.close()
+
+    reopened = StatsHistory(path=str(tmp_path))
+    assert reopened.metrics == ["cpu.percent", "cpu.cores.0.percent", "lan.interfaces.eth0.bytes_recv"]
+    # Минутный агрегат продолжает накапливаться после перезапуска
+    reopened.add(_snapshot(50.0), base + 6)
+    minute = reopened.query(["cpu.percent"], base, base + 60, resolution=60)
+    assert minute["series"][0]["avg"] == [30.0]
+    assert minute["series"][0]["min"] == [10.0]
+    assert minute["series"][0]["max"] == [50.0]
+    reopened.close()
+
+
+def test_store_recreated_on_layout_change(tmp_path):
+    history = StatsHistory(path=str(tmp_path), tiers=((3, 30),))
+    history.add(_snapshot(10.0), 3.0)
+    history.close()
+
+    reopened = StatsHistory(path=str(tmp_path), tiers=parse_tiers("3:60"))
+    assert reopened.query(["cpu.percent"], 0, 60)["series"][0]["avg"] == []
+    reopened.close()
+
+
+def test_shared_store_reload(tmp_path):
+    base = 1_700_000_040.0
+    reader = StatsHistory(path=str(tmp_path))
+    writer = StatsHistory(path=str(tmp_path), flush_interval=0)
+    writer.add(_snapshot(10.0), base)
+
+    # Файлы уровней общие: процесс, не пишущий историю, видит метрики и значения сборщика
+    result = reader.query(["cpu.*"], base, base + 3, resolution=3)
+    assert [series["metric"] for series in result["series"]] == ["cpu.percent", "cpu.cores.0.percent"]
+    assert result["series"][0]["avg"] == [10.0]
+    writer.close()
+    reader.close()
+
+
+def test_store_has_single_writer(tmp_path):
+    first = StatsHistory(path=str(tmp_path))
+    second = StatsHistory(path=str(tmp_path))
+    memory = StatsHistory()
+    assert first.claim() and first.claim()
+    # Хранилище пишет один процесс, пока не передаст право записи
+    assert not second.claim()
+    assert memory.claim()
+    first.release()
+    assert second.claim()
+    second.close()
+    assert first.claim()
+    first.close()
@@ -0,0 +1,142 @@
+import threading
+import time
+
+from src.models import schemas
+from src.models.inventory_component import InventoryComponent
+from src.services.inventory import SystemInventory, etag_matches, parse_ttls
+
+
+def _loaders(calls: dict, ram: list):
+    def loader(component: InventoryComponent, value):
+        def load():
+            calls[component] = calls.get(component, 0) + 1
+            return value() if callable(value) else value
+        return load
+
+    return {
+        InventoryComponent.CPU: loader(InventoryComponent.CPU, schemas.CPUInfo(model="cpu")),
+        InventoryComponent.OS: loader(InventoryComponent.OS, schemas.OSInfo(system="Linux")),
+        InventoryComponent.RAM: loader(InventoryComponent.RAM, lambda: schemas.RAMInfo(used_space=ram[0], sticks=[])),
+        InventoryComponent.ROM: loader(InventoryComponent.ROM, schemas.ROMInfo(disks=[])),
+        InventoryComponent.LAN: loader(InventoryComponent.LAN, schemas.LANInfo(interfaces=[])),
+    }
+
+
+def test_component_ttls():
+    calls, ram = {}, [100]
+    inventory = SystemInventory(
+        ttls={InventoryComponent.RAM: 0.05, InventoryComponent.ROM: 0},
+        loaders=_loaders(calls, ram),
+    )
+    body, etag = inventory.body()
+    assert schemas.SystemInfo.parse_raw(body).ram.used_space == 100
+    assert not inventory.stale()
+
+    # Свежий кэш отдаётся без загрузки и пересборки
+    assert inventory.body() == (body, etag)
+    assert inventory.builds == 1 and set(calls.values()) == {1}
+
+    # Истёк только компонент памяти; без изменений тело и ETag остаются прежними
+    time.sleep(0.06)
+    assert inventory.stale()
+    assert inventory.body() == (body, etag)
+    assert calls[InventoryComponent.RAM] == 2 and calls[InventoryComponent.ROM] == 1
+    assert inventory.builds == 1
+
+    ram[0] = 200
+    time.sleep(0.06)
+    changed, changed_etag = inventory.body()
+    assert changed_etag != etag and inventory.builds == 2
+    assert schemas.SystemInfo.parse_raw(changed).ram.used_space == 200
+
+
+def test_invalidate_component():
+    calls = {}
+    inventory = SystemInventory(loaders=_loaders(calls, [100]))
+    _, etag = inventory.body()
+    inventory.invalidate([InventoryComponent.CPU])
+    assert inventory.stale()
+    assert inventory.body()[1] == etag
+    assert calls[InventoryComponent.CPU] == 2 and calls[InventoryComponent.OS] == 1
+
+
+def test_cached_response_without_lock():
+    inventory = SystemInventory(loaders=_loaders({}, [100]))
+    assert inventory.cached() is None
+    response = inventory.body()
+    # Загрузка в другом потоке держит блокировку: готовый ответ отдаётся без ожидания
+    with inventory._lock:
+        assert inventory.cached() == response
+    inventory.invalidate([InventoryComponent.OS])
+    assert inventory.cached() is None
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_parse_ttls():
+    ttls = parse_ttls("cpu:0, ram:5")
+    assert ttls[InventoryComponent.CPU] == 0 and ttls[InventoryComponent.RAM] == 5
+    assert ttls[InventoryComponent.OS] == 3600
+
+
+def test_snapshot_restored_within_boot(tmp_path):
+    path = str(tmp_path / "inventory.json")
+    calls = {}
+    inventory = SystemInventory(loaders=_loaders(calls, [100]), path=path, boot="host:1")
+    inventory.warm()
+    assert calls == {InventoryComponent.CPU: 1, InventoryComponent.OS: 1}
+    # Прогрев не трогает быстрые компоненты, но следующее тело собирается заново
+    _, etag = inventory.body()
+    assert calls[InventoryComponent.RAM] == 1 and calls[InventoryComponent.CPU] == 1
+
+    # После перезапуска неизменные компоненты берутся из снимка
+    calls = {}
+    restarted = SystemInventory(loaders=_loaders(calls, [100]), path=path, boot="host:1")
+    assert restarted.restored == [InventoryComponent.CPU, InventoryComponent.OS]
+    assert restarted.body()[1] == etag
+    assert InventoryComponent.CPU not in calls and InventoryComponent.OS not in calls
+
+    # Снимок прошлой загрузки системы не используется
+    calls = {}
+    rebooted = SystemInventory(loaders=_loaders(calls, [100]), path=path, boot="host:2")
+    assert rebooted.restored == []
+    rebooted.body()
+    assert calls[InventoryComponent.CPU] == 1
+
+
+def test_snapshot_invalidate_and_corrupted(tmp_path):
+    path = tmp_path / "inventory.json"
+    inventory = SystemInventory(loaders=_loaders({}, [100]), path=str(path), boot="host:1")
+    inventory.warm()
+    inventory.invalidate([InventoryComponent.CPU])
+    restarted = SystemInventory(loaders=_loaders({}, [100]), path=str(path), boot="host:1")
+    assert restarted.restored == [InventoryComponent.OS]
+
+    path.write_text("{broken")
+    assert SystemInventory(loaders=_loaders({}, [100]), path=str(path), boot="host:1").restored == []
+
+
+def test_prewarm_in_background():
+    started, release = threading.Event(), threading.Event()
+
+    def slow_cpu():
+        started.set()
+        release.wait(1)
+        return schemas.CPUInfo(model="cpu")
+
+    calls = {}
+    loaders = {**_loaders(calls, [100]), InventoryComponent.CPU: slow_cpu}
+    inventory = SystemInventory(loaders=loaders)
+    thread = inventory.prewarm()
+    assert started.wait(1) and thread.is_alive()
+    release.set()
+    thread.join(1)
+    assert not thread.is_alive()
+    inventory.body()
+    assert inventory.loads[InventoryComponent.CPU] == 1
@@ -0,0 +1,112 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from starlette.websockets import WebSocketState
+
+from src.services.stats.publisher import StatsPublisher
+from src.services.stats.scheduler import StatsScheduler
+from src.utils.wsmanager import WSConnectionManager
+
+
+class RecordingWebSocket:
+    client = None
+
+    def __init__(self):
+        self.client_state = WebSocketState.CONNECTED
+        self.received = []
+
+    async def accept(self, subprotocol: str = None):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.client_state = WebSocketState.DISCONNECTED
+
+    async def send(self, message: dict):
+        self.received.append(json.loads(message["bytes"]))
+
+
+class FakeBGManager:
+    def __init__(self):
+        self.intervals = []
+        self.paused = False
+        self.start_date = None
+
+    def add_job(self, func, trigger: str = None, **kwargs) -> str:
+        self.intervals.append(kwargs["seconds"])
+        return "stats"
+
+    def reschedule_job(self, job_id, trigger: str = None, **kwargs) -> None:
+        self.intervals.append(kwargs["seconds"])
+        self.start_date = kwargs.get("start_date")
+        self.paused = False
+
+    def pause_job(self, job_id) -> None:
+        self.paused = True
+
+
+def test_shared_sampler_decimation():
+    async def run():
+        manager = WSConnectionManager(queue_size=32)
+        publisher = StatsPublisher(manager)
+        background_manager = FakeBGManager()
+        primed = []
+        scheduler = StatsScheduler(
+            background_manager, publisher, default_interval=3, min_interval=1, on_resume=lambda: primed.append(1)
+        )
+        scheduler.start(lambda: None)
+        assert background_manager.paused
+
+        fast, slow = RecordingWebSocket(), RecordingWebSocket()
+        await publisher.attach(await manager.connect(fast), interval=scheduler.clamp(0.5))
+        await publisher.attach(await manager.connect(slow), interval=scheduler.clamp(10))
+        scheduler.update()
+        assert background_manager.intervals == [3, 1]
+        assert not background_manager.paused and primed == [1]
+        # Первый снимок после простоя - сразу после подготовки, а не через интервал
+        assert background_manager.start_date - datetime.now() < timedelta(seconds=1)
+
+        for second in range(21):
+            await publisher.publish({"cpu": {"percent": second}}, tick=scheduler.interval, now=second)
+        await asyncio.sleep(0)
+        assert len(fast.received) == 21
+        assert [frame["cpu"]["percent"] for frame in slow.received] == [0, 10, 20]
+
+        await manager.disconnect(fast)
+        scheduler.update()
+        assert scheduler.interval == 10
+        await manager.disconnect(slow)
+        scheduler.update()
+        assert background_manager.paused and scheduler.paused
+
+    asyncio.run(run())
+
+
+def test_interval_must_be_finite():
+    scheduler = StatsScheduler(FakeBGManager(), StatsPublisher(WSConnectionManager()), min_interval=1, max_interval=60)
+    assert scheduler.clamp(0.5) == 1 and scheduler.clamp(600) == 60
+    for interval in (float("nan"), float("inf"), float("-inf")):
+        with pytest.raises(ValueError):
+            scheduler.clamp(interval)
+
+
+def test_background_consumers_keep_own_interval():
+    async def run():
+        manager = WSConnectionManager()
+        publisher = StatsPublisher(manager)
+        background_manager = FakeBGManager()
+        scheduler = StatsScheduler(background_manager, publisher, default_interval=3, background=60)
+        scheduler.start(lambda: None)
+        # Без подписчиков сборщик не останавливается, но работает с интервалом истории
+        assert background_manager.intervals == [60] and not background_manager.paused
+
+        websocket = RecordingWebSocket()
+        await publisher.attach(await manager.connect(websocket), interval=scheduler.clamp())
+        scheduler.update()
+        assert scheduler.interval == 3
+        await manager.disconnect(websocket)
+        scheduler.update()
+        assert scheduler.interval == 60 and not scheduler.paused
+
+    asyncio.run(run())
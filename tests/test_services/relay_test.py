@@ -0,0 +1,133 @@
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+import redis.asyncio as redis
+
+from src.app import redis_pool
+from src.models import schemas
+from src.services.stats import stat_worker
+from src.services.stats.publisher import StatsPublisher
+from src.services.stats.relay import StatsRelay
+from src.services.stats.sampler import StatsSampler
+from src.services.stats.scheduler import StatsScheduler
+from src.utils import RedisClient
+from src.utils.bgmanager import RedisLease
+from src.utils.wsmanager import WSConnectionManager
+from tests.test_services.publisher_test import FakeBGManager, RecordingWebSocket
+
+
+def relays(redis_client: RedisClient, count: int = 2, lease_ttl: float = 10.0) -> list[StatsRelay]:
+    channel = f"test:stats:{uuid.uuid4().hex}"
+    return [
+        StatsRelay(
+            redis_client,
+            RedisLease(redis_client, f"{channel}:sampler", ttl=lease_ttl, owner=f"worker-{index}"),
+            channel=channel,
+            demand_key=f"{channel}:demand",
+        )
+        for index in range(count)
+    ]
+
+
+def test_relay_election_failover():
+    async def run():
+        redis_client = RedisClient(await redis_pool(1))
+        first, second = relays(redis_client, lease_ttl=0.3)
+
+        assert await first.elect()
+        assert not await second.elect()
+        # Владелец продлевает аренду
+        assert await first.elect()
+
+        # Сборщик пропал без освобождения аренды: её получает другой процесс по истечении срока
+        await asyncio.sleep(0.4)
+        assert await second.elect()
+        assert not await first.elect()
+
+        await second.close()
+        assert await first.elect()
+        await first.close()
+        await redis_client.close()
+
+    asyncio.run(run())
+
+
+def test_relay_cluster_demand():
+    async def run():
+        redis_client = RedisClient(await redis_pool(1))
+        first, second, third = relays(redis_client, count=3)
+
+        await first.report_demand({"cpu"}, 5)
+        await second.report_demand({"ram", "lan"}, 2)
+        await third.report_demand(set(), None)
+        assert await first.cluster_demand() == ({"cpu", "ram", "lan"}, 2)
+
+        # Процессы, переставшие сообщать потребность, не учитываются
+        assert await first.cluster_demand(now=time.time() + 60) == (set(), None)
+        assert await first.cluster_demand() == (set(), None)
+        await redis_client.close()
+
+    asyncio.run(run())
+
+
+def test_relay_snapshots():
+    async def run():
+        redis_client = RedisClient(await redis_pool(1))
+        leader, follower = relays(redis_client)
+        received = []
+
+        async def handler(snapshot: dict, timestamp: float, interval: float):
+            received.append((snapshot, timestamp, interval))
+
+        leader.start(handler)
+        follower.start(handler)
+        await asyncio.sleep(0.1)
+
+        await leader.publish({"cpu": {"percent": 10.0}}, 100.0, 3.0)
+        for _ in range(50):
+            if received:
+                break
+            await asyncio.sleep(0.02)
+        # Свой снимок сборщик не получает
+        assert received == [({"cpu": {"percent": 10.0}}, 100.0, 3.0)]
+        assert (leader.received, follower.received) == (0, 1)
+
+        await leader.close()
+        await follower.close()
+        await redis_client.close()
+
+    asyncio.run(run())
+
+
+def test_stat_worker_samples_locally_without_redis():
+    async def run():
+        # Redis на закрытом порту: каждый вызов завершается ошибкой соединения
+        redis_client = RedisClient(redis.from_url("redis://localhost:1/0", decode_responses=True))
+        relay, = relays(redis_client, count=1)
+        manager = WSConnectionManager()
+        publisher = StatsPublisher(manager)
+        websocket = RecordingWebSocket()
+        await publisher.attach(await manager.connect(websocket), topics=frozenset({"ram"}))
+        scheduler = StatsScheduler(FakeBGManager(), publisher, background=3)
+        app = SimpleNamespace(state=SimpleNamespace(
+            stats_publisher=publisher,
+            stats_scheduler=scheduler,
+            stats_history=None,
+            stats_history_topics=frozenset(),
+            stats_alerts=None,
+            stats_relay=relay,
+            stats_sampler=StatsSampler({"ram": lambda: schemas.RAMStat(total_space=1)}),
+            background_manager=SimpleNamespace(leader=False),
+        ))
+
+        # Первый такт без Redis ставит точки отсчёта, со второго подписчики получают снимки
+        await stat_worker(app)
+        assert relay.fallback and not websocket.received
+        await stat_worker(app)
+        await asyncio.sleep(0.01)
+        assert websocket.received[-1]["ram"]["total_space"] == 1
+        await manager.disconnect(websocket)
+
+    asyncio.run(run())
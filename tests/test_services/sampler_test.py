@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from src.models import schemas
+from src.services.stats.sampler import StatsSampler
+
+
+def test_last_good_value_on_timeout():
+    release = threading.Event()
+    calls = []
+
+    def ram_stat():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return schemas.RAMStat(total_space=len(calls))
+
+    def broken_stat():
+        raise OSError("lsblk not found")
+
+    async def run():
+        sampler = StatsSampler({"ram": ram_stat, "rom": broken_stat}, timeout=0.05)
+        first = await sampler.collect()
+        assert first["ram"]["total_space"] == 1
+        assert first["rom"] is None
+
+        second = await sampler.collect()
+        assert second["ram"]["total_space"] == 1
+        assert sampler.timeouts["ram"] == 1
+        assert sampler.errors["rom"] == 2
+
+        # Зависший вызов не дублируется
+        await sampler.collect()
+        assert len(calls) == 2
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert (await sampler.collect())["ram"]["total_space"] == 3
+        sampler.close()
+
+    asyncio.run(run())
+
+
+def test_collect_sections():
+    calls = []
+
+    def ram_stat():
+        calls.append("ram")
+        return schemas.RAMStat(total_space=1)
+
+    def cpu_stat():
+        calls.append("cpu")
+        return schemas.CPUStat(percent=1.0)
+
+    async def run():
+        sampler = StatsSampler({"cpu": cpu_stat, "ram": ram_stat})
+        snapshot = await sampler.collect({"ram"})
+        assert snapshot["cpu"] is None
+        assert snapshot["ram"]["total_space"] == 1
+        assert calls == ["ram"]
+        sampler.close()
+
+    asyncio.run(run())
+
+
+def test_prime():
+    def broken_primer():
+        raise OSError("no /proc")
+
+    primed = []
+    sampler = StatsSampler({}, primers={"cpu": lambda: primed.append(1), "lan": broken_primer})
+    sampler.prime()
+    assert primed == [1]
+    sampler.close()
@@ -0,0 +1,32 @@
+import pytest
+
+from src.services.stats.topics import DEFAULT_TOPICS, SECTIONS, filter_snapshot, parse_topics, topic_sections
+
+SNAPSHOT = {
+    "cpu": {"percent": 10.0, "cores": [{"percent": 5.0}]},
+    "ram": {"used_space": 1024},
+    "rom": None,
+    "lan": {"interfaces": [
+        {"title": "lo", "bytes_sent": 1, "bytes_recv": 2},
+        {"title": "eth0", "bytes_sent": 3, "bytes_recv": 4},
+    ]},
+}
+
+
+def test_parse_topics():
+    assert parse_topics(["cpu", " lan:eth0"]) == frozenset({"cpu", "lan:eth0"})
+    assert topic_sections(parse_topics(["cpu", "lan:eth0"])) == {"cpu", "lan"}
+    for topic in ("gpu", "lan:"):
+        with pytest.raises(ValueError):
+            parse_topics([topic])
+
+
+def test_filter_snapshot():
+    assert filter_snapshot(SNAPSHOT, frozenset(SECTIONS)) is SNAPSHOT
+    assert filter_snapshot({**SNAPSHOT, "processes": {"items": []}}, DEFAULT_TOPICS) == {**SNAPSHOT, "processes": None}
+
+    filtered = filter_snapshot(SNAPSHOT, frozenset({"cpu", "lan:eth0"}))
+    assert filtered["cpu"] == SNAPSHOT["cpu"]
+    assert filtered["ram"] is None and filtered["rom"] is None
+    assert filtered["lan"]["interfaces"] == [SNAPSHOT["lan"]["interfaces"][1]]
+    assert len(SNAPSHOT["lan"]["interfaces"]) == 2
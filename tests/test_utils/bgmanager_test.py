@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import uuid
+
+import pytest
+import redis.asyncio as redis
+
+from src.app import redis_pool
+from src.utils import RedisClient
+from src.utils.bgmanager import BGManager, FileLease, Lease, RedisLease
+
+
+def test_lease_is_abstract():
+    with pytest.raises(TypeError):
+        Lease()
+
+
+def test_file_lease(tmp_path):
+    async def run():
+        path = str(tmp_path / "bgmanager.lock")
+        first, second = FileLease(path, owner="first"), FileLease(path)
+        assert await first.acquire()
+        with open(path) as file:
+            assert file.read() == "first"
+        assert await first.acquire()
+        assert not await second.acquire()
+
+        await first.release()
+        assert await second.acquire()
+        await second.release()
+
+    asyncio.run(run())
+
+
+def test_redis_lease_expires():
+    async def run():
+        redis_client = RedisClient(await redis_pool(1))
+        key = f"test:bgmanager:{uuid.uuid4().hex}"
+        first = RedisLease(redis_client, key, ttl=0.3, owner="first")
+        second = RedisLease(redis_client, key, ttl=0.3, owner="second")
+        assert await first.acquire()
+        assert not await second.acquire()
+
+        # Лидер пропал, не освободив аренду
+        await asyncio.sleep(0.4)
+        assert await second.acquire()
+        assert not await first.acquire()
+        await second.release()
+        await redis_client.close()
+
+    asyncio.run(run())
+
+
+def test_redis_lease_logs_outage_once(caplog):
+    async def run():
+        # Redis на закрытом порту: каждая попытка продления завершается ошибкой соединения
+        redis_client = RedisClient(redis.from_url("redis://localhost:1/0"))
+        lease = RedisLease(redis_client, "test:bgmanager:outage", ttl=0.3)
+        with caplog.at_level(logging.DEBUG):
+            for _ in range(3):
+                assert not await lease.acquire()
+        await redis_client.close()
+
+    asyncio.run(run())
+    records = [record for record in caplog.records if record.levelno >= logging.WARNING]
+    assert len(records) == 1 and not records[0].exc_info
+
+def test_singleton_job_failover(tmp_path):
+    async def run():
+        path = str(tmp_path / "bgmanager.lock")
+        runs = {"first": 0, "second": 0}
+
+        def job(name: str):
+            runs[name] += 1
+
+        managers = {}
+        for name in runs:
+            managers[name] = BGManager(lease=FileLease(path, ttl=0.3))
+            managers[name].add_job(job, "interval", singleton=True, seconds=0.05, args=(name,))
+            managers[name].start()
+
+        await asyncio.sleep(0.3)
+        assert runs["first"] > 0 and runs["second"] == 0
+        assert managers["first"].leader and not managers["second"].leader
+
+        # Задачи переходят к другому процессу в пределах срока аренды
+        managers["first"].shutdown()
+        await managers["first"].resign()
+        await asyncio.sleep(0.3)
+        assert managers["second"].leader and runs["second"] > 0
+
+        managers["second"].shutdown()
+        await managers["second"].resign()
+
+    asyncio.run(run())
+
+
+def test_jobs_without_lease():
+    async def run():
+        runs = []
+        manager = BGManager()
+        manager.add_job(runs.append, "interval", singleton=True, seconds=0.05, args=(1,))
+        manager.start()
+        await asyncio.sleep(0.12)
+        manager.shutdown()
+        assert manager.leader and runs
+
+    asyncio.run(run())
@@ -0,0 +1,117 @@
+import asyncio
+import math
+import socket
+
+from src.utils.connectivity import ConnectivityProber, ProbeTarget, ProbeWindow, default_interfaces, parse_targets
+from src.utils.singleflight import SingleFlight
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_parse_targets():
+    assert parse_targets("1.1.1.1:443, [::1]:53") == [ProbeTarget("1.1.1.1", 443), ProbeTarget("::1", 53)]
+
+
+def test_loopback_probe():
+    async def run():
+        server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        prober = ConnectivityProber(
+            [ProbeTarget("127.0.0.1", port), ProbeTarget("localhost", _closed_port())],
+            timeout=0.5,
+            interfaces=lambda: ["lo"],
+        )
+        await prober.refresh()
+
+        # Отказ соединения - тоже ответ цели
+        results = prober.results["lo"]
+        assert all(result.ok and result.rtt is not None for result in results.values())
+        info = prober.info()
+        assert info.interfaces[0].interface == "lo" and info.interfaces[0].has_global_network
+
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_unreachable_interface():
+    async def run():
+        prober = ConnectivityProber(
+            [ProbeTarget("127.0.0.1", _closed_port())],
+            timeout=0.2,
+            interfaces=lambda: ["no-such-if0"],
+        )
+        await prober.refresh()
+        result = prober.results["no-such-if0"][ProbeTarget("127.0.0.1", prober.targets[0].port)]
+        assert not result.ok and result.error
+        assert not prober.info().interfaces[0].has_global_network
+
+    asyncio.run(run())
+
+
+def test_probe_window():
+    window = ProbeWindow(size=4)
+    assert window.summary()["loss"] is None
+    for rtt in (0.010, None, 0.030, 0.020, 0.040):
+        window.add(rtt)
+
+    # Окно хранит последние 4 проверки: потеря, 30, 20, 40 мс
+    assert math.isnan(window.values()[0])
+    summary = window.summary()
+    assert summary["samples"] == 4 and summary["loss"] == 25.0
+    assert summary["rtt_p50"] == 30.0 and summary["rtt_p99"] == 40.0
+    assert summary["jitter"] == 15.0
+
+
+def test_network_stat():
+    async def run():
+        target = ProbeTarget("127.0.0.1", _closed_port())
+        prober = ConnectivityProber([target], timeout=0.5, interfaces=lambda: ["lo"], window=10)
+        for _ in range(3):
+            await prober.refresh()
+
+        info = prober.info().interfaces[0].targets[0]
+        assert info.target == str(target) and info.samples == 3 and info.loss == 0.0
+        assert info.rtt_p50 is not None
+
+        stat = prober.get_stat()
+        assert stat.interfaces[0].title == "lo" and stat.interfaces[0].targets[0].title == str(target)
+
+    asyncio.run(run())
+
+
+def test_stale_results():
+    async def run():
+        prober = ConnectivityProber([ProbeTarget("127.0.0.1", _closed_port())], interfaces=lambda: ["lo"], max_age=60)
+        assert prober.stale()
+        await prober.refresh()
+        assert not prober.stale()
+        # Процесс без фоновой проверки обновляет результаты по запросу
+        assert prober.stale(now=prober.updated_at + 61)
+
+    asyncio.run(run())
+
+
+def test_concurrent_refresh_coalesced():
+    async def run():
+        prober = ConnectivityProber([ProbeTarget("127.0.0.1", _closed_port())], interfaces=lambda: ["lo"])
+        flight = SingleFlight()
+        # Плановая проверка и первый запрос /info/network в одно время: в окно попадает одна проверка
+        await asyncio.gather(flight.do("network", prober.refresh), flight.do("network", prober.refresh))
+        assert prober.probes == 1
+        assert prober.windows[("lo", prober.targets[0])].summary()["samples"] == 1
+
+    asyncio.run(run())
+
+
+def test_default_interfaces_have_default_route():
+    with open("/proc/net/route", encoding="ascii") as file:
+        routed = {line.split()[0] for line in file if line.split()[1] == "00000000"}
+    interfaces = default_interfaces()
+    assert "lo" not in interfaces
+    assert routed <= set(interfaces)
@@ -0,0 +1,30 @@
+import os
+
+from src.models.process_sort import ProcessSort
+from src.utils import processes
+from src.utils.processes import ProcessSample, ProcessTable
+
+
+def test_cpu_percent_from_deltas_and_eviction(monkeypatch):
+    scans = [
+        [ProcessSample(1, "init", 1.0, 100, 0), ProcessSample(2, "worker", 5.0, 300, 10)],
+        [ProcessSample(1, "init", 1.5, 100, 0), ProcessSample(3, "new", 0.0, 200, 20)],
+    ]
+    clock = iter([0.0, 1.0])
+    monkeypatch.setattr(processes.time, "monotonic", lambda: next(clock))
+
+    table = ProcessTable(min_interval=0)
+    monkeypatch.setattr(table, "_scan", lambda: iter(scans.pop(0)))
+
+    assert [entry.pid for entry in table.top(1, ProcessSort.RSS)] == [2]
+    top = table.top(2, ProcessSort.CPU)
+    assert [(entry.pid, entry.cpu_percent) for entry in top] == [(1, 50.0), (3, None)]
+    # Завершившийся процесс вытеснен
+    assert len(table) == 2
+
+
+def test_scan_procfs_finds_self():
+    if not os.path.isdir("/proc/self"):
+        return
+    samples = {sample.pid: sample for sample in processes._scan_procfs()}
+    assert samples[os.getpid()].rss > 0
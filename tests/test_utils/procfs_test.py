@@ -0,0 +1,74 @@
+import psutil
+import pytest
+
+from src.utils import procfs
+
+pytestmark = pytest.mark.skipif(not procfs.available(), reason="/proc is not available")
+
+STAT = """cpu  {0} 0 {1} {2} 0 0 0 0 0 0
+cpu0 {0} 0 {1} {2} 0 0 0 0 0 0
+intr 1
+"""
+
+
+def test_proc_file_grows_buffer(tmp_path):
+    path = tmp_path / "meminfo"
+    path.write_bytes(b"x" * 100)
+    proc_file = procfs.ProcFile(str(path), size=16)
+    assert proc_file.read() == b"x" * 100
+    path.write_bytes(b"y" * 10)
+    assert proc_file.read() == b"y" * 10
+    proc_file.close()
+
+
+def test_cpu_percent(tmp_path):
+    path = tmp_path / "stat"
+    path.write_text(STAT.format(100, 100, 800))
+    cpu = procfs.CPUPercent(str(path))
+    assert cpu.read() == (20.0, [20.0])
+    path.write_text(STAT.format(130, 120, 850))
+    assert cpu.read() == (50.0, [50.0])
+    cpu.close()
+
+    cpu = procfs.CPUPercent()
+    percent, cores = cpu.read()
+    assert 0 <= percent <= 100
+    assert len(cores) == psutil.cpu_count()
+    cpu.close()
+
+
+def test_meminfo_matches_psutil():
+    meminfo = procfs.MemInfo()
+    memory = meminfo.read()
+    expected = psutil.virtual_memory()
+    swap = psutil.swap_memory()
+    assert memory.total == expected.total
+    assert memory.swap_total == swap.total
+    # Остальные значения меняются между чтениями
+    assert abs(memory.used - expected.used) < 64 * 1024 * 1024
+    assert abs(memory.free - expected.free) < 64 * 1024 * 1024
+    meminfo.close()
+
+
+def test_net_dev_matches_psutil():
+    net_dev = procfs.NetDev()
+    expected = psutil.net_io_counters(pernic=True)
+    counters = net_dev.read()
+    assert set(counters) == set(expected)
+    for name, (bytes_recv, bytes_sent) in counters.items():
+        assert bytes_recv >= expected[name].bytes_recv
+        assert bytes_sent >= expected[name].bytes_sent
+    net_dev.close()
+
+
+def test_diskstats_matches_psutil():
+    diskstats = procfs.DiskStats()
+    expected = psutil.disk_io_counters(perdisk=True)
+    counters = diskstats.read()
+    assert set(expected) <= set(counters)
+    for name, (reads, read_bytes, writes, write_bytes, busy_ms) in counters.items():
+        if name in expected:
+            assert reads >= expected[name].read_count
+            assert read_bytes >= expected[name].read_bytes
+            assert writes >= expected[name].write_count
+    diskstats.close()
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_result():
+    async def run():
+        flight = SingleFlight()
+        started = []
+
+        async def lsblk(value: int) -> int:
+            started.append(value)
+            await asyncio.sleep(0.05)
+            return value
+
+        results = await asyncio.gather(*(flight.do("system", lsblk, index) for index in range(10)))
+        assert results == [0] * 10 and started == [0]
+        assert flight.calls == {"system": 1} and flight.coalesced == {"system": 9}
+        assert flight.in_flight() == 0
+
+        # После завершения операция выполняется заново
+        assert await flight.do("system", lsblk, 1) == 1
+        assert flight.calls == {"system": 2}
+
+    asyncio.run(run())
+
+
+def test_error_is_shared():
+    async def run():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("lsblk failed")
+
+        results = await asyncio.gather(*(flight.do("system", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.calls == {"system": 1} and flight.in_flight() == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def run():
+        flight = SingleFlight()
+
+        async def ping():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        first = asyncio.create_task(flight.do("network", ping))
+        second = asyncio.create_task(flight.do("network", ping))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "ok"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(run())
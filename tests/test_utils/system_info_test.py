@@ -0,0 +1,68 @@
+from src.models import schemas
+from src.utils import system_info
+
+
+def test_rom_inventory_refreshes_only_on_change(monkeypatch):
+    reads = []
+    signature = [("mounts", ("sda",))]
+
+    def read_rom_info():
+        reads.append(1)
+        return schemas.ROMInfo(disks=[schemas.ROMItemInfo(title="sda", volumes=[
+            schemas.ROMVolumeInfo(title="sda1", path="/dev/sda1", mount_point="/"),
+        ])])
+
+    monkeypatch.setattr(system_info, "read_rom_info", read_rom_info)
+    inventory = system_info.BlockDeviceInventory(ttl=600)
+    monkeypatch.setattr(inventory, "_signature_now", lambda: signature[0])
+
+    assert [volume.mount_point for volume in inventory.get_volumes()] == ["/"]
+    inventory.get_volumes()
+    inventory.get_info()
+    assert len(reads) == 1
+
+    signature[0] = ("mounts changed", ("sda",))
+    inventory.get_volumes()
+    assert len(reads) == 2
+
+
+def test_lan_inventory_refreshes_only_on_change(monkeypatch):
+    reads = []
+    signature = [(None, ("eth0",))]
+
+    def read_lan_info():
+        reads.append(1)
+        return schemas.LANInfo(interfaces=[schemas.LANItemInfo(title="eth0")])
+
+    monkeypatch.setattr(system_info, "read_lan_info", read_lan_info)
+    inventory = system_info.NetworkInventory(ttl=600)
+    monkeypatch.setattr(inventory, "_signature_now", lambda: signature[0])
+
+    inventory.get_info()
+    inventory.get_info()
+    assert len(reads) == 1
+
+    signature[0] = (None, ("eth0", "veth1"))
+    inventory.get_info()
+    assert len(reads) == 2
+
+
+def test_interface_rates():
+    rates = system_info.InterfaceRates()
+    assert rates.update({"eth0": (100, 10)}, now=0) == {"eth0": (None, None)}
+    assert rates.update({"eth0": (300, 20), "veth1": (5, 5)}, now=2) == {
+        "eth0": (100.0, 5.0),
+        "veth1": (None, None),
+    }
+    # Сброс счётчиков
+    assert rates.update({"eth0": (0, 0)}, now=3) == {"eth0": (None, None)}
+
+
+def test_disk_io_rates():
+    rates = system_info.DiskIORates()
+    assert rates.update({"sda": (10, 4096, 5, 8192, 100)}, now=0)[0].read_iops is None
+
+    devices = rates.update({"nvme0n1": (0, 0, 0, 0, 0), "sda": (30, 12288, 5, 8192, 600)}, now=2)
+    assert devices[0].read_iops is None
+    sda = devices[1]
+    assert (sda.read_iops, sda.read_bytes_rate, sda.write_iops, sda.utilization) == (10.0, 4096.0, 0.0, 25.0)
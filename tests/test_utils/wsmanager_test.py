@@ -0,0 +1,158 @@
+import asyncio
+
+from starlette.websockets import WebSocketState
+
+from src.utils.wsmanager import WSConnectionManager, OverflowPolicy
+
+
+class StalledWebSocket:
+    """Клиент, который не читает кадры, пока не будет отпущен"""
+    client = None
+
+    def __init__(self):
+        self.client_state = WebSocketState.CONNECTED
+        self.released = asyncio.Event()
+        self.received = []
+
+    async def accept(self, subprotocol: str = None):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.client_state = WebSocketState.DISCONNECTED
+
+    async def send(self, message: dict):
+        await self.released.wait()
+        self.received.append(message["bytes"])
+
+
+async def _fill(policy: OverflowPolicy, frames: int = 10, max_dropped: int = 100):
+    manager = WSConnectionManager(queue_size=2, overflow_policy=policy, max_dropped=max_dropped)
+    websocket = StalledWebSocket()
+    connection = await manager.connect(websocket)
+    await asyncio.sleep(0)
+    for i in range(frames):
+        await manager.broadcast(bytes([i]))
+    return manager, websocket, connection
+
+
+def test_drop_oldest():
+    async def run():
+        manager, websocket, connection = await _fill(OverflowPolicy.DROP_OLDEST)
+        assert connection.dropped == 8
+        websocket.released.set()
+        while connection.queue.qsize():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert websocket.received == [bytes([8]), bytes([9])]
+        await manager.disconnect(websocket)
+
+    asyncio.run(run())
+
+
+def test_keep_latest():
+    async def run():
+        manager, websocket, connection = await _fill(OverflowPolicy.KEEP_LATEST)
+        assert connection.dropped > 0
+        websocket.released.set()
+        while connection.queue.qsize():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert websocket.received[-1] == bytes([9])
+        await manager.disconnect(websocket)
+
+    asyncio.run(run())
+
+
+def test_disconnect_slow_client():
+    async def run():
+        manager, websocket, connection = await _fill(OverflowPolicy.DISCONNECT, frames=10, max_dropped=5)
+        assert connection.closed
+        assert websocket not in manager.active_connections
+        await asyncio.gather(*manager._closing)
+        assert websocket.client_state == WebSocketState.DISCONNECTED
+
+    asyncio.run(run())
+
+
+class HangingCloseWebSocket(StalledWebSocket):
+    """Клиент, который не отвечает на закрытие соединения"""
+
+    async def close(self, code: int = 1000, reason: str = None):
+        await asyncio.Event().wait()
+
+
+def test_slow_client_close_does_not_block_broadcast():
+    async def run():
+        manager = WSConnectionManager(
+            queue_size=1, overflow_policy=OverflowPolicy.DISCONNECT, max_dropped=1, close_timeout=0.05
+        )
+        websocket = HangingCloseWebSocket()
+        connection = await manager.connect(websocket)
+        await asyncio.sleep(0)
+        started = asyncio.get_running_loop().time()
+        for i in range(5):
+            await manager.broadcast(bytes([i]))
+        # Рассылка не ждёт закрытия зависшего клиента
+        assert asyncio.get_running_loop().time() - started < 0.05
+        assert connection.closed and websocket not in manager.active_connections
+        await asyncio.sleep(0.1)
+        assert not manager._closing
+
+    asyncio.run(run())
+
+
+class ChattyWebSocket(StalledWebSocket):
+    """Клиент с очередью входящих сообщений"""
+
+    def __init__(self):
+        super().__init__()
+        self.released.set()
+        self.incoming = asyncio.Queue()
+
+    async def send(self, message: dict):
+        self.received.append(message.get("text", message.get("bytes")))
+
+    async def receive_text(self) -> str:
+        return await self.incoming.get()
+
+
+def test_ping_is_answered_by_manager():
+    async def run():
+        manager = WSConnectionManager()
+        websocket = ChattyWebSocket()
+        await manager.connect(websocket)
+        reader = asyncio.create_task(manager.receive_text(websocket))
+        websocket.incoming.put_nowait("ping")
+        await asyncio.sleep(0.01)
+
+        # Ответ на ping уходит через очередь подключения и не доходит до приложения
+        assert not reader.done()
+        assert websocket.received == ["pong"]
+
+        websocket.incoming.put_nowait("resync")
+        assert await reader == "resync"
+        await manager.disconnect(websocket)
+
+    asyncio.run(run())
+
+
+class BrokenWebSocket(ChattyWebSocket):
+    """Клиент, отправка которому завершается непредвиденной ошибкой"""
+
+    async def send(self, message: dict):
+        raise ValueError("broken encoder")
+
+
+def test_writer_failure_closes_connection():
+    async def run():
+        manager = WSConnectionManager()
+        websocket = BrokenWebSocket()
+        connection = await manager.connect(websocket)
+        await manager.broadcast(b"frame")
+        await asyncio.sleep(0.01)
+        # Подключение без писателя не остаётся в менеджере
+        assert connection.closed and connection.writer.done()
+        assert websocket not in manager.active_connections
+        assert websocket.client_state == WebSocketState.DISCONNECTED
+
+    asyncio.run(run())